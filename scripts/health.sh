@@ -7,10 +7,8 @@ ts="$(date -u +%Y-%m-%dT%H:%M:%SZ)"
 
 autofile_status="$("${root_dir}/scripts/autofile" status)"
 
-failed_inbox=0
-if [[ -d "${root_dir}/inbox/failed" ]]; then
-  failed_inbox="$(ls -1 "${root_dir}/inbox/failed" 2>/dev/null | wc -l | tr -d ' ')"
-fi
+# Unresolved inbox failures come from the index (inbox/failed/ is date-sharded).
+failed_inbox="$(python3 -c 'import json,sys; print(json.load(sys.stdin).get("inbox_failed",0))' <<<"${autofile_status}")"
 
 health="green"
 if [[ "${failed_inbox}" -gt 0 ]]; then
@@ -25,6 +25,7 @@ required_files=(
   "${root_dir}/tools/orchestrator/orchestrator.py"
   "${root_dir}/tools/orchestrator/README.md"
   "${root_dir}/tools/signal/signal.py"
+  "${root_dir}/tools/signal/signal_bus.py"
   "${root_dir}/tools/signal/README.md"
   "${root_dir}/scripts/work"
   "${root_dir}/tools/work/work.py"
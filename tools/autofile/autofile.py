@@ -12,9 +12,11 @@ import shutil
 import sqlite3
 import subprocess
 import sys
+import tempfile
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
 
 def _utc_now_rfc3339() -> str:
@@ -33,19 +35,6 @@ def _safe_filename(name: str) -> str:
     return s or "file"
 
 
-def _sha256_file(path: Path) -> tuple[str, int]:
-    h = hashlib.sha256()
-    size = 0
-    with path.open("rb") as f:
-        while True:
-            chunk = f.read(1024 * 1024)
-            if not chunk:
-                break
-            size += len(chunk)
-            h.update(chunk)
-    return h.hexdigest(), size
-
-
 _SECRET_PATTERNS: list[tuple[str, re.Pattern[bytes]]] = [
     ("private_key_pem", re.compile(rb"-----BEGIN (?:RSA |EC |OPENSSH )?PRIVATE KEY-----")),
     ("aws_access_key_id", re.compile(rb"AKIA[0-9A-Z]{16}")),
@@ -56,7 +45,11 @@ _SECRET_PATTERNS: list[tuple[str, re.Pattern[bytes]]] = [
 ]
 
 
-def _scan_for_secrets(path: Path, ext: str | None) -> list[str]:
+# Secret scanning and mime sniffing only look at the start of a blob.
+_HEAD_BYTES = 2 * 1024 * 1024
+
+
+def _scan_for_secrets(data: bytes, ext: str | None) -> list[str]:
     # Conservative scan: look for known token formats and key material markers.
     # Avoid printing matched content.
     reasons: list[str] = []
@@ -64,12 +57,6 @@ def _scan_for_secrets(path: Path, ext: str | None) -> list[str]:
     if ext in {"pem", "key", "p12", "pfx"}:
         reasons.append(f"sensitive_extension:{ext}")
 
-    try:
-        with path.open("rb") as f:
-            data = f.read(2 * 1024 * 1024)
-    except Exception:
-        return reasons
-
     for name, pat in _SECRET_PATTERNS:
         if pat.search(data) is not None:
             reasons.append(f"pattern:{name}")
@@ -100,10 +87,31 @@ def _detect_mime(path: Path) -> str:
     return mime or "application/octet-stream"
 
 
+def _detect_mime_bytes(head: bytes, name: str) -> str:
+    # Same preference order as _detect_mime, for content that has no path yet.
+    try:
+        cp = subprocess.run(
+            ["file", "--mime-type", "-b", "-"],
+            check=True,
+            capture_output=True,
+            input=head,
+        )
+        mime = cp.stdout.decode("utf-8", "replace").strip()
+        if mime:
+            return mime
+    except Exception:
+        pass
+
+    mime, _ = mimetypes.guess_type(name)
+    return mime or "application/octet-stream"
+
+
 def _load_routes(root: Path) -> list[dict]:
     """Load routing rules from rules/routing.yaml.
 
-    Minimal parser for the very small subset we use.
+    Minimal parser for the very small subset we use: each route is a map with
+    a `when:` block of match keys plus scalar route-level keys
+    (`default_unit_type`, `action`, limits, ...).
     """
 
     path = root / "rules" / "routing.yaml"
@@ -112,26 +120,19 @@ def _load_routes(root: Path) -> list[dict]:
 
     routes: list[dict] = []
     cur: dict | None = None
-    in_when = False
+    when_indent: int | None = None
 
     for raw in path.read_text(encoding="utf-8").splitlines():
         line = raw.strip()
         if not line or line.startswith("#"):
             continue
-
-        # End `when:` block when we hit another top-level route field.
-        if line.startswith("default_unit_type:"):
-            in_when = False
-            _, v = line.split(":", 1)
-            if cur is not None:
-                cur["default_unit_type"] = v.strip().strip('"').strip("'")
-            continue
+        indent = len(raw) - len(raw.lstrip(" "))
 
         if line.startswith("-") and "name:" in line:
             if cur is not None:
                 routes.append(cur)
             cur = {"when": {}}
-            in_when = False
+            when_indent = None
             _, v = line.split("name:", 1)
             cur["name"] = v.strip().strip('"').strip("'")
             continue
@@ -140,14 +141,21 @@ def _load_routes(root: Path) -> list[dict]:
             continue
 
         if line == "when:":
-            in_when = True
+            when_indent = indent
             continue
 
-        if in_when:
-            if ":" in line:
-                k, v = line.split(":", 1)
-                cur["when"][k.strip()] = v.strip().strip('"').strip("'")
+        # A line at or left of `when:` ends the block (another route-level field).
+        if when_indent is not None and indent <= when_indent:
+            when_indent = None
+
+        if ":" not in line:
             continue
+        k, v = line.split(":", 1)
+        v = v.strip().strip('"').strip("'")
+        if when_indent is not None:
+            cur["when"][k.strip()] = v
+        else:
+            cur[k.strip()] = v
 
     if cur is not None:
         routes.append(cur)
@@ -163,6 +171,9 @@ def _select_route(routes: list[dict], mime: str) -> dict | None:
         mime_is = when.get("mime_is")
         if mime_is and mime == str(mime_is):
             return r
+        mime_in = when.get("mime_in")
+        if mime_in and mime in {m.strip() for m in str(mime_in).split(",")}:
+            return r
         any_ = when.get("any")
         if str(any_).lower() == "true":
             return r
@@ -174,13 +185,326 @@ def _blob_path(root: Path, sha256: str) -> Path:
     return root / "store" / "blobs" / shard / sha256
 
 
+class BlobReader:
+    """Read-only handle on a stored blob.
+
+    `view()` returns a zero-copy memoryview backed by mmap, so slicing a
+    multi-GB blob never copies it into Python. `copy_to()` streams a byte
+    range to a file descriptor, using os.sendfile for files and sockets.
+    Obtain instances through open_blob(); callers should not build blob
+    paths themselves so other storage backends can slot in behind it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._f = path.open("rb")
+        self.size = os.fstat(self._f.fileno()).st_size
+        self._mmap = None
+
+    def __enter__(self) -> "BlobReader":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A caller still holds a view; the map is released with it.
+                pass
+            self._mmap = None
+        self._f.close()
+
+    def _clamp(self, start: int, end: int | None) -> tuple[int, int]:
+        end = self.size if end is None else min(end, self.size)
+        start = max(0, min(start, end))
+        return start, end
+
+    def view(self, start: int = 0, end: int | None = None) -> memoryview:
+        """Zero-copy view of bytes [start, end)."""
+
+        start, end = self._clamp(start, end)
+        if self.size == 0:
+            return memoryview(b"")
+        if self._mmap is None:
+            import mmap
+
+            self._mmap = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)[start:end]
+
+    def copy_to(self, out_fd: int, start: int = 0, end: int | None = None) -> int:
+        """Write bytes [start, end) to out_fd; returns the number of bytes written."""
+
+        import errno
+        import stat
+
+        start, end = self._clamp(start, end)
+        mode = os.fstat(out_fd).st_mode
+        if hasattr(os, "sendfile") and (stat.S_ISREG(mode) or stat.S_ISSOCK(mode)):
+            off = start
+            try:
+                while off < end:
+                    n = os.sendfile(out_fd, self._f.fileno(), off, min(end - off, 1 << 30))
+                    if n == 0:
+                        break
+                    off += n
+                return off - start
+            except OSError as e:
+                # sendfile refuses some outputs (e.g. O_APPEND fds, `>>`);
+                # fall back to plain writes if nothing was sent yet.
+                if off != start or e.errno not in (errno.EINVAL, errno.ENOSYS):
+                    raise
+
+        written = 0
+        view = self.view(start, end)
+        try:
+            while written < len(view):
+                written += os.write(out_fd, view[written : written + (1 << 20)])
+        finally:
+            view.release()
+        return written
+
+
+def open_blob(root: Path, sha256: str) -> BlobReader:
+    """Open a stored blob for reading (the single read path for blob content)."""
+
+    path = _blob_path(root, sha256)
+    if not path.is_file():
+        raise ValueError(f"unknown blob: {sha256}")
+    return BlobReader(path)
+
+
+def _parse_range(spec: str, size: int) -> tuple[int, int]:
+    """HTTP-style byte range: `a-b` (inclusive), `a-` (to end), `-n` (last n)."""
+
+    spec = spec.strip()
+    if "-" not in spec:
+        raise ValueError(f"invalid range: {spec}")
+    a, b = spec.split("-", 1)
+    if not a:
+        n = int(b)
+        return max(0, size - n), size
+    start = int(a)
+    end = size if not b else int(b) + 1
+    if start < 0 or end < start:
+        raise ValueError(f"invalid range: {spec}")
+    return start, end
+
+
 def _ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
+class _TokenBucket:
+    """Byte-rate limiter shared by every reader/writer in the process."""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        import threading
+
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int) -> None:
+        # Requests larger than the bucket are allowed through once it is full,
+        # then pay their debt by pushing the balance negative.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+# Process-wide I/O budget, configured once from the CLI (see _apply_budget).
+_IO_BUCKET: _TokenBucket | None = None
+
+
+def _throttle(nbytes: int) -> None:
+    if _IO_BUCKET is not None and nbytes > 0:
+        _IO_BUCKET.consume(nbytes)
+
+
+def _parse_rate(text: str) -> float:
+    """Parse `512K`, `20M`, `1.5G` (bytes per second; binary units)."""
+
+    t = text.strip().upper().removesuffix("/S").removesuffix("B")
+    mult = {"K": 1024, "M": 1024**2, "G": 1024**3}.get(t[-1:], 1)
+    if t[-1:] in ("K", "M", "G"):
+        t = t[:-1]
+    try:
+        rate = float(t) * mult
+    except ValueError:
+        rate = -1.0
+    if not 0 <= rate < float("inf"):
+        raise ValueError(f"{text!r} (expected bytes/s, e.g. 512K, 20M, 1.5G)")
+    return rate
+
+
+# ioprio_set(2) is not exposed by the os module; syscall numbers per arch.
+_SYS_IOPRIO_SET = {"x86_64": 251, "amd64": 251, "aarch64": 30, "arm64": 30, "i686": 289, "i386": 289, "armv7l": 314}
+_IOPRIO_CLASS = {"interactive": (2, 0), "background": (2, 7), "idle": (3, 0)}  # (class, level): BE=2, IDLE=3
+_NICE = {"interactive": 0, "background": 10, "idle": 19}
+
+
+def _apply_priority(priority: str) -> dict:
+    """Lower CPU/IO priority for this process (inherited by derive subprocesses).
+
+    Best effort: unsupported platforms keep their current priority.
+    """
+
+    applied: dict = {"priority": priority}
+    if priority == "interactive":
+        return applied
+    try:
+        applied["nice"] = os.nice(_NICE[priority])
+    except OSError:
+        pass
+
+    import ctypes
+    import platform
+
+    nr = _SYS_IOPRIO_SET.get(platform.machine().lower())
+    if nr is not None:
+        cls, level = _IOPRIO_CLASS[priority]
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            # IOPRIO_WHO_PROCESS=1, who=0 (self)
+            if libc.syscall(nr, 1, 0, (cls << 13) | level) == 0:
+                applied["ioprio"] = f"{cls}/{level}"
+        except Exception:
+            pass
+    return applied
+
+
+def _apply_budget(args: argparse.Namespace) -> None:
+    global _IO_BUCKET
+    priority = getattr(args, "priority", None) or os.environ.get("AUTOFILE_PRIORITY") or "interactive"
+    if priority not in _NICE:
+        raise SystemExit(f"unknown priority: {priority}")
+    _apply_priority(priority)
+
+    limit = getattr(args, "io_limit", None) or os.environ.get("AUTOFILE_IO_LIMIT")
+    if limit:
+        try:
+            rate = _parse_rate(str(limit))
+        except ValueError as e:
+            raise SystemExit(f"invalid I/O limit: {e}")
+        if rate > 0:
+            _IO_BUCKET = _TokenBucket(rate)
+
+
+def _max_derive_procs(args: argparse.Namespace) -> int:
+    v = getattr(args, "max_derive_procs", None) or os.environ.get("AUTOFILE_MAX_DERIVE_PROCS") or 1
+    try:
+        return max(1, int(v))
+    except ValueError:
+        raise SystemExit(f"invalid max derive procs: {v!r} (expected a positive integer)")
+
+
+@dataclass(frozen=True)
+class _Staged:
+    tmp_path: Path | None  # None: hashed in place, content already in the store
+    sha256: str
+    size_bytes: int
+    head: bytes
+
+    def discard(self) -> None:
+        if self.tmp_path is not None:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def _file_mode() -> int:
+    """0o666 minus the process umask: the mode a plain open() would create."""
+
+    mask = os.umask(0)
+    os.umask(mask)
+    return 0o666 & ~mask
+
+
+# Read once at import: os.umask is process-wide and not safe to flip while
+# staging threads create files.
+_FILE_MODE = _file_mode()
+
+
+def _read_through(src: BinaryIO, out: BinaryIO | None) -> tuple[str, int, bytes]:
+    """Hash `src` (copying it to `out` if given); returns (sha256, size, head)."""
+
+    h = hashlib.sha256()
+    head = bytearray()
+    size = 0
+    while True:
+        chunk = src.read(1024 * 1024)
+        if not chunk:
+            break
+        # Budget covers both sides of a copy.
+        _throttle(len(chunk) if out is None else 2 * len(chunk))
+        size += len(chunk)
+        h.update(chunk)
+        if len(head) < _HEAD_BYTES:
+            head += chunk[: _HEAD_BYTES - len(head)]
+        if out is not None:
+            out.write(chunk)
+    return h.hexdigest(), size, bytes(head)
+
+
+def _stage_stream(root: Path, src: BinaryIO) -> _Staged:
+    """Copy `src` into a temp file under store/tmp/ while hashing it.
+
+    One pass over the bytes: the digest, size and the first _HEAD_BYTES (for
+    secret scanning and mime sniffing) are all collected during the copy.
+    The temp file lives on the blob store's filesystem so it can be renamed
+    into place atomically by _commit_staged.
+    """
+
+    tmp_dir = root / "store" / "tmp"
+    _ensure_dir(tmp_dir)
+    fd, tmp_name = tempfile.mkstemp(prefix="ingest-", dir=str(tmp_dir))
+    try:
+        # mkstemp creates 0600; blobs get the same mode as any other new file.
+        os.fchmod(fd, _FILE_MODE)
+        with os.fdopen(fd, "wb") as out:
+            sha256, size, head = _read_through(src, out)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return _Staged(tmp_path=Path(tmp_name), sha256=sha256, size_bytes=size, head=head)
+
+
+def _stage_path(root: Path, path: Path) -> _Staged:
+    """Hash a file in place and copy it to store/tmp/ only if its blob is new."""
+
+    with path.open("rb") as f:
+        sha256, size, head = _read_through(f, None)
+    if _blob_path(root, sha256).exists():
+        return _Staged(tmp_path=None, sha256=sha256, size_bytes=size, head=head)
+    with path.open("rb") as f:
+        return _stage_stream(root, f)
+
+
+def _commit_staged(root: Path, staged: _Staged) -> Path:
+    """Move a staged temp file to its content address (or drop it if already stored)."""
+
+    blob_path = _blob_path(root, staged.sha256)
+    _ensure_dir(blob_path.parent)
+    if staged.tmp_path is None or blob_path.exists():
+        staged.discard()
+    else:
+        os.replace(staged.tmp_path, blob_path)
+    return blob_path
+
+
 def _connect_db(db_path: Path) -> sqlite3.Connection:
     _ensure_dir(db_path.parent)
-    conn = sqlite3.connect(str(db_path))
+    # Generous busy timeout: a background backfill and an interactive
+    # watch-inbox may write at the same time.
+    conn = sqlite3.connect(str(db_path), timeout=60)
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
@@ -248,6 +572,39 @@ def _init_db(conn: sqlite3.Connection) -> None:
           payload_json TEXT NOT NULL
         );
 
+        CREATE TABLE IF NOT EXISTS archive_members (
+          archive_sha256 TEXT NOT NULL,
+          member_path TEXT NOT NULL,
+          sha256 TEXT NOT NULL,
+          unit_id TEXT NOT NULL,
+          PRIMARY KEY(archive_sha256, member_path),
+          FOREIGN KEY(archive_sha256) REFERENCES blobs(sha256) ON DELETE CASCADE,
+          FOREIGN KEY(sha256) REFERENCES blobs(sha256) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS unit_files (
+          unit_id TEXT PRIMARY KEY,
+          mtime_ns INTEGER NOT NULL,
+          size_bytes INTEGER NOT NULL,
+          sha256 TEXT NOT NULL,
+          synced_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS inbox_failures (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          original_name TEXT NOT NULL,
+          failed_path TEXT NOT NULL UNIQUE,
+          error_class TEXT NOT NULL,
+          error TEXT NOT NULL,
+          failed_at TEXT NOT NULL,
+          last_attempt_at TEXT NOT NULL,
+          retry_count INTEGER NOT NULL DEFAULT 0,
+          next_retry_at TEXT NOT NULL,
+          resolved_at TEXT,
+          resolved_path TEXT
+        );
+        CREATE INDEX IF NOT EXISTS inbox_failures_pending ON inbox_failures(resolved_at, next_retry_at);
+
         CREATE TABLE IF NOT EXISTS derived (
           sha256 TEXT NOT NULL,
           kind TEXT NOT NULL,
@@ -273,12 +630,13 @@ def _append_audit(root: Path, action: str, payload: dict) -> None:
         f.write(json.dumps(entry, sort_keys=True) + "\n")
 
 
-def _db_event(conn: sqlite3.Connection, action: str, payload: dict) -> None:
+def _db_event(conn: sqlite3.Connection, action: str, payload: dict, *, commit: bool = True) -> None:
     conn.execute(
         "INSERT INTO events(ts, action, payload_json) VALUES (?, ?, ?)",
         (_utc_now_rfc3339(), action, json.dumps(payload, sort_keys=True)),
     )
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def _unit_dir(root: Path, unit_id: str) -> Path:
@@ -355,6 +713,116 @@ def _set_unit_yaml_field(
     return changed
 
 
+def _parse_unit_yaml(text: str) -> dict[str, str]:
+    """Top-level `key: value` pairs of a unit.yaml (same subset we write)."""
+
+    out: dict[str, str] = {}
+    for line in text.splitlines():
+        if not line or line[0] in (" ", "\t", "#", "-"):
+            continue
+        if ":" not in line:
+            continue
+        k, v = line.split(":", 1)
+        v = v.strip()
+        if len(v) >= 2 and v[0] == v[-1] and v[0] in ("'", '"'):
+            v = v[1:-1]
+        out[k.strip()] = v
+    return out
+
+
+def sync_units(root: Path, conn: sqlite3.Connection, *, batch_size: int = 500) -> dict:
+    """Reconcile hand-edited units/<id>/unit.yaml files into the units table.
+
+    Each file's (mtime_ns, size, sha256) is tracked in unit_files. A file is
+    read only when its stat changed, and parsed only when its hash changed,
+    so a pass over a large tree costs one stat per unit plus work
+    proportional to the edits. Changes are applied in batched transactions.
+    """
+
+    units_dir = root / "units"
+    if not units_dir.is_dir():
+        return {"scanned": 0, "read": 0, "updated": 0, "missing": 0}
+
+    known = {
+        unit_id: (mtime_ns, size, sha)
+        for unit_id, mtime_ns, size, sha in conn.execute("SELECT unit_id, mtime_ns, size_bytes, sha256 FROM unit_files")
+    }
+    seen: set[str] = set()
+    scanned = 0
+    read = 0
+    updated = 0
+    pending_files: list[tuple] = []
+    pending_units: list[tuple] = []
+
+    def flush() -> None:
+        if not pending_files:
+            return
+        now = _utc_now_rfc3339()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO units(unit_id, created_at, title, type, review_status) VALUES (?, ?, '', 'unknown', 'needs_review')",
+                [(u[3], u[4] or now) for u in pending_units],
+            )
+            # Keys missing from the file (None) leave the indexed value alone.
+            conn.executemany(
+                "UPDATE units SET title=COALESCE(?, title), type=COALESCE(?, type),"
+                " review_status=COALESCE(?, review_status) WHERE unit_id=?",
+                [u[:4] for u in pending_units],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO unit_files(unit_id, mtime_ns, size_bytes, sha256, synced_at) VALUES (?, ?, ?, ?, ?)",
+                [(*f, now) for f in pending_files],
+            )
+        pending_files.clear()
+        pending_units.clear()
+
+    with os.scandir(units_dir) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue
+            unit_id = entry.name
+            try:
+                st = os.stat(os.path.join(entry.path, "unit.yaml"))
+            except FileNotFoundError:
+                continue
+            scanned += 1
+            seen.add(unit_id)
+            prev = known.get(unit_id)
+            if prev is not None and prev[0] == st.st_mtime_ns and prev[1] == st.st_size:
+                continue
+
+            data = Path(entry.path, "unit.yaml").read_bytes()
+            read += 1
+            sha = hashlib.sha256(data).hexdigest()
+            pending_files.append((unit_id, st.st_mtime_ns, st.st_size, sha))
+            if prev is None or prev[2] != sha:
+                fields = _parse_unit_yaml(data.decode("utf-8", "replace"))
+                pending_units.append(
+                    (
+                        fields.get("title"),
+                        fields.get("type"),
+                        fields.get("review_status"),
+                        unit_id,
+                        fields.get("created_at", ""),
+                    )
+                )
+                updated += 1
+            if len(pending_files) >= batch_size:
+                flush()
+    flush()
+
+    gone = [u for u in known if u not in seen]
+    if gone:
+        with conn:
+            conn.executemany("DELETE FROM unit_files WHERE unit_id=?", [(u,) for u in gone])
+
+    payload = {"scanned": scanned, "read": read, "updated": updated, "missing": len(gone)}
+    if read or gone:
+        _append_audit(root, "sync_units", payload)
+        _db_event(conn, "sync_units", payload)
+    return payload
+
+
 def _write_quarantine_marker(root: Path, unit_id: str, payload: dict) -> Path:
     qdir = root / "quarantine"
     _ensure_dir(qdir)
@@ -389,28 +857,67 @@ class IngestResult:
     mime: str
     size_bytes: int
     quarantined: bool
+    members: int = 0
 
 
 def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str | None) -> IngestResult:
     if not path.exists() or not path.is_file():
         raise ValueError(f"not a file: {path}")
 
-    sha256, size_bytes = _sha256_file(path)
-    mime = _detect_mime(path)
     ext = path.suffix.lower().lstrip(".") if path.suffix else None
+    staged = _stage_path(root, path)
+    try:
+        mime = _detect_mime(path)
+    except BaseException:
+        staged.discard()
+        raise
+    return _register_staged(root, conn, staged, mime=mime, ext=ext, name=path.name, source=str(path), unit_id=unit_id)
 
-    secret_reasons = _scan_for_secrets(path, ext)
 
-    blob_path = _blob_path(root, sha256)
-    _ensure_dir(blob_path.parent)
-    if not blob_path.exists():
-        tmp = blob_path.with_suffix(".tmp")
-        shutil.copy2(path, tmp)
-        os.replace(tmp, blob_path)
+def ingest_stream(
+    root: Path,
+    conn: sqlite3.Connection,
+    src: BinaryIO,
+    *,
+    name: str,
+    unit_id: str | None,
+    source: str = "<stdin>",
+) -> IngestResult:
+    """Ingest bytes from a stream (stdin, a pipe, a socket) in a single pass.
+
+    `name` stands in for the file name: it drives the extension, the mime
+    fallback and `original_name` in the index.
+    """
+
+    ext = Path(name).suffix.lower().lstrip(".") or None
+    staged = _stage_stream(root, src)
+    try:
+        mime = _detect_mime_bytes(staged.head, name)
+    except BaseException:
+        staged.discard()
+        raise
+    return _register_staged(root, conn, staged, mime=mime, ext=ext, name=name, source=source, unit_id=unit_id)
+
+
+def _register_staged(
+    root: Path,
+    conn: sqlite3.Connection,
+    staged: _Staged,
+    *,
+    mime: str,
+    ext: str | None,
+    name: str,
+    source: str,
+    unit_id: str | None,
+) -> IngestResult:
+    sha256 = staged.sha256
+    size_bytes = staged.size_bytes
+    secret_reasons = _scan_for_secrets(staged.head, ext)
+    blob_path = _commit_staged(root, staged)
 
     conn.execute(
         "INSERT OR IGNORE INTO blobs(sha256, size_bytes, mime, ext, first_seen_at, original_name) VALUES (?, ?, ?, ?, ?, ?)",
-        (sha256, size_bytes, mime, ext, _utc_now_rfc3339(), path.name),
+        (sha256, size_bytes, mime, ext, _utc_now_rfc3339(), name),
     )
     conn.commit()
 
@@ -428,8 +935,7 @@ def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str |
     conn.commit()
 
     # Apply routing defaults (rules/routing.yaml).
-    routes = _load_routes(root)
-    route = _select_route(routes, mime)
+    route = _select_route(_load_routes(root), mime)
     if route is not None:
         default_type = route.get("default_unit_type")
         if default_type and _set_unit_yaml_field(unit_dir, "type", f'"{default_type}"', only_if_values={'"unknown"'}):
@@ -471,7 +977,7 @@ def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str |
             "ts": _utc_now_rfc3339(),
             "unit_id": unit_id,
             "sha256": sha256,
-            "source_path": str(path),
+            "source_path": source,
             "reasons": secret_reasons,
         }
         quarantine_path = str(_write_quarantine_marker(root, unit_id, qpayload))
@@ -483,7 +989,7 @@ def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str |
         "unit_id": unit_id,
         "sha256": sha256,
         "role": "original",
-        "source_path": str(path),
+        "source_path": source,
         "mime": mime,
         "size_bytes": size_bytes,
     }
@@ -494,7 +1000,7 @@ def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str |
         "mime": mime,
         "size_bytes": size_bytes,
         "unit_id": unit_id,
-        "source_path": str(path),
+        "source_path": source,
         "blob_path": str(blob_path),
         "quarantined": quarantined,
         "quarantine_marker": quarantine_path,
@@ -502,16 +1008,393 @@ def ingest_file(root: Path, conn: sqlite3.Connection, path: Path, unit_id: str |
     _append_audit(root, "ingest", payload)
     _db_event(conn, "ingest", payload)
 
+    members: list[IngestResult] = []
+    if route is not None and route.get("action") == "explode_archive":
+        members = explode_archive(root, conn, sha256, mime=mime, unit_id=unit_id, source=source, route=route)
+
     return IngestResult(
         sha256=sha256,
         stored_at=blob_path,
         unit_id=unit_id,
         mime=mime,
         size_bytes=size_bytes,
-        quarantined=quarantined,
+        quarantined=quarantined or any(m.quarantined for m in members),
+        members=len(members),
     )
 
 
+# Archive explosion (route action `explode_archive`).
+#
+# Members are streamed out of the stored archive blob straight into the blob
+# store; nothing is extracted to a working directory. Limits can be overridden
+# per route in rules/routing.yaml.
+_ARCHIVE_DEFAULTS = {
+    "max_members": 100_000,
+    "max_member_mb": 4096,
+    "max_total_mb": 16384,
+    "max_ratio": 200,
+}
+
+_MAGIC: list[tuple[bytes, str]] = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"BZh", "application/x-bzip2"),
+    (b"\xfd7zXZ\x00", "application/x-xz"),
+]
+
+
+def _sniff_mime(head: bytes, name: str) -> str:
+    """In-process mime guess (magic bytes, then extension, then text check).
+
+    Used for archive members, where spawning `file` per member would dominate.
+    """
+
+    for magic, mime in _MAGIC:
+        if head.startswith(magic):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    guessed, _ = mimetypes.guess_type(name)
+    if guessed:
+        return guessed
+    sample = head[:8192]
+    if not sample:
+        return "application/x-empty"
+    if b"\x00" not in sample:
+        try:
+            sample.decode("utf-8")
+            return "text/plain"
+        except UnicodeDecodeError:
+            pass
+    return "application/octet-stream"
+
+
+class ArchiveLimitError(ValueError):
+    pass
+
+
+class _LimitedReader:
+    """File-like wrapper that refuses to yield more than `limit` bytes."""
+
+    def __init__(self, f: BinaryIO, limit: int, label: str) -> None:
+        self._f = f
+        self._left = limit
+        self._label = label
+
+    def read(self, n: int = -1) -> bytes:
+        chunk = self._f.read(n)
+        self._left -= len(chunk)
+        if self._left < 0:
+            raise ArchiveLimitError(f"member exceeds size limit: {self._label}")
+        return chunk
+
+
+def _safe_member_path(name: str) -> str | None:
+    """Normalize an in-archive path; None if it is absolute or escapes the root."""
+
+    name = name.replace("\\", "/")
+    if name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        return None
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if not parts or any(p == ".." for p in parts):
+        return None
+    return "/".join(parts)
+
+
+def _archive_limits(route: dict) -> dict:
+    out = dict(_ARCHIVE_DEFAULTS)
+    for k in out:
+        try:
+            out[k] = int(route.get(k, out[k]))
+        except (TypeError, ValueError):
+            pass
+    return out
+
+
+def _iter_zip_members(root: Path, blob: Path, limits: dict, skipped: list[dict]):
+    import threading
+    import zipfile
+
+    mb = 1024 * 1024
+    with zipfile.ZipFile(blob) as zf:
+        infos = []
+        total = 0
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            safe = _safe_member_path(info.filename)
+            if safe is None:
+                skipped.append({"path": info.filename, "reason": "unsafe_path"})
+                continue
+            if info.flag_bits & 0x1:
+                skipped.append({"path": safe, "reason": "encrypted"})
+                continue
+            if info.file_size > limits["max_member_mb"] * mb:
+                skipped.append({"path": safe, "reason": "member_too_large"})
+                continue
+            if info.compress_size and info.file_size / info.compress_size > limits["max_ratio"]:
+                raise ArchiveLimitError(f"compression ratio over {limits['max_ratio']}: {safe}")
+            total += info.file_size
+            if total > limits["max_total_mb"] * mb:
+                raise ArchiveLimitError(f"archive expands beyond {limits['max_total_mb']} MB")
+            infos.append((info, safe))
+            if len(infos) > limits["max_members"]:
+                raise ArchiveLimitError(f"archive has more than {limits['max_members']} members")
+
+    # Zip allows random access: hash members in parallel, one handle per worker.
+    local = threading.local()
+    handles: list[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
+
+    def stage(item):
+        info, safe = item
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(blob)
+            with handles_lock:
+                handles.append(zf)
+        try:
+            with zf.open(info) as f:
+                return safe, _stage_stream(root, _LimitedReader(f, info.file_size, safe))
+        except ArchiveLimitError:
+            raise
+        except Exception as e:
+            # One unreadable member (bad CRC, corrupt deflate stream) is skipped.
+            return safe, e
+
+    workers = min(8, os.cpu_count() or 1)
+    try:
+        for safe, staged in _staged_in_order(stage, infos, workers):
+            if isinstance(staged, Exception):
+                skipped.append({"path": safe, "reason": "error", "error": f"{type(staged).__name__}: {staged}"})
+                continue
+            yield safe, staged
+    finally:
+        # The pool has shut down by now; close each worker's handle.
+        for zf in handles:
+            zf.close()
+
+
+def _staged_in_order(stage, items: list, workers: int):
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        # Bounded window keeps staged heads from piling up on huge archives.
+        pending: list[concurrent.futures.Future] = []
+        try:
+            for item in items:
+                pending.append(pool.submit(stage, item))
+                if len(pending) >= workers * 4:
+                    yield pending.pop(0).result()
+            while pending:
+                yield pending.pop(0).result()
+        finally:
+            # Abandoned early (limit hit, consumer error): drop staged temp files.
+            for fut in pending:
+                fut.cancel()
+            for fut in pending:
+                if fut.cancelled():
+                    continue
+                try:
+                    staged = fut.result()[1]
+                except Exception:
+                    continue
+                if isinstance(staged, _Staged):
+                    staged.discard()
+
+
+def _iter_tar_members(root: Path, blob: Path, limits: dict, skipped: list[dict]):
+    import tarfile
+
+    mb = 1024 * 1024
+    total = 0
+    count = 0
+    # Stream mode: one sequential pass, also through gzip/bz2/xz.
+    with tarfile.open(blob, mode="r|*") as tf:
+        for member in tf:
+            if member.isdir():
+                continue
+            safe = _safe_member_path(member.name)
+            if safe is None:
+                skipped.append({"path": member.name, "reason": "unsafe_path"})
+                continue
+            if not member.isreg():
+                skipped.append({"path": safe, "reason": "not_regular_file"})
+                continue
+            if member.size > limits["max_member_mb"] * mb:
+                skipped.append({"path": safe, "reason": "member_too_large"})
+                continue
+            total += member.size
+            count += 1
+            if total > limits["max_total_mb"] * mb:
+                raise ArchiveLimitError(f"archive expands beyond {limits['max_total_mb']} MB")
+            if count > limits["max_members"]:
+                raise ArchiveLimitError(f"archive has more than {limits['max_members']} members")
+            f = tf.extractfile(member)
+            if f is None:
+                continue
+            yield safe, _stage_stream(root, _LimitedReader(f, member.size, safe))
+
+
+# Members registered per transaction while exploding an archive.
+_MEMBER_BATCH = 500
+
+
+def _register_member(
+    root: Path,
+    conn: sqlite3.Connection,
+    staged: _Staged,
+    *,
+    archive_sha256: str,
+    member_path: str,
+    source: str,
+    unit_id: str,
+) -> tuple[IngestResult, dict]:
+    """Store one archive member and attach it to the archive's unit.
+
+    The lean counterpart of _register_staged: the unit already exists and
+    routes are not applied to members. Statements run in the caller's
+    transaction (nothing is committed here), and the attachment event is
+    returned for the caller to write in bulk.
+    """
+
+    name = member_path.rsplit("/", 1)[-1]
+    ext = Path(name).suffix.lower().lstrip(".") or None
+    mime = _sniff_mime(staged.head, name)
+    sha256 = staged.sha256
+    secret_reasons = _scan_for_secrets(staged.head, ext)
+    blob_path = _commit_staged(root, staged)
+    now = _utc_now_rfc3339()
+    member_source = f"{source}!{member_path}"
+
+    conn.execute(
+        "INSERT OR IGNORE INTO blobs(sha256, size_bytes, mime, ext, first_seen_at, original_name) VALUES (?, ?, ?, ?, ?, ?)",
+        (sha256, staged.size_bytes, mime, ext, now, name),
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO unit_attachments(unit_id, sha256, role, attached_at) VALUES (?, ?, ?, ?)",
+        (unit_id, sha256, "member", now),
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO archive_members(archive_sha256, member_path, sha256, unit_id) VALUES (?, ?, ?, ?)",
+        (archive_sha256, member_path, sha256, unit_id),
+    )
+    if secret_reasons:
+        _set_unit_yaml_field(_unit_dir(root, unit_id), "review_status", "quarantined", only_if_values={"needs_review", ""})
+        conn.execute(
+            "UPDATE units SET review_status=? WHERE unit_id=? AND (review_status IS NULL OR review_status='' OR review_status='needs_review')",
+            ("quarantined", unit_id),
+        )
+        qpayload = {"ts": now, "unit_id": unit_id, "sha256": sha256, "source_path": member_source, "reasons": secret_reasons}
+        marker = str(_write_quarantine_marker(root, unit_id, qpayload))
+        _append_audit(root, "quarantine", {"unit_id": unit_id, "sha256": sha256, "reasons": secret_reasons, "marker": marker})
+        _db_event(conn, "quarantine", {"unit_id": unit_id, "sha256": sha256, "reasons": secret_reasons, "marker": marker}, commit=False)
+
+    event = {
+        "ts": now,
+        "unit_id": unit_id,
+        "sha256": sha256,
+        "role": "member",
+        "source_path": member_source,
+        "mime": mime,
+        "size_bytes": staged.size_bytes,
+    }
+    result = IngestResult(
+        sha256=sha256,
+        stored_at=blob_path,
+        unit_id=unit_id,
+        mime=mime,
+        size_bytes=staged.size_bytes,
+        quarantined=bool(secret_reasons),
+    )
+    return result, event
+
+
+def explode_archive(
+    root: Path,
+    conn: sqlite3.Connection,
+    archive_sha256: str,
+    *,
+    mime: str,
+    unit_id: str,
+    source: str,
+    route: dict,
+) -> list[IngestResult]:
+    """Ingest each member of a stored zip/tar blob and attach it to `unit_id`.
+
+    The archive blob itself stays attached as the original. Unreadable or
+    limit-violating archives are audited and left as an opaque blob.
+    """
+
+    import tarfile
+    import zipfile
+
+    blob = _blob_path(root, archive_sha256)
+    limits = _archive_limits(route)
+    skipped: list[dict] = []
+    results: list[IngestResult] = []
+
+    if mime == "application/zip" or zipfile.is_zipfile(blob):
+        members = _iter_zip_members(root, blob, limits, skipped)
+    else:
+        members = _iter_tar_members(root, blob, limits, skipped)
+
+    error: str | None = None
+    unit_dir = _unit_dir(root, unit_id)
+    events: list[dict] = []
+
+    def flush() -> None:
+        conn.commit()
+        if events:
+            with (unit_dir / "attachments.jsonl").open("a", encoding="utf-8") as f:
+                f.writelines(json.dumps(e, sort_keys=True) + "\n" for e in events)
+            events.clear()
+
+    try:
+        for member_path, staged in members:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            # Per-member savepoint: a failing member is rolled back and skipped,
+            # the rest of the batch still commits.
+            conn.execute("SAVEPOINT member")
+            try:
+                r, event = _register_member(
+                    root, conn, staged, archive_sha256=archive_sha256, member_path=member_path, source=source, unit_id=unit_id
+                )
+            except Exception as e:
+                conn.execute("ROLLBACK TO member")
+                conn.execute("RELEASE member")
+                staged.discard()
+                skipped.append({"path": member_path, "reason": "error", "error": f"{type(e).__name__}: {e}"})
+                continue
+            conn.execute("RELEASE member")
+            results.append(r)
+            events.append(event)
+            if len(events) >= _MEMBER_BATCH:
+                flush()
+    except (ArchiveLimitError, tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        members.close()
+        flush()
+
+    payload = {
+        "archive_sha256": archive_sha256,
+        "unit_id": unit_id,
+        "members": len(results),
+        "skipped": skipped,
+        "error": error,
+    }
+    _append_audit(root, "explode_archive", payload)
+    _db_event(conn, "explode_archive", payload)
+    return results
+
+
 def ingest_path(root: Path, conn: sqlite3.Connection, p: Path, unit_id: str | None) -> list[IngestResult]:
     results: list[IngestResult] = []
     if p.is_file():
@@ -595,16 +1478,39 @@ def _derive_pdf_text(root: Path, sha256: str, *, force: bool) -> str | None:
     return str(out_path)
 
 
-def derive_blob(root: Path, conn: sqlite3.Connection, sha256: str, *, force: bool) -> dict:
-    row = conn.execute("SELECT mime FROM blobs WHERE sha256=?", (sha256,)).fetchone()
-    if row is None:
-        raise ValueError(f"unknown blob: {sha256}")
-    mime = row[0]
+def _derive_outputs(root: Path, sha256: str, mime: str, *, force: bool) -> tuple[list[tuple[str, str]], list[dict]]:
+    """Run the external derivation tools for one blob (no DB access; thread-safe)."""
 
-    results: list[dict] = []
+    outputs: list[tuple[str, str]] = []
     errors: list[dict] = []
+    try:
+        if mime.startswith("image/"):
+            _throttle(_blob_path(root, sha256).stat().st_size)
+            p = _derive_thumbnail(root, sha256, force=force)
+            if p is not None:
+                outputs.append(("thumbnail", p))
+        elif mime == "application/pdf":
+            _throttle(_blob_path(root, sha256).stat().st_size)
+            p = _derive_pdf_text(root, sha256, force=force)
+            if p is not None:
+                outputs.append(("text", p))
+    except subprocess.CalledProcessError as e:
+        errors.append({"error": "subprocess_failed", "detail": str(e)})
+    except Exception as e:
+        errors.append({"error": "derive_failed", "detail": str(e)})
+    return outputs, errors
+
 
-    def record(kind: str, path: str) -> None:
+def _record_derived(
+    root: Path,
+    conn: sqlite3.Connection,
+    sha256: str,
+    mime: str,
+    outputs: list[tuple[str, str]],
+    errors: list[dict],
+) -> dict:
+    results: list[dict] = []
+    for kind, path in outputs:
         conn.execute(
             "INSERT OR REPLACE INTO derived(sha256, kind, path, created_at) VALUES (?, ?, ?, ?)",
             (sha256, kind, path, _utc_now_rfc3339()),
@@ -627,32 +1533,103 @@ def derive_blob(root: Path, conn: sqlite3.Connection, sha256: str, *, force: boo
                     },
                 )
 
-    try:
-        if mime.startswith("image/"):
-            p = _derive_thumbnail(root, sha256, force=force)
-            if p is not None:
-                record("thumbnail", p)
-        elif mime == "application/pdf":
-            p = _derive_pdf_text(root, sha256, force=force)
-            if p is not None:
-                record("text", p)
-    except subprocess.CalledProcessError as e:
-        errors.append({"error": "subprocess_failed", "detail": str(e)})
-    except Exception as e:
-        errors.append({"error": "derive_failed", "detail": str(e)})
-
     payload = {"sha256": sha256, "mime": mime, "results": results, "errors": errors}
     _append_audit(root, "derive", payload)
     _db_event(conn, "derive", payload)
     return payload
 
 
+def _blob_mime(conn: sqlite3.Connection, sha256: str) -> str:
+    row = conn.execute("SELECT mime FROM blobs WHERE sha256=?", (sha256,)).fetchone()
+    if row is None:
+        raise ValueError(f"unknown blob: {sha256}")
+    return row[0]
+
+
+def derive_blob(root: Path, conn: sqlite3.Connection, sha256: str, *, force: bool) -> dict:
+    mime = _blob_mime(conn, sha256)
+    outputs, errors = _derive_outputs(root, sha256, mime, force=force)
+    return _record_derived(root, conn, sha256, mime, outputs, errors)
+
+
+def derive_many(root: Path, conn: sqlite3.Connection, shas: list[str], *, force: bool, max_procs: int) -> list[dict]:
+    """Derive for many blobs with at most `max_procs` tool subprocesses at once.
+
+    Subprocesses run on a thread pool; index writes stay on this thread.
+    """
+
+    import concurrent.futures
+
+    jobs = [(sha256, _blob_mime(conn, sha256)) for sha256 in shas]
+    out: list[dict] = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_procs)) as pool:
+        futures = [pool.submit(_derive_outputs, root, sha256, mime, force=force) for sha256, mime in jobs]
+        for (sha256, mime), fut in zip(jobs, futures):
+            outputs, errors = fut.result()
+            out.append(_record_derived(root, conn, sha256, mime, outputs, errors))
+    return out
+
+
+def _sharded_dest(base: Path, name: str) -> Path:
+    """Collision-free destination under base/YYYY/MM/DD/ for a handled inbox file."""
+
+    now = dt.datetime.now(dt.timezone.utc)
+    day_dir = base / now.strftime("%Y") / now.strftime("%m") / now.strftime("%d")
+    _ensure_dir(day_dir)
+    while True:
+        dest = day_dir / f"{now.strftime('%H%M%S')}-{os.urandom(6).hex()}_{_safe_filename(name)}"
+        if not dest.exists():
+            return dest
+
+
+def _record_failure(conn: sqlite3.Connection, *, original_name: str, failed_path: Path, error: BaseException | str, error_class: str | None = None) -> None:
+    now = _utc_now_rfc3339()
+    conn.execute(
+        """
+        INSERT INTO inbox_failures(original_name, failed_path, error_class, error, failed_at, last_attempt_at, retry_count, next_retry_at)
+        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+        ON CONFLICT(failed_path) DO NOTHING
+        """,
+        (original_name, str(failed_path), error_class or type(error).__name__, str(error), now, now, now),
+    )
+    conn.commit()
+
+
+def _adopt_legacy_failures(root: Path, conn: sqlite3.Connection) -> int:
+    """Index files left flat in inbox/failed/ by older versions (one-time, cheap after)."""
+
+    failed = root / "inbox" / "failed"
+    if not failed.is_dir():
+        return 0
+    n = 0
+    with os.scandir(failed) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            dest = _sharded_dest(failed, entry.name)
+            os.replace(entry.path, dest)
+            _record_failure(conn, original_name=entry.name, failed_path=dest, error="unknown (pre-index failure)", error_class="legacy")
+            n += 1
+    return n
+
+
+def _count_legacy_failures(root: Path) -> int:
+    """Flat inbox/failed/ files not yet adopted by _adopt_legacy_failures (read-only)."""
+
+    try:
+        with os.scandir(root / "inbox" / "failed") as it:
+            return sum(1 for entry in it if entry.is_file())
+    except FileNotFoundError:
+        return 0
+
+
 def scan_inbox(root: Path, conn: sqlite3.Connection) -> tuple[int, int]:
     inbox = root / "inbox"
     processed = inbox / "processed"
     failed = inbox / "failed"
     _ensure_dir(processed)
     _ensure_dir(failed)
+    _adopt_legacy_failures(root, conn)
 
     ok = 0
     bad = 0
@@ -663,18 +1640,16 @@ def scan_inbox(root: Path, conn: sqlite3.Connection) -> tuple[int, int]:
             continue
         try:
             ingest_file(root, conn, p, unit_id=None)
-            stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
-            dest = processed / f"{stamp}_{_safe_filename(p.name)}"
-            os.replace(p, dest)
+            os.replace(p, _sharded_dest(processed, p.name))
             ok += 1
         except Exception as e:
-            stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
-            dest = failed / f"{stamp}_{_safe_filename(p.name)}"
+            dest = _sharded_dest(failed, p.name)
             try:
                 os.replace(p, dest)
+                _record_failure(conn, original_name=p.name, failed_path=dest, error=e)
             except Exception:
                 pass
-            payload = {"path": str(p), "error": str(e)}
+            payload = {"path": str(p), "error": str(e), "error_class": type(e).__name__}
             _append_audit(root, "scan_inbox_failed", payload)
             _db_event(conn, "scan_inbox_failed", payload)
             bad += 1
@@ -685,17 +1660,102 @@ def scan_inbox(root: Path, conn: sqlite3.Connection) -> tuple[int, int]:
     return ok, bad
 
 
+def list_failures(conn: sqlite3.Connection, limit: int) -> list[dict]:
+    cur = conn.execute(
+        """
+        SELECT id, original_name, failed_path, error_class, error, failed_at, retry_count, next_retry_at
+        FROM inbox_failures
+        WHERE resolved_at IS NULL
+        ORDER BY failed_at DESC
+        LIMIT ?
+        """,
+        (limit,),
+    )
+    cols = ["id", "original_name", "failed_path", "error_class", "error", "failed_at", "retry_count", "next_retry_at"]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def retry_failed(
+    root: Path,
+    conn: sqlite3.Connection,
+    *,
+    max_retries: int,
+    base_delay: float,
+    force: bool,
+) -> dict:
+    """Retry unresolved inbox failures whose backoff has elapsed.
+
+    Backoff is exponential per file: base_delay * 2**retry_count, capped at a day.
+    """
+
+    _adopt_legacy_failures(root, conn)
+    now = dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
+    now_s = now.isoformat().replace("+00:00", "Z")
+    where = "resolved_at IS NULL AND retry_count < ?"
+    params: list = [max_retries]
+    if not force:
+        where += " AND next_retry_at <= ?"
+        params.append(now_s)
+    rows = conn.execute(
+        f"SELECT id, original_name, failed_path, retry_count FROM inbox_failures WHERE {where} ORDER BY next_retry_at",
+        params,
+    ).fetchall()
+
+    ok = 0
+    bad = 0
+    missing = 0
+    processed = root / "inbox" / "processed"
+    for fid, original_name, failed_path, retry_count in rows:
+        p = Path(failed_path)
+        if not p.exists():
+            conn.execute("UPDATE inbox_failures SET resolved_at=?, resolved_path=NULL WHERE id=?", (now_s, fid))
+            conn.commit()
+            missing += 1
+            continue
+        try:
+            ingest_file(root, conn, p, unit_id=None)
+            dest = _sharded_dest(processed, original_name)
+            os.replace(p, dest)
+            conn.execute(
+                "UPDATE inbox_failures SET resolved_at=?, resolved_path=?, last_attempt_at=? WHERE id=?",
+                (now_s, str(dest), now_s, fid),
+            )
+            conn.commit()
+            ok += 1
+        except Exception as e:
+            delay = min(base_delay * (2 ** (retry_count + 1)), 86400.0)
+            nxt = (now + dt.timedelta(seconds=delay)).isoformat().replace("+00:00", "Z")
+            conn.execute(
+                """
+                UPDATE inbox_failures
+                SET retry_count=retry_count + 1, error_class=?, error=?, last_attempt_at=?, next_retry_at=?
+                WHERE id=?
+                """,
+                (type(e).__name__, str(e), now_s, nxt, fid),
+            )
+            conn.commit()
+            bad += 1
+
+    payload = {"retried": len(rows), "ok": ok, "failed": bad, "missing": missing}
+    _append_audit(root, "retry_failed", payload)
+    _db_event(conn, "retry_failed", payload)
+    return payload
+
+
 def status(root: Path, conn: sqlite3.Connection) -> dict:
     blobs = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
     units = conn.execute("SELECT COUNT(*) FROM units").fetchone()[0]
     attachments = conn.execute("SELECT COUNT(*) FROM unit_attachments").fetchone()[0]
     quarantined = conn.execute("SELECT COUNT(*) FROM units WHERE review_status='quarantined'").fetchone()[0]
+    inbox_failed = conn.execute("SELECT COUNT(*) FROM inbox_failures WHERE resolved_at IS NULL").fetchone()[0]
+    inbox_failed += _count_legacy_failures(root)
     return {
         "root": str(root),
         "blobs": blobs,
         "units": units,
         "attachments": attachments,
         "quarantined_units": quarantined,
+        "inbox_failed": inbox_failed,
         "db": str(root / "index" / "autofile.sqlite"),
     }
 
@@ -816,6 +1876,7 @@ def cmd_init(args: argparse.Namespace) -> int:
         root / "inbox" / "failed",
         root / "store" / "blobs",
         root / "store" / "derived",
+        root / "store" / "tmp",
         root / "index",
         root / "views",
         root / "rules",
@@ -838,8 +1899,11 @@ def cmd_ingest(args: argparse.Namespace) -> int:
     conn = _connect_db(root / "index" / "autofile.sqlite")
     _init_db(conn)
 
-    p = Path(args.path).expanduser().resolve()
-    results = ingest_path(root, conn, p, unit_id=args.unit)
+    if args.path == "-":
+        results = [ingest_stream(root, conn, sys.stdin.buffer, name=args.name or "stdin", unit_id=args.unit)]
+    else:
+        p = Path(args.path).expanduser().resolve()
+        results = ingest_path(root, conn, p, unit_id=args.unit)
     out = []
     for r in results:
         out.append(
@@ -850,6 +1914,7 @@ def cmd_ingest(args: argparse.Namespace) -> int:
                 "mime": r.mime,
                 "size_bytes": r.size_bytes,
                 "quarantined": r.quarantined,
+                **({"members": r.members} if r.members else {}),
             }
         )
     print(json.dumps(out, indent=2))
@@ -883,13 +1948,12 @@ def cmd_derive(args: argparse.Namespace) -> int:
     out: list[dict] = []
 
     if args.all:
-        cur = conn.execute("SELECT sha256 FROM blobs")
-        for (sha256,) in cur.fetchall():
-            out.append(derive_blob(root, conn, sha256, force=force))
+        shas = [sha256 for (sha256,) in conn.execute("SELECT sha256 FROM blobs").fetchall()]
+        out = derive_many(root, conn, shas, force=force, max_procs=_max_derive_procs(args))
     elif args.unit:
         cur = conn.execute("SELECT sha256 FROM unit_attachments WHERE unit_id=?", (args.unit,))
-        for (sha256,) in cur.fetchall():
-            out.append(derive_blob(root, conn, sha256, force=force))
+        shas = [sha256 for (sha256,) in cur.fetchall()]
+        out = derive_many(root, conn, shas, force=force, max_procs=_max_derive_procs(args))
     elif args.sha:
         out.append(derive_blob(root, conn, args.sha, force=force))
     else:
@@ -899,6 +1963,14 @@ def cmd_derive(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_sync_units(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    conn = _connect_db(root / "index" / "autofile.sqlite")
+    _init_db(conn)
+    print(json.dumps(sync_units(root, conn, batch_size=int(args.batch)), indent=2))
+    return 0
+
+
 def cmd_watch_inbox(args: argparse.Namespace) -> int:
     root = _resolve_root()
     conn = _connect_db(root / "index" / "autofile.sqlite")
@@ -913,16 +1985,23 @@ def cmd_watch_inbox(args: argparse.Namespace) -> int:
         _append_audit(root, "watch_start", {"interval": interval, "build_views": bool(args.build_views)})
         _db_event(conn, "watch_start", {"interval": interval, "build_views": bool(args.build_views)})
 
+        # sync-units stats every unit.yaml, so it runs on its own, slower cadence.
+        sync_every = max(float(args.sync_every), interval)
+        next_sync = 0.0
         while True:
             ok, bad = scan_inbox(root, conn)
             created = 0
             if args.build_views:
                 created = build_views(root, conn)
+            synced = 0
+            if args.sync_units and time.monotonic() >= next_sync:
+                synced = sync_units(root, conn)["updated"]
+                next_sync = time.monotonic() + sync_every
 
             if args.json:
-                print(json.dumps({"ok": ok, "failed": bad, "views_created": created, "ts": _utc_now_rfc3339()}, indent=2))
+                print(json.dumps({"ok": ok, "failed": bad, "views_created": created, "units_synced": synced, "ts": _utc_now_rfc3339()}, indent=2))
             else:
-                print(f"{_utc_now_rfc3339()} ok={ok} failed={bad} views_created={created}")
+                print(f"{_utc_now_rfc3339()} ok={ok} failed={bad} views_created={created} units_synced={synced}")
 
             if args.once:
                 break
@@ -935,6 +2014,41 @@ def cmd_watch_inbox(args: argparse.Namespace) -> int:
         _release_lock(lock_path)
 
 
+def cmd_retry_failed(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    conn = _connect_db(root / "index" / "autofile.sqlite")
+    _init_db(conn)
+    if args.list:
+        _adopt_legacy_failures(root, conn)
+        print(json.dumps(list_failures(conn, limit=int(args.limit)), indent=2))
+        return 0
+    out = retry_failed(root, conn, max_retries=int(args.max_retries), base_delay=float(args.base_delay), force=bool(args.force))
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_cat(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    sha256 = args.sha.strip().lower()
+    if len(sha256) < 64:
+        conn = _connect_db(root / "index" / "autofile.sqlite")
+        _init_db(conn)
+        matches = find_blob(conn, sha256, limit=2)
+        if len(matches) != 1:
+            raise SystemExit(f"{'ambiguous' if matches else 'unknown'} blob prefix: {sha256}")
+        sha256 = matches[0]["sha256"]
+
+    with open_blob(root, sha256) as blob:
+        start, end = _parse_range(args.range, blob.size) if args.range else (0, blob.size)
+        sys.stdout.flush()
+        try:
+            blob.copy_to(sys.stdout.fileno(), start, end)
+        except BrokenPipeError:
+            # e.g. `autofile cat ... | head`; not an error for a reader.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
 def cmd_status(args: argparse.Namespace) -> int:
     root = _resolve_root()
     conn = _connect_db(root / "index" / "autofile.sqlite")
@@ -967,37 +2081,67 @@ def cmd_find_blob(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_bench(args: argparse.Namespace) -> int:
+    # Lazy import: bench lives next to this file and is only needed here.
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    import bench
+
+    return int(bench.main(list(args.bench_args)))
+
+
 def main(argv: list[str]) -> int:
     parser = argparse.ArgumentParser(prog="autofile")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
+    # Resource budget flags shared by the heavy commands (env: AUTOFILE_PRIORITY,
+    # AUTOFILE_IO_LIMIT, AUTOFILE_MAX_DERIVE_PROCS).
+    budget = argparse.ArgumentParser(add_help=False)
+    budget.add_argument("--priority", choices=sorted(_NICE), help="CPU/IO priority class (default: interactive)")
+    budget.add_argument("--io-limit", dest="io_limit", help="max bytes/s read+written, e.g. 20M")
+
     p_init = sub.add_parser("init", help="initialize directories and database")
     p_init.set_defaults(fn=cmd_init)
 
-    p_ingest = sub.add_parser("ingest", help="ingest a file or directory")
+    p_ingest = sub.add_parser("ingest", parents=[budget], help="ingest a file or directory (`-` reads stdin)")
     p_ingest.add_argument("path")
     p_ingest.add_argument("--unit", help="attach to an existing unit id")
+    p_ingest.add_argument("--name", help="file name to record when ingesting from stdin")
     p_ingest.set_defaults(fn=cmd_ingest)
 
-    p_scan = sub.add_parser("scan-inbox", help="ingest all files in inbox/")
+    p_scan = sub.add_parser("scan-inbox", parents=[budget], help="ingest all files in inbox/")
     p_scan.set_defaults(fn=cmd_scan_inbox)
 
     p_views = sub.add_parser("build-views", help="(re)build generated views")
     p_views.set_defaults(fn=cmd_build_views)
 
-    p_derive = sub.add_parser("derive", help="generate derived artifacts (thumbnails/text)")
+    p_derive = sub.add_parser("derive", parents=[budget], help="generate derived artifacts (thumbnails/text)")
     p_derive.add_argument("--sha")
     p_derive.add_argument("--unit")
     p_derive.add_argument("--all", action="store_true")
     p_derive.add_argument("--force", action="store_true")
+    p_derive.add_argument("--max-derive-procs", dest="max_derive_procs", type=int, help="concurrent derive subprocesses (default: 1)")
     p_derive.set_defaults(fn=cmd_derive)
 
-    p_watch = sub.add_parser("watch-inbox", help="watch inbox/ and ingest continuously")
+    p_watch = sub.add_parser("watch-inbox", parents=[budget], help="watch inbox/ and ingest continuously")
     p_watch.add_argument("--interval", default="2.0", help="poll interval seconds")
     p_watch.add_argument("--once", action="store_true", help="run a single iteration")
     p_watch.add_argument("--no-build-views", dest="build_views", action="store_false")
+    p_watch.add_argument("--no-sync-units", dest="sync_units", action="store_false")
+    p_watch.add_argument("--sync-every", default="60", help="seconds between sync-units passes (default: 60)")
     p_watch.add_argument("--json", action="store_true", help="emit JSON per iteration")
-    p_watch.set_defaults(fn=cmd_watch_inbox, build_views=True)
+    p_watch.set_defaults(fn=cmd_watch_inbox, build_views=True, sync_units=True)
+
+    p_sync = sub.add_parser("sync-units", help="reconcile edited unit.yaml files into the index")
+    p_sync.add_argument("--batch", default="500", help="changes per transaction")
+    p_sync.set_defaults(fn=cmd_sync_units)
+
+    p_retry = sub.add_parser("retry-failed", parents=[budget], help="retry inbox failures whose backoff elapsed")
+    p_retry.add_argument("--list", action="store_true", help="list unresolved failures instead of retrying")
+    p_retry.add_argument("--limit", default="50")
+    p_retry.add_argument("--max-retries", dest="max_retries", default="8")
+    p_retry.add_argument("--base-delay", dest="base_delay", default="60", help="backoff base seconds (doubles per retry)")
+    p_retry.add_argument("--force", action="store_true", help="ignore backoff and retry now")
+    p_retry.set_defaults(fn=cmd_retry_failed)
 
     p_status = sub.add_parser("status", help="print index counts")
     p_status.set_defaults(fn=cmd_status)
@@ -1015,7 +2159,20 @@ def main(argv: list[str]) -> int:
     p_find.add_argument("--limit", default="25")
     p_find.set_defaults(fn=cmd_find_blob)
 
+    p_cat = sub.add_parser("cat", help="write blob bytes to stdout")
+    p_cat.add_argument("sha", help="sha256 or unique prefix")
+    p_cat.add_argument("--range", help="byte range: a-b (inclusive), a-, or -n")
+    p_cat.set_defaults(fn=cmd_cat)
+
+    p_bench = sub.add_parser("bench", help="run the synthetic-corpus benchmark (see bench.py --help)")
+    p_bench.set_defaults(fn=cmd_bench)
+
+    # bench owns its flags; pass everything after the subcommand through untouched.
+    if argv[:1] == ["bench"]:
+        return cmd_bench(argparse.Namespace(bench_args=argv[1:]))
+
     args = parser.parse_args(argv)
+    _apply_budget(args)
     return int(args.fn(args))
 
 
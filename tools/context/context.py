@@ -3,12 +3,21 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
+import hashlib
 import json
 import os
+import stat
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plan-registry"))
+# Appended, not prepended: tools/signal/signal.py must not shadow the stdlib module.
+sys.path.append(str(Path(__file__).resolve().parents[1] / "signal"))
+import plan_registry  # noqa: E402
+import signal_bus  # noqa: E402
+
 
 def _utc_now_rfc3339() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -27,13 +36,6 @@ def _safe_slug(s: str) -> str:
     return (s[:60] or "item")
 
 
-def _strip_quotes(s: str) -> str:
-    s = s.strip()
-    if len(s) >= 2 and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
-        return s[1:-1]
-    return s
-
-
 def _read(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
@@ -43,59 +45,6 @@ def _write(path: Path, text: str) -> None:
     path.write_text(text, encoding="utf-8")
 
 
-def parse_yaml_list_of_maps(text: str, list_key: str) -> list[dict]:
-    lines = text.splitlines()
-    in_list = False
-    items: list[dict] = []
-    cur: dict | None = None
-    i = 0
-    while i < len(lines):
-        raw = lines[i].rstrip("\n")
-        s = raw.strip()
-        i += 1
-        if not s or s.startswith("#"):
-            continue
-        if not in_list:
-            if s == f"{list_key}:":
-                in_list = True
-            continue
-
-        if s.startswith("-") and ":" in s:
-            if cur is not None:
-                items.append(cur)
-            cur = {}
-            after = s[1:].strip()
-            k, v = after.split(":", 1)
-            cur[k.strip()] = _strip_quotes(v.strip())
-            continue
-
-        if cur is None:
-            continue
-
-        if s == "links:" or s == "depends_on:":
-            key = s[:-1]
-            cur.setdefault(key, [])
-            while i < len(lines):
-                nxt = lines[i].rstrip("\n")
-                ns = nxt.strip()
-                if not ns or ns.startswith("#"):
-                    i += 1
-                    continue
-                if not ns.startswith("-"):
-                    break
-                cur[key].append(_strip_quotes(ns[1:].strip()))
-                i += 1
-            continue
-
-        if ":" in s:
-            k, v = s.split(":", 1)
-            cur[k.strip()] = _strip_quotes(v.strip())
-
-    if cur is not None:
-        items.append(cur)
-    return items
-
-
 @dataclass(frozen=True)
 class WorkItem:
     id: str
@@ -110,27 +59,47 @@ class WorkItem:
     notes: str
 
 
+def _work_item(item_id: str, it: dict) -> WorkItem:
+    return WorkItem(
+        id=item_id,
+        title=str(it.get("title", "")),
+        kind=str(it.get("kind", "plan")),
+        status=str(it.get("status", "pending")),
+        owner=str(it.get("owner", "unassigned")),
+        domain=str(it.get("domain", "unassigned")),
+        priority=str(it.get("priority", "medium")),
+        links=list(it.get("links", []) or []),
+        depends_on=list(it.get("depends_on", []) or []),
+        notes=str(it.get("notes", "")),
+    )
+
+
 def load_item(root: Path, item_id: str) -> WorkItem:
-    path = root / "tools" / "plan-registry" / "plans.yaml"
-    items = parse_yaml_list_of_maps(_read(path), "plans")
-    for it in items:
-        if str(it.get("id", "")) != item_id:
-            continue
-        return WorkItem(
-            id=item_id,
-            title=str(it.get("title", "")),
-            kind=str(it.get("kind", "plan")),
-            status=str(it.get("status", "pending")),
-            owner=str(it.get("owner", "unassigned")),
-            domain=str(it.get("domain", "unassigned")),
-            priority=str(it.get("priority", "medium")),
-            links=list(it.get("links", []) or []),
-            depends_on=list(it.get("depends_on", []) or []),
-            notes=str(it.get("notes", "")),
-        )
+    it = plan_registry.find_item(root, item_id)
+    if it is not None:
+        return _work_item(item_id, it)
     raise SystemExit(f"unknown work item: {item_id}")
 
 
+def load_items(root: Path, item_ids: list[str]) -> list[WorkItem]:
+    """Several items from one registry load, in the order given."""
+
+    by_id = {str(it.get("id", "")): it for it in plan_registry.load_items(root)}
+    missing = [i for i in item_ids if i not in by_id]
+    if missing:
+        raise SystemExit(f"unknown work item: {', '.join(missing)}")
+    return [_work_item(i, by_id[i]) for i in item_ids]
+
+
+def active_items(root: Path) -> list[WorkItem]:
+    conn = plan_registry.open_index(root)
+    try:
+        rows = plan_registry.query_items(conn, statuses=("in_progress",))
+    finally:
+        conn.close()
+    return [_work_item(str(it["id"]), it) for it in rows]
+
+
 def _read_health(root: Path) -> dict | None:
     p = root / ".substrate" / "state" / "health.json"
     if not p.exists():
@@ -142,110 +111,163 @@ def _read_health(root: Path) -> dict | None:
 
 
 def _recent_signals(root: Path, limit: int) -> list[str]:
-    sig_dir = root / ".bridges" / "signals"
-    if not sig_dir.exists():
+    if not (root / ".bridges" / "signals").exists():
         return []
-    paths = sorted(sig_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return [str(p.relative_to(root)) for p in paths[:limit]]
+    return [signal_bus.ref(root, row) for row in signal_bus.query(root, limit=limit)]
+
+
+# Embedding streams linked files: a capsule never holds more than the budget,
+# whatever size the files are.
+DEFAULT_EMBED_BYTES = 64 * 1024
+EMBED_MODES = ("head", "tail", "headtail")
+_SNIFF_BYTES = 8192
+_MAX_LINE_BYTES = 2048
+
+
+def _is_binary(p: Path) -> bool:
+    """Sniff the first block: NUL bytes or invalid UTF-8 mean binary."""
+
+    try:
+        with p.open("rb") as f:
+            chunk = f.read(_SNIFF_BYTES)
+    except OSError:
+        return True
+    if b"\0" in chunk:
+        return True
+    try:
+        chunk.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut at the block boundary is still text.
+        return not (len(chunk) == _SNIFF_BYTES and e.start >= len(chunk) - 3)
+    return False
+
+
+def _decode_line(raw: bytes) -> str:
+    text = raw.rstrip(b"\r\n").decode("utf-8", "replace")
+    if len(raw) >= _MAX_LINE_BYTES and not raw.endswith(b"\n"):
+        text += " ...(line cut)"
+    return text
+
+
+def _head_lines(f, max_lines: int, budget: int) -> list[str]:
+    out: list[str] = []
+    used = 0
+    while len(out) < max_lines:
+        start = f.tell()
+        raw = f.readline(_MAX_LINE_BYTES)
+        if not raw:
+            break
+        if used + len(raw) > budget:
+            f.seek(start)  # leave the line unread so callers see where the head ends
+            break
+        out.append(_decode_line(raw))
+        used += len(raw)
+        if not raw.endswith(b"\n"):
+            # Over-long line (or EOF): skipping the rest could mean reading it all.
+            break
+    return out
 
 
-def _embed_file(root: Path, rel: str, *, max_lines: int) -> str:
+def _tail_lines(f, size: int, start: int, max_lines: int, budget: int) -> list[str]:
+    """Last lines of the file, reading at most `budget` bytes back from the end (not before `start`)."""
+
+    begin = max(start, size - budget)
+    f.seek(begin)
+    raws = f.read(size - begin).split(b"\n")
+    if begin > start and raws:
+        raws = raws[1:]  # partial first line
+    if raws and raws[-1] == b"":
+        raws = raws[:-1]
+    out: list[str] = []
+    used = 0
+    for raw in reversed(raws[-max_lines:]):
+        raw = raw[:_MAX_LINE_BYTES]
+        if used + len(raw) + 1 > budget:
+            break
+        out.append(_decode_line(raw))
+        used += len(raw) + 1
+    return out[::-1]
+
+
+def _embed_file(root: Path, rel: str, *, max_lines: int, max_bytes: int = DEFAULT_EMBED_BYTES, mode: str = "head") -> str:
+    """Up to `max_lines` lines / `max_bytes` bytes of a text file, from its head, tail or both."""
+
     p = (root / rel).resolve()
     try:
-        text = p.read_text(encoding="utf-8")
-    except Exception:
+        f = p.open("rb")
+    except OSError:
         return f"(unable to read {rel})\n"
-    lines = text.splitlines()
-    if len(lines) <= max_lines:
-        return text.rstrip() + "\n"
-    head = "\n".join(lines[:max_lines])
-    return head.rstrip() + f"\n\n(truncated: {len(lines)} lines total)\n"
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if mode == "tail":
+            lines = _tail_lines(f, size, 0, max_lines, max_bytes)
+            shown = sum(len(l.encode("utf-8")) + 1 for l in lines)
+            body = "\n".join(lines)
+            if shown < size:
+                return f"(truncated: last {len(lines)} lines of {size} bytes)\n\n" + body.rstrip() + "\n"
+            return body.rstrip() + "\n"
+        head_n = max_lines if mode == "head" else (max_lines + 1) // 2
+        head_b = max_bytes if mode == "head" else max_bytes // 2
+        head = _head_lines(f, head_n, head_b)
+        pos = f.tell()
+        if pos >= size:
+            return "\n".join(head).rstrip() + "\n"
+        if mode == "head":
+            return "\n".join(head).rstrip() + f"\n\n(truncated: first {len(head)} lines of {size} bytes)\n"
+        tail = _tail_lines(f, size, pos, max_lines - len(head), max_bytes - pos)
+        skipped = size - pos - sum(len(l.encode("utf-8")) + 1 for l in tail)
+        gap = f"\n... ({max(skipped, 0)} bytes skipped) ...\n" if skipped > 0 else "\n"
+        return "\n".join(head) + gap + "\n".join(tail).rstrip() + "\n"
 
 
 def _update_plan_links_add(root: Path, item_id: str, new_link: str) -> None:
-    """Append a link to the target item's links list, if missing.
+    """Append a link to the target item's links list, if missing (journaled)."""
 
-    Best-effort text edit; assumes links are either `links: []` or a `links:` block.
-    """
-
-    path = root / "tools" / "plan-registry" / "plans.yaml"
-    lines = _read(path).splitlines(True)
-
-    # Locate item.
-    start = None
-    for i, line in enumerate(lines):
-        s = line.strip()
-        if not (s.startswith("-") and "id:" in s):
-            continue
-        after = s[1:].strip()
-        try:
-            k, v = after.split(":", 1)
-        except Exception:
-            continue
-        if k.strip() != "id":
-            continue
-        if _strip_quotes(v.strip()) == item_id:
-            start = i
-            break
-    if start is None:
-        return
-
-    end = len(lines)
-    for j in range(start + 1, len(lines)):
-        s = lines[j].strip()
-        if s.startswith("-") and "id:" in s:
-            end = j
-            break
+    plan_registry.add_link(root, item_id, new_link)
 
-    item = lines[start:end]
-    base_indent = " " * (len(item[0]) - len(item[0].lstrip(" ")) + 2)
-    link_indent = base_indent + "  "
-
-    # If link already present, no-op.
-    for ln in item:
-        if ln.strip() == f"- \"{new_link}\"" or ln.strip() == f"- '{new_link}'" or ln.strip() == f"- {new_link}":
-            return
-
-    # Find links block.
-    for idx, ln in enumerate(item):
-        if ln.strip() == "links: []":
-            item[idx] = f"{base_indent}links:\n"
-            item[idx + 1:idx + 1] = [f"{link_indent}- \"{new_link}\"\n"]
-            lines[start:end] = item
-            _write(path, "".join(lines))
-            return
-
-        if ln.strip() == "links:":
-            # Insert after existing link lines.
-            insert_at = idx + 1
-            while insert_at < len(item) and item[insert_at].strip().startswith("-"):
-                insert_at += 1
-            item[insert_at:insert_at] = [f"{link_indent}- \"{new_link}\"\n"]
-            lines[start:end] = item
-            _write(path, "".join(lines))
-            return
-
-    # No links key found; add after title.
-    insert_at = 1
-    for idx, ln in enumerate(item):
-        if ln.strip().startswith("title:"):
-            insert_at = idx + 1
-            break
-    item[insert_at:insert_at] = [f"{base_indent}links:\n", f"{link_indent}- \"{new_link}\"\n"]
-    lines[start:end] = item
-    _write(path, "".join(lines))
 
+def _capsule_path(root: Path, item: WorkItem) -> Path:
+    return root / "artifacts" / "contexts" / f"{item.id}_{_safe_slug(item.title)}.md"
 
-def build_capsule(root: Path, item: WorkItem, *, max_files: int, max_lines: int, recent_signal_limit: int) -> Path:
-    out_dir = root / "artifacts" / "contexts"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out = out_dir / f"{item.id}_{_safe_slug(item.title)}.md"
 
+def _effective_links(item: WorkItem) -> list[str]:
+    # Exclude other capsules from the capsule itself (avoid recursion).
+    return [l for l in item.links if not l.startswith("artifacts/contexts/")]
+
+
+def build_capsule(
+    root: Path,
+    item: WorkItem,
+    *,
+    max_files: int,
+    max_lines: int,
+    recent_signal_limit: int,
+    max_bytes: int = DEFAULT_EMBED_BYTES,
+    embed_mode: str = "head",
+) -> Path:
+    out = _capsule_path(root, item)
     health = _read_health(root)
     signals = _recent_signals(root, recent_signal_limit)
+    text = _render_capsule(
+        root, item, max_files=max_files, max_lines=max_lines, max_bytes=max_bytes, embed_mode=embed_mode,
+        health=health, signals=signals,
+    )
+    _write(out, text)
+    return out
 
-    # Exclude other capsules from the capsule itself (avoid recursion).
-    effective_links = [l for l in item.links if not l.startswith("artifacts/contexts/")]
+
+def _render_capsule(
+    root: Path,
+    item: WorkItem,
+    *,
+    max_files: int,
+    max_lines: int,
+    max_bytes: int,
+    embed_mode: str,
+    health: dict | None,
+    signals: list[str],
+) -> str:
+    effective_links = _effective_links(item)
 
     # Choose which linked files to embed: only existing, non-binary, and limited.
     embed = []
@@ -255,8 +277,7 @@ def build_capsule(root: Path, item: WorkItem, *, max_files: int, max_lines: int,
             continue
         if not p.exists():
             continue
-        # Skip obvious binaries by extension.
-        if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".gz", ".tar"}:
+        if _is_binary(p):
             continue
         embed.append(rel)
         if len(embed) >= max_files:
@@ -315,23 +336,248 @@ def build_capsule(root: Path, item: WorkItem, *, max_files: int, max_lines: int,
 
     if embed:
         parts.append("## Embedded Context\n\n")
+        budget = max_bytes
         for rel in embed:
             parts.append(f"### `{rel}`\n\n")
+            if budget <= 0:
+                parts.append("(omitted: embed budget exhausted)\n\n")
+                continue
+            chunk = _embed_file(root, rel, max_lines=max_lines, max_bytes=budget, mode=embed_mode)
+            budget -= len(chunk.encode("utf-8"))
             parts.append("```\n")
-            parts.append(_embed_file(root, rel, max_lines=max_lines))
+            parts.append(chunk)
             parts.append("```\n\n")
 
-    _write(out, "".join(parts))
-    return out
+    return "".join(parts)
+
+
+# --- fingerprint cache ---------------------------------------------------------
+#
+# A capsule is a function of the item fields, the linked files, the health
+# snapshot and the recent signal ids. A sidecar per item records those inputs
+# (files by size+mtime) so an up-to-date capsule is returned without re-reading
+# linked files or rewriting it.
+
+CAPSULE_FORMAT = 2
+
+_ITEM_FIELDS = ("title", "kind", "status", "owner", "domain", "priority", "depends_on", "notes")
+
+
+def _cache_path(root: Path, item_id: str) -> Path:
+    return root / "tools" / "context" / ".cache" / f"{item_id}.json"
+
+
+def _hash(obj: object) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _file_stamp(path: Path) -> str:
+    try:
+        st = path.stat()
+    except OSError:
+        return "missing"
+    if stat.S_ISDIR(st.st_mode):
+        return "dir"
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _health_view(health: dict | None) -> dict | None:
+    """The part of the health snapshot a capsule renders."""
+
+    if health is None:
+        return None
+    af = health.get("autofile") or {}
+    return {
+        "health": health.get("health", ""),
+        "autofile": [af.get("blobs"), af.get("units"), af.get("quarantined_units")],
+    }
+
+
+def _fingerprint(root: Path, item: WorkItem, *, params: dict, health: dict | None, signals: list[str]) -> dict:
+    return {
+        "format": CAPSULE_FORMAT,
+        "params": params,
+        "item": {f: _hash(getattr(item, f)) for f in _ITEM_FIELDS},
+        "links": [[rel, _file_stamp(root / rel)] for rel in _effective_links(item)],
+        "health": _hash(_health_view(health)),
+        "signals": signals,
+    }
+
+
+def _stale_reasons(cached: dict | None, fp: dict, capsule: Path, capsule_rel: str) -> list[str]:
+    """Why the cached capsule no longer matches its inputs; empty when it is current."""
+
+    if cached is None:
+        return ["no fingerprint recorded"]
+    old = cached.get("fingerprint") or {}
+    reasons = []
+    if old.get("format") != fp["format"]:
+        reasons.append("capsule format changed")
+    if old.get("params") != fp["params"]:
+        reasons.append("build options changed")
+    fields = [f for f in _ITEM_FIELDS if (old.get("item") or {}).get(f) != fp["item"][f]]
+    if fields:
+        reasons.append("item fields changed: " + ", ".join(fields))
+    old_links = dict((old.get("links") or []))
+    new_links = dict(fp["links"])
+    for rel in new_links:
+        if rel not in old_links:
+            reasons.append(f"link added: {rel}")
+        elif old_links[rel] != new_links[rel]:
+            reasons.append(f"linked file changed: {rel}")
+    for rel in old_links:
+        if rel not in new_links:
+            reasons.append(f"link removed: {rel}")
+    if not reasons and [l[0] for l in old.get("links") or []] != [l[0] for l in fp["links"]]:
+        reasons.append("link order changed")
+    if old.get("health") != fp["health"]:
+        reasons.append("health snapshot changed")
+    if old.get("signals") != fp["signals"]:
+        fresh = [s for s in fp["signals"] if s not in (old.get("signals") or [])]
+        reasons.append("new signals: " + ", ".join(fresh) if fresh else "recent signals changed")
+    if cached.get("capsule") != capsule_rel:
+        reasons.append("capsule path changed")
+    elif _file_stamp(capsule) != cached.get("capsule_stamp"):
+        reasons.append("capsule missing or edited since last build")
+    return reasons
+
+
+@dataclass(frozen=True)
+class CapsuleInputs:
+    """Inputs shared by every capsule built in one pass."""
+
+    health: dict | None
+    signals: list[str]
+
+
+def load_inputs(root: Path, recent_signal_limit: int) -> CapsuleInputs:
+    return CapsuleInputs(health=_read_health(root), signals=_recent_signals(root, recent_signal_limit))
+
+
+def ensure_capsule(
+    root: Path,
+    item: WorkItem,
+    *,
+    max_files: int,
+    max_lines: int,
+    recent_signal_limit: int,
+    max_bytes: int = DEFAULT_EMBED_BYTES,
+    embed_mode: str = "head",
+    force: bool = False,
+    inputs: CapsuleInputs | None = None,
+) -> tuple[Path, list[str]]:
+    """Build the capsule only if its inputs changed; returns (path, reasons it was rebuilt)."""
+
+    out = _capsule_path(root, item)
+    if inputs is None:
+        inputs = load_inputs(root, recent_signal_limit)
+    health, signals = inputs.health, inputs.signals
+    params = {
+        "max_files": max_files,
+        "max_lines": max_lines,
+        "max_bytes": max_bytes,
+        "embed": embed_mode,
+        "signals": recent_signal_limit,
+    }
+    fp = _fingerprint(root, item, params=params, health=health, signals=signals)
+
+    side = _cache_path(root, item.id)
+    try:
+        cached = json.loads(side.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cached = None
+    reasons = ["forced"] if force else _stale_reasons(cached, fp, out, str(out.relative_to(root)))
+    if not reasons:
+        return out, []
+
+    text = _render_capsule(
+        root, item, max_files=max_files, max_lines=max_lines, max_bytes=max_bytes, embed_mode=embed_mode,
+        health=health, signals=signals,
+    )
+    _write(out, text)
+    record = {"fingerprint": fp, "capsule": str(out.relative_to(root)), "capsule_stamp": _file_stamp(out)}
+    tmp = side.with_suffix(f".tmp{os.getpid()}")
+    _write(tmp, json.dumps(record, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp, side)
+    return out, reasons
+
+
+def make_capsules(
+    root: Path,
+    items: list[WorkItem],
+    *,
+    jobs: int = 8,
+    max_files: int,
+    max_lines: int,
+    recent_signal_limit: int,
+    max_bytes: int = DEFAULT_EMBED_BYTES,
+    embed_mode: str = "head",
+    force: bool = False,
+) -> list[tuple[WorkItem, Path, list[str]]]:
+    """Ensure capsules for many items in one pass.
+
+    Health and signals are read once, capsules are built concurrently and
+    missing capsule links go into a single registry write.
+    """
+
+    inputs = load_inputs(root, recent_signal_limit)
+    unique = list({it.id: it for it in items}.values())
+
+    def one(item: WorkItem) -> tuple[Path, list[str]]:
+        return ensure_capsule(
+            root,
+            item,
+            max_files=max_files,
+            max_lines=max_lines,
+            recent_signal_limit=recent_signal_limit,
+            max_bytes=max_bytes,
+            embed_mode=embed_mode,
+            force=force,
+            inputs=inputs,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(unique)))) as pool:
+        built = dict(zip([it.id for it in unique], pool.map(one, unique)))
+    links = []
+    for it in unique:
+        rel = str(built[it.id][0].relative_to(root))
+        if rel not in it.links:
+            links.append((it.id, rel))
+    if links:
+        plan_registry.add_links(root, links)
+    return [(it, *built[it.id]) for it in items]
 
 
 def cmd_make(args: argparse.Namespace) -> int:
     root = _resolve_root()
-    item = load_item(root, args.work_id)
-    capsule = build_capsule(root, item, max_files=int(args.max_files), max_lines=int(args.max_lines), recent_signal_limit=int(args.signals))
-    rel = str(capsule.relative_to(root))
-    _update_plan_links_add(root, item.id, rel)
-    print(str(capsule))
+    single = False
+    if args.all_active:
+        items = active_items(root)
+    elif args.ids:
+        items = load_items(root, list(args.ids))
+    elif args.work_id:
+        items = [load_item(root, args.work_id)]
+        single = True
+    else:
+        raise SystemExit("context make: give a work id, --ids or --all-active")
+
+    built = make_capsules(
+        root,
+        items,
+        jobs=int(args.jobs),
+        max_files=int(args.max_files),
+        max_lines=int(args.max_lines),
+        recent_signal_limit=int(args.signals),
+        max_bytes=int(args.max_bytes) if args.max_bytes else int(args.max_tokens) * 4,
+        embed_mode=args.embed,
+        force=bool(args.force),
+    )
+    if args.explain:
+        out = [{"id": it.id, "capsule": str(p), "rebuilt": bool(r), "reasons": r} for it, p, r in built]
+        print(json.dumps(out[0] if single else out, indent=2))
+    else:
+        for _, p, _ in built:
+            print(str(p))
     return 0
 
 
@@ -340,10 +586,19 @@ def main(argv: list[str]) -> int:
     sub = p.add_subparsers(dest="cmd", required=True)
 
     m = sub.add_parser("make", help="generate a context capsule for a work item")
-    m.add_argument("work_id")
+    m.add_argument("work_id", nargs="?")
+    m.add_argument("--ids", nargs="+", metavar="ID", help="build capsules for several items in one pass")
+    m.add_argument("--all-active", action="store_true", help="build capsules for every in_progress item")
+    m.add_argument("--jobs", default="8", help="concurrent capsule builds for --ids/--all-active")
     m.add_argument("--max-files", default="5")
     m.add_argument("--max-lines", default="120")
     m.add_argument("--signals", default="5")
+    budget = m.add_mutually_exclusive_group()
+    budget.add_argument("--max-bytes", help=f"total bytes embedded across files (default {DEFAULT_EMBED_BYTES})")
+    budget.add_argument("--max-tokens", default=str(DEFAULT_EMBED_BYTES // 4), help="same budget in tokens (~4 bytes each)")
+    m.add_argument("--embed", default="head", choices=EMBED_MODES, help="which part of long files to embed")
+    m.add_argument("--force", action="store_true", help="rebuild even if the capsule is up to date")
+    m.add_argument("--explain", action="store_true", help="report whether and why the capsule was rebuilt")
     m.set_defaults(fn=cmd_make)
 
     args = p.parse_args(argv)
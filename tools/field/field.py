@@ -2,10 +2,18 @@
 from __future__ import annotations
 
 import argparse
+import ctypes
+import ctypes.util
 import datetime as dt
+import fnmatch
 import json
 import os
+import select
+import signal
+import struct
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -20,9 +28,12 @@ def _resolve_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
+def _table_path(root: Path) -> Path:
+    return root / "tools" / "field" / "orthogonal-table.json"
+
+
 def _load_table(root: Path) -> dict:
-    p = root / "tools" / "field" / "orthogonal-table.json"
-    return json.loads(p.read_text(encoding="utf-8"))
+    return json.loads(_table_path(root).read_text(encoding="utf-8"))
 
 
 def _check_file_exists(root: Path, path: str) -> tuple[bool, str]:
@@ -30,30 +41,182 @@ def _check_file_exists(root: Path, path: str) -> tuple[bool, str]:
     return ok, f"file_exists:{path}"
 
 
+def _scandir(path: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return list(it)
+    except OSError:
+        return []
+
+
+def _glob_first(root: Path, pattern: str) -> tuple[str | None, set[str]]:
+    """First match of `pattern` under root, plus every directory whose contents the search read.
+
+    Stops at the first match. When nothing matches, the directory set is what a
+    later re-check has to stat: the result can only change if one of them changes.
+    """
+
+    parts = [p for p in pattern.split("/") if p not in ("", ".")]
+    seen: set[str] = set()
+
+    def walk(rel: str, i: int) -> str | None:
+        if i == len(parts):
+            return rel
+        part = parts[i]
+        here = os.path.join(root, rel)
+        if part == "**":
+            hit = walk(rel, i + 1)
+            if hit is not None:
+                return hit
+            seen.add(rel)
+            for entry in _scandir(here):
+                if entry.is_dir(follow_symlinks=False):
+                    hit = walk(os.path.join(rel, entry.name), i)
+                    if hit is not None:
+                        return hit
+            return None
+        seen.add(rel)
+        if not any(c in part for c in "*?["):
+            child = os.path.join(rel, part)
+            if i + 1 == len(parts):
+                return child if os.path.exists(os.path.join(root, child)) else None
+            return walk(child, i + 1) if os.path.isdir(os.path.join(root, child)) else None
+        for entry in sorted(_scandir(here), key=lambda e: e.name):
+            if not fnmatch.fnmatchcase(entry.name, part):
+                continue
+            child = os.path.join(rel, entry.name)
+            if i + 1 == len(parts):
+                return child
+            if entry.is_dir():
+                hit = walk(child, i + 1)
+                if hit is not None:
+                    return hit
+        return None
+
+    return walk("", 0), seen
+
+
 def _check_glob_exists(root: Path, pattern: str) -> tuple[bool, str]:
-    matches = list(root.glob(pattern))
-    return (len(matches) > 0), f"glob_exists:{pattern}"
+    match, _ = _glob_first(root, pattern)
+    return match is not None, f"glob_exists:{pattern}"
 
 
-def _run_checks(root: Path, element: dict) -> tuple[bool, list[dict]]:
-    results: list[dict] = []
-    ok_all = True
-    for chk in element.get("checks", []):
+# --- check cache ----------------------------------------------------------------
+#
+# Glob results are cached in tools/field/.cache/checks.json. A hit is re-validated
+# by stat()ing the matched path; a miss by stat()ing every directory the search
+# read (any new entry changes its parent's mtime). file_exists is a single stat
+# and is not cached.
+
+
+def _cache_path(root: Path) -> Path:
+    return root / "tools" / "field" / ".cache" / "checks.json"
+
+
+def _load_cache(root: Path) -> dict:
+    try:
+        return json.loads(_cache_path(root).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(root: Path, cache: dict) -> None:
+    p = _cache_path(root)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(cache, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def _dir_mtime(root: Path, rel: str) -> int | None:
+    try:
+        return os.stat(os.path.join(root, rel)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _cached_result(root: Path, entry: dict | None) -> bool | None:
+    """The cached outcome if still valid, else None."""
+
+    if not entry:
+        return None
+    if entry.get("ok"):
+        return True if os.path.exists(os.path.join(root, entry.get("match", ""))) else None
+    dirs = entry.get("dirs") or {}
+    if all(_dir_mtime(root, d) == m for d, m in dirs.items()):
+        return False
+    return None
+
+
+def _evaluate_glob(root: Path, pattern: str) -> dict:
+    match, seen = _glob_first(root, pattern)
+    if match is not None:
+        return {"ok": True, "match": match}
+    # Our own cache directory changes on every save; it never holds check targets.
+    own = str(_cache_path(root).parent.relative_to(root))
+    return {"ok": False, "dirs": {d: _dir_mtime(root, d) for d in sorted(seen) if d != own}}
+
+
+def _check_label(chk: dict) -> str:
+    kind = chk.get("kind")
+    if kind == "file_exists":
+        return f"file_exists:{chk.get('path', '')}"
+    if kind == "glob_exists":
+        return f"glob_exists:{chk.get('pattern', '')}"
+    return f"unknown_check:{kind}"
+
+
+def evaluate_checks(root: Path, checks: list[dict], *, jobs: int = 8) -> dict[str, bool]:
+    """Outcome per check label. Each distinct check runs once; cache misses run in parallel."""
+
+    by_label = {_check_label(c): c for c in checks}
+    cache = _load_cache(root)
+    out: dict[str, bool] = {}
+    misses: list[str] = []
+    for label, chk in by_label.items():
         kind = chk.get("kind")
         if kind == "file_exists":
-            ok, label = _check_file_exists(root, chk.get("path", ""))
+            out[label] = (root / chk.get("path", "")).exists()
         elif kind == "glob_exists":
-            ok, label = _check_glob_exists(root, chk.get("pattern", ""))
+            hit = _cached_result(root, cache.get(label))
+            if hit is None:
+                misses.append(label)
+            else:
+                out[label] = hit
         else:
-            ok = False
-            label = f"unknown_check:{kind}"
-        results.append({"ok": bool(ok), "check": label})
-        ok_all = ok_all and bool(ok)
+            out[label] = False
+    if misses:
+        patterns = [by_label[l].get("pattern", "") for l in misses]
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(misses)))) as pool:
+            fresh = list(pool.map(lambda pat: _evaluate_glob(root, pat), patterns))
+        for label, entry in zip(misses, fresh):
+            cache[label] = entry
+            out[label] = bool(entry["ok"])
+        _save_cache(root, cache)
+    return out
+
+
+def _run_checks(root: Path, element: dict, outcomes: dict[str, bool] | None = None) -> tuple[bool, list[dict]]:
+    checks = element.get("checks", [])
+    if outcomes is None:
+        outcomes = evaluate_checks(root, checks)
+    results: list[dict] = []
+    ok_all = True
+    for chk in checks:
+        label = _check_label(chk)
+        ok = bool(outcomes.get(label, False))
+        results.append({"ok": ok, "check": label})
+        ok_all = ok_all and ok
     return ok_all, results
 
 
 def compute_field(root: Path) -> dict:
     table = _load_table(root)
+    outcomes = evaluate_checks(root, [c for e in table.get("elements", []) for c in e.get("checks", [])])
+    return _summarize(root, table, outcomes)
+
+
+def _summarize(root: Path, table: dict, outcomes: dict[str, bool]) -> dict:
     elements = sorted(table.get("elements", []), key=lambda e: int(e.get("z", 0)))
     noble = set(int(x) for x in table.get("noble_gases", []))
     iron = int(table.get("iron_threshold", 26))
@@ -63,7 +226,7 @@ def compute_field(root: Path) -> dict:
     z_current = 0
     for e in elements:
         z = int(e.get("z", 0))
-        ok, checks = _run_checks(root, e)
+        ok, checks = _run_checks(root, e, outcomes)
         entry = {
             "z": z,
             "symbol": e.get("symbol", ""),
@@ -94,6 +257,242 @@ def compute_field(root: Path) -> dict:
     }
 
 
+def field_path(root: Path) -> Path:
+    return root / ".substrate" / "state" / "field.json"
+
+
+def _pid_path(root: Path) -> Path:
+    return root / ".substrate" / "state" / "field-watch.pid"
+
+
+def write_field(root: Path, field: dict) -> Path:
+    """Atomically replace field.json (readers never see a partial file)."""
+
+    out = field_path(root)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_text(json.dumps(field, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, out)
+    return out
+
+
+def watcher_alive(root: Path) -> bool:
+    try:
+        pid = int(_pid_path(root).read_text(encoding="utf-8").strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def current_field(root: Path) -> dict:
+    """field.json while a `field watch` keeps it current, else a fresh computation."""
+
+    if watcher_alive(root):
+        try:
+            return json.loads(field_path(root).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pass
+    return compute_field(root)
+
+
+# --- watch ---------------------------------------------------------------------
+
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+_TABLE = "__table__"
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify unavailable")
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+
+    def add(self, path: str) -> int:
+        wd = self._add(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def remove(self, wd: int) -> None:
+        self._rm(self.fd, wd)
+
+    def read(self, timeout: float | None) -> list[tuple[int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _cookie, n = _EVENT.unpack_from(data, pos)
+            name = data[pos + _EVENT.size : pos + _EVENT.size + n].split(b"\0", 1)[0]
+            events.append((wd, mask, os.fsdecode(name)))
+            pos += _EVENT.size + n
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _ancestors(rel: str) -> list[str]:
+    """Root and each directory on the way to `rel` (excluding rel itself)."""
+
+    out = [""]
+    cur = ""
+    for part in [p for p in rel.split("/") if p][:-1]:
+        cur = os.path.join(cur, part)
+        out.append(cur)
+    return out
+
+
+def _watch_dirs(root: Path, checks: dict[str, dict]) -> dict[str, set[str]]:
+    """Directory -> labels of the checks whose outcome an event there could change."""
+
+    cache = _load_cache(root)
+    dirs: dict[str, set[str]] = {}
+    for label, chk in checks.items():
+        kind = chk.get("kind")
+        if kind == "file_exists":
+            deps = _ancestors(chk.get("path", ""))
+        elif kind == "glob_exists":
+            entry = cache.get(label) or {}
+            deps = _ancestors(entry["match"]) if entry.get("ok") else list(entry.get("dirs") or {})
+        else:
+            deps = []
+        for d in deps:
+            dirs.setdefault(d, set()).add(label)
+    dirs.setdefault(str(_table_path(root).parent.relative_to(root)), set()).add(_TABLE)
+    return {d: labels for d, labels in dirs.items() if os.path.isdir(os.path.join(root, d))}
+
+
+def _table_checks(table: dict) -> dict[str, dict]:
+    return {_check_label(c): c for e in table.get("elements", []) for c in e.get("checks", [])}
+
+
+def watch(root: Path, *, poll: float | None = None, debounce: float = 0.05, on_write=None) -> None:
+    """Keep field.json current, rewriting it when z_current or blocked changes.
+
+    Uses inotify on the directories the checks depend on and re-evaluates only
+    the checks behind each event; without inotify (or with `poll`), re-checks
+    everything every `poll` seconds through the check cache.
+    """
+
+    table = _load_table(root)
+    checks = _table_checks(table)
+    outcomes = evaluate_checks(root, list(checks.values()))
+    last: list = [object()]
+
+    def publish() -> None:
+        field = _summarize(root, table, outcomes)
+        key = (field["z_current"], field["blocked"])
+        if key != last[0]:
+            last[0] = key
+            out = write_field(root, field)
+            if on_write is not None:
+                on_write(field, out)
+
+    publish()
+    ino = None
+    if poll is None:
+        try:
+            ino = _Inotify()
+        except OSError:
+            poll = 1.0
+
+    if ino is None:
+        table_stamp = _table_path(root).stat().st_mtime_ns
+        while True:
+            time.sleep(poll)
+            if _table_path(root).stat().st_mtime_ns != table_stamp:
+                table_stamp = _table_path(root).stat().st_mtime_ns
+                table = _load_table(root)
+                checks = _table_checks(table)
+            outcomes = evaluate_checks(root, list(checks.values()))
+            publish()
+
+    wds: dict[int, str] = {}
+    by_dir: dict[str, int] = {}
+    labels_by_dir: dict[str, set[str]] = {}
+
+    def rewatch() -> None:
+        nonlocal labels_by_dir
+        labels_by_dir = _watch_dirs(root, checks)
+        for d in [d for d in by_dir if d not in labels_by_dir]:
+            ino.remove(by_dir[d])
+            del wds[by_dir.pop(d)]
+        for d in labels_by_dir:
+            if d not in by_dir:
+                try:
+                    wd = ino.add(os.path.join(root, d))
+                except FileNotFoundError:
+                    continue
+                wds[wd] = d
+                by_dir[d] = wd
+
+    try:
+        rewatch()
+        while True:
+            events = ino.read(None)
+            time.sleep(debounce)
+            events += ino.read(0)
+            affected: set[str] = set()
+            for wd, mask, name in events:
+                d = wds.get(wd)
+                if mask & _IN_Q_OVERFLOW:
+                    affected |= set(checks) | {_TABLE}
+                if d is None:
+                    continue
+                if mask & _IN_IGNORED:
+                    del by_dir[wds.pop(wd)]
+                labels = labels_by_dir.get(d, set())
+                if _TABLE in labels and name != _table_path(root).name:
+                    labels = labels - {_TABLE}
+                affected |= labels
+            if _TABLE in affected:
+                table = _load_table(root)
+                checks = _table_checks(table)
+                outcomes = evaluate_checks(root, list(checks.values()))
+            elif affected:
+                outcomes.update(evaluate_checks(root, [checks[l] for l in affected if l in checks]))
+            else:
+                continue
+            publish()
+            rewatch()
+    finally:
+        ino.close()
+
+
 def cmd_status(args: argparse.Namespace) -> int:
     root = _resolve_root()
     field = compute_field(root)
@@ -103,14 +502,33 @@ def cmd_status(args: argparse.Namespace) -> int:
 
 def cmd_write(args: argparse.Namespace) -> int:
     root = _resolve_root()
-    field = compute_field(root)
-    out = root / ".substrate" / "state" / "field.json"
-    out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(json.dumps(field, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    out = write_field(root, compute_field(root))
     print(str(out))
     return 0
 
 
+def cmd_watch(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    if watcher_alive(root):
+        raise SystemExit(f"field watch already running (pid file {_pid_path(root)})")
+    pid_path = _pid_path(root)
+    pid_path.parent.mkdir(parents=True, exist_ok=True)
+    pid_path.write_text(f"{os.getpid()}\n", encoding="utf-8")
+
+    def report(field: dict, out: Path) -> None:
+        blocked = field.get("blocked") or {}
+        print(json.dumps({"ts": field["ts"], "z_current": field["z_current"], "blocked": blocked.get("symbol"), "path": str(out)}), flush=True)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        watch(root, poll=args.poll, debounce=args.debounce, on_write=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pid_path.unlink(missing_ok=True)
+    return 0
+
+
 def main(argv: list[str]) -> int:
     p = argparse.ArgumentParser(prog="field")
     sub = p.add_subparsers(dest="cmd", required=True)
@@ -121,6 +539,11 @@ def main(argv: list[str]) -> int:
     w = sub.add_parser("write", help="write .substrate/state/field.json")
     w.set_defaults(fn=cmd_write)
 
+    wa = sub.add_parser("watch", help="keep field.json current as the tree changes")
+    wa.add_argument("--poll", type=float, help="poll every N seconds instead of using inotify")
+    wa.add_argument("--debounce", type=float, default=0.05, help="seconds to gather events before re-checking")
+    wa.set_defaults(fn=cmd_watch)
+
     args = p.parse_args(argv)
     return int(args.fn(args))
 
@@ -5,10 +5,16 @@ import argparse
 import datetime as dt
 import json
 import os
-import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+
+
+def _tool_path(name: str) -> None:
+    # Sibling tools are imported lazily: `explain` and --help need none of them.
+    path = str(Path(__file__).resolve().parents[1] / name)
+    if path not in sys.path:
+        sys.path.insert(0, path)
 
 
 def _utc_now_rfc3339() -> str:
@@ -22,10 +28,56 @@ def _resolve_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
-def _run_json(root: Path, rel: list[str]) -> Any:
-    cmd = [str(root / rel[0]), *rel[1:]]
-    cp = subprocess.run(cmd, check=True, capture_output=True, text=True)
-    return json.loads(cp.stdout)
+def compute_health(root: Path) -> dict:
+    """Same result and health.json side effect as scripts/health.sh."""
+
+    _tool_path("autofile")
+    import autofile
+
+    conn = autofile._connect_db(root / "index" / "autofile.sqlite")
+    try:
+        autofile._init_db(conn)
+        status = autofile.status(root, conn)
+    finally:
+        conn.close()
+    failed = int(status.get("inbox_failed", 0))
+    health = "green"
+    if failed > 0:
+        health = "red"
+    elif int(status.get("quarantined_units", 0)) > 0:
+        health = "yellow"
+    out = {"ts": _utc_now_rfc3339(), "health": health, "inbox_failed": failed, "autofile": status}
+    p = root / ".substrate" / "state" / "health.json"
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(out, indent=2) + "\n", encoding="utf-8")
+    return out
+
+
+def _current_field(root: Path) -> dict:
+    _tool_path("field")
+    import field as field_mod
+
+    # A running `field watch` already keeps field.json current.
+    field = field_mod.current_field(root)
+    if not field_mod.watcher_alive(root):
+        field_mod.write_field(root, field)
+    return field
+
+
+def _plans(root: Path) -> tuple[dict, list[dict], list[dict]]:
+    """Budgets, active and next, from one synced plan index connection."""
+
+    _tool_path("orchestrator")
+    import orchestrator
+
+    conn = orchestrator.open_scheduler(root)
+    try:
+        budgets = orchestrator.budget_usage(root, conn)
+        active = orchestrator.query_plans(root, ("in_progress",), conn=conn)
+        nxt = orchestrator.suggest_next(root, limit=10, conn=conn)
+    finally:
+        conn.close()
+    return budgets, [p.__dict__ for p in active], [p.__dict__ for p in nxt]
 
 
 def _write_focus(root: Path, obj: dict) -> Path:
@@ -56,13 +108,13 @@ def _resolve_level(root: Path, arg_level: int | None) -> int:
 
 
 def compute_focus(root: Path, *, level: int) -> dict:
-    # Update health and field state as part of the ritual.
-    health = _run_json(root, ["scripts/health.sh"])
-    _ = subprocess.run([str(root / "scripts/field"), "write"], check=True, capture_output=True, text=True)
-    field = _run_json(root, ["scripts/field", "status"])
-    budgets = _run_json(root, ["scripts/orchestrate", "budgets"])
-    active = _run_json(root, ["scripts/orchestrate", "active", "--json"])
-    nxt = _run_json(root, ["scripts/orchestrate", "next", "--json"])
+    # Update health and field state as part of the ritual; the three parts
+    # touch different files, so gather them concurrently.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        health_f = pool.submit(compute_health, root)
+        field_f = pool.submit(_current_field, root)
+        plans_f = pool.submit(_plans, root)
+        health, field, (budgets, active, nxt) = health_f.result(), field_f.result(), plans_f.result()
 
     z = int((field or {}).get("z_current") or 0)
     interesting = {10: "closed_shell", 12: "ignition", 17: "purification"}
@@ -81,8 +133,8 @@ def compute_focus(root: Path, *, level: int) -> dict:
         "field": field,
         "health": health,
         "budgets": budgets,
-        "active": active if isinstance(active, list) else [],
-        "next": (nxt[:10] if isinstance(nxt, list) else []),
+        "active": active,
+        "next": nxt,
         "flags": flags,
     }
 
@@ -136,7 +188,7 @@ def cmd_route(args: argparse.Namespace) -> int:
         lines.append("- priority: repair")
         lines.append("- action: inspect inbox failures and unblock ingestion")
         lines.append("- command: ./scripts/health.sh")
-        lines.append("- command: ls -la inbox/failed")
+        lines.append("- command: ./scripts/autofile retry-failed --list")
         print("\n".join(lines))
         return 0
 
@@ -161,7 +213,7 @@ def cmd_route(args: argparse.Namespace) -> int:
         lines.append("- priority: stabilize")
         lines.append("- action: run synthesis and review signals")
         lines.append("- command: ./scripts/synthesize")
-        lines.append("- command: ls -la .bridges/signals")
+        lines.append("- command: ./scripts/signal query")
         print("\n".join(lines))
         return 0
 
@@ -5,11 +5,24 @@ import argparse
 import datetime as dt
 import json
 import os
+import signal
+import socket
+import socketserver
+import sqlite3
 import sys
-import subprocess
+import threading
+import traceback
 from dataclasses import dataclass
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plan-registry"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "context"))
+# Appended, not prepended: tools/signal/signal.py must not shadow the stdlib module.
+sys.path.append(str(Path(__file__).resolve().parents[1] / "signal"))
+import context  # noqa: E402
+import plan_registry  # noqa: E402
+import signal_bus  # noqa: E402
+
 
 def _resolve_root() -> Path:
     env = os.environ.get("ASF_ROOT")
@@ -22,12 +35,18 @@ def _utc_now_rfc3339() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
-def _signal_id() -> str:
-    return dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
+# (size, mtime_ns, text) per path; lets a resident `serve` process skip re-reads.
+_TEXT_CACHE: dict[str, tuple[int, int, str]] = {}
 
 
 def _read_text(path: Path) -> str:
-    return path.read_text(encoding="utf-8")
+    st = path.stat()
+    hit = _TEXT_CACHE.get(str(path))
+    if hit is not None and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+        return hit[2]
+    text = path.read_text(encoding="utf-8")
+    _TEXT_CACHE[str(path)] = (st.st_size, st.st_mtime_ns, text)
+    return text
 
 
 def _write_text(path: Path, text: str) -> None:
@@ -41,80 +60,6 @@ def _strip_quotes(s: str) -> str:
     return s
 
 
-def parse_yaml_list_of_maps(text: str, list_key: str) -> list[dict]:
-    """Parse a tiny YAML subset: `{list_key}:` followed by `- key: value` items.
-
-    Supported:
-    - top-level `list_key:`
-    - list items as maps
-    - nested `links:` list of strings
-
-    This is not a general YAML parser.
-    """
-
-    lines = text.splitlines()
-    in_list = False
-    items: list[dict] = []
-    cur: dict | None = None
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        raw = line.rstrip("\n")
-        stripped = raw.strip()
-        i += 1
-
-        if not stripped or stripped.startswith("#"):
-            continue
-
-        if not in_list:
-            if stripped == f"{list_key}:":
-                in_list = True
-            continue
-
-        # Item start
-        if stripped.startswith("-") and ":" in stripped:
-            # Close previous
-            if cur is not None:
-                items.append(cur)
-            cur = {}
-
-            # Parse "- key: value"
-            after = stripped[1:].strip()
-            k, v = after.split(":", 1)
-            cur[k.strip()] = _strip_quotes(v.strip())
-            continue
-
-        if cur is None:
-            continue
-
-        # links list
-        if stripped == "links:" or stripped == "depends_on:":
-            key = stripped[:-1]
-            cur.setdefault(key, [])
-            # consume following "- item" lines with greater indent
-            while i < len(lines):
-                nxt = lines[i]
-                nxt_raw = nxt.rstrip("\n")
-                nxt_stripped = nxt_raw.strip()
-                if not nxt_stripped or nxt_stripped.startswith("#"):
-                    i += 1
-                    continue
-                if not nxt_stripped.startswith("-"):
-                    break
-                cur[key].append(_strip_quotes(nxt_stripped[1:].strip()))
-                i += 1
-            continue
-
-        # key: value
-        if ":" in stripped:
-            k, v = stripped.split(":", 1)
-            cur[k.strip()] = _strip_quotes(v.strip())
-
-    if cur is not None:
-        items.append(cur)
-    return items
-
-
 @dataclass(frozen=True)
 class Plan:
     id: str
@@ -130,26 +75,329 @@ class Plan:
     notes: str
 
 
+def _plan_from_item(it: dict) -> Plan:
+    return Plan(
+        id=str(it.get("id", "")),
+        title=str(it.get("title", "")),
+        kind=str(it.get("kind", "plan")),
+        mode=str(it.get("mode", "phase")),
+        status=str(it.get("status", "pending")),
+        owner=str(it.get("owner", "unassigned")),
+        domain=str(it.get("domain", "unassigned")),
+        priority=str(it.get("priority", "medium")),
+        links=list(it.get("links", []) or []),
+        depends_on=list(it.get("depends_on", []) or []),
+        notes=str(it.get("notes", "")),
+    )
+
+
 def load_plans(root: Path) -> list[Plan]:
-    path = root / "tools" / "plan-registry" / "plans.yaml"
-    items = parse_yaml_list_of_maps(_read_text(path), "plans")
-    out: list[Plan] = []
-    for it in items:
-        out.append(
-            Plan(
-                id=str(it.get("id", "")),
-                title=str(it.get("title", "")),
-                kind=str(it.get("kind", "plan")),
-                mode=str(it.get("mode", "phase")),
-                status=str(it.get("status", "pending")),
-                owner=str(it.get("owner", "unassigned")),
-                domain=str(it.get("domain", "unassigned")),
-                priority=str(it.get("priority", "medium")),
-                links=list(it.get("links", []) or []),
-                depends_on=list(it.get("depends_on", []) or []),
-                notes=str(it.get("notes", "")),
+    return [_plan_from_item(it) for it in plan_registry.load_items(root)]
+
+
+def query_plans(
+    root: Path,
+    statuses: tuple[str, ...],
+    *,
+    kind: str | None = None,
+    owner: str | None = None,
+    domain: str | None = None,
+    text: str | None = None,
+    limit: int | None = None,
+    conn: sqlite3.Connection | None = None,
+) -> list[Plan]:
+    """Indexed lookup against the SQLite mirror of plans.yaml."""
+
+    own = conn is None
+    if conn is None:
+        conn = plan_registry.open_index(root)
+    try:
+        items = plan_registry.query_items(
+            conn, statuses=statuses, kind=kind, owner=owner, domain=domain, text=text, limit=limit
+        )
+    finally:
+        if own:
+            conn.close()
+    return [_plan_from_item(it) for it in items]
+
+
+# --- Dependency scheduler -------------------------------------------------
+#
+# Lives in the plan index database next to the `plans` table and follows it
+# through plan_registry.changes_since(), so each call only touches plans that
+# changed since the last one:
+#   sched_edges(id, dep, cyclic)  `id` depends_on `dep`
+#   sched_nodes(id, done, unmet, cp)
+# `unmet` counts dependencies not yet done (unknown ids count as not done);
+# an item is ready when unmet == 0. `cp` is the critical-path length: the
+# longest chain of not-done work that transitively waits on the item.
+# Edges that close a cycle are flagged `cyclic` and left out of `cp` so it
+# stays well defined; they still count towards `unmet` (a cycle never starts).
+
+SCHED_FORMAT = "1"
+
+
+def _sched_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS sched_meta (
+          key TEXT PRIMARY KEY,
+          value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sched_nodes (
+          id TEXT PRIMARY KEY,
+          done INTEGER NOT NULL,
+          unmet INTEGER NOT NULL,
+          cp INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS sched_edges (
+          id TEXT NOT NULL,
+          dep TEXT NOT NULL,
+          cyclic INTEGER NOT NULL DEFAULT 0,
+          PRIMARY KEY (id, dep)
+        );
+        CREATE INDEX IF NOT EXISTS idx_sched_edges_dep ON sched_edges(dep);
+        """
+    )
+
+
+def _sched_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM sched_meta WHERE key=?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _sched_set_meta(conn: sqlite3.Connection, **kv: str) -> None:
+    conn.executemany("INSERT OR REPLACE INTO sched_meta(key, value) VALUES(?, ?)", list(kv.items()))
+
+
+def _sched_propagate_cp(conn: sqlite3.Connection, work: set[str]) -> None:
+    # Recompute cp for `work`, walking upstream only while values change.
+    # Cyclic edges are skipped, so the walk runs over a DAG and terminates.
+    while work:
+        y = work.pop()
+        node = conn.execute("SELECT done, cp FROM sched_nodes WHERE id=?", (y,)).fetchone()
+        if node is None:
+            continue
+        if node[0]:
+            new = 0
+        else:
+            below = conn.execute(
+                "SELECT MAX(n.cp) FROM sched_edges e JOIN sched_nodes n ON n.id = e.id WHERE e.dep=? AND e.cyclic=0",
+                (y,),
+            ).fetchone()[0]
+            new = 1 + (below or 0)
+        if new != node[1]:
+            conn.execute("UPDATE sched_nodes SET cp=? WHERE id=?", (new, y))
+            work.update(r[0] for r in conn.execute("SELECT dep FROM sched_edges WHERE id=? AND cyclic=0", (y,)))
+
+
+def _sched_reaches(conn: sqlite3.Connection, src: str, dst: str) -> bool:
+    """True if `src` transitively depends on `dst` over non-cyclic edges."""
+
+    seen = {src}
+    stack = [src]
+    while stack:
+        v = stack.pop()
+        if v == dst:
+            return True
+        for (d,) in conn.execute("SELECT dep FROM sched_edges WHERE id=? AND cyclic=0", (v,)):
+            if d not in seen:
+                seen.add(d)
+                stack.append(d)
+    return False
+
+
+def _sched_rebuild(conn: sqlite3.Connection) -> None:
+    rows = conn.execute("SELECT id, status, depends_on FROM plans").fetchall()
+    done = {r[0]: r[1] == "done" for r in rows}
+    deps = {r[0]: sorted(set(json.loads(r[2]))) for r in rows}
+
+    # Depth-first walk along depends_on; an edge back onto the current path
+    # closes a cycle and is flagged.
+    cyclic: set[tuple[str, str]] = set()
+    state: dict[str, int] = {}  # 1 = on the current path, 2 = finished
+    for start in deps:
+        if start in state:
+            continue
+        state[start] = 1
+        path = [(start, iter(deps[start]))]
+        while path:
+            v, it = path[-1]
+            for d in it:
+                if d not in deps:
+                    continue
+                if state.get(d) == 1:
+                    cyclic.add((v, d))
+                elif d not in state:
+                    state[d] = 1
+                    path.append((d, iter(deps[d])))
+                    break
+            else:
+                state[v] = 2
+                path.pop()
+
+    # Kahn's algorithm from the sinks upward over the remaining DAG: a node's
+    # cp is final once all of its dependents have been placed.
+    dependents: dict[str, list[str]] = {}
+    for pid, ds in deps.items():
+        for d in ds:
+            if d in deps and (pid, d) not in cyclic:
+                dependents.setdefault(d, []).append(pid)
+    waiting = {pid: len(dependents.get(pid, ())) for pid in deps}
+    queue = [pid for pid, n in waiting.items() if n == 0]
+    cp: dict[str, int] = {}
+    while queue:
+        y = queue.pop()
+        cp[y] = 0 if done[y] else 1 + max((cp[n] for n in dependents.get(y, ())), default=0)
+        for d in deps[y]:
+            if d in waiting and (y, d) not in cyclic:
+                waiting[d] -= 1
+                if waiting[d] == 0:
+                    queue.append(d)
+
+    conn.execute("DELETE FROM sched_nodes")
+    conn.execute("DELETE FROM sched_edges")
+    conn.executemany(
+        "INSERT INTO sched_nodes(id, done, unmet, cp) VALUES(?, ?, ?, ?)",
+        [(pid, int(done[pid]), sum(1 for d in deps[pid] if not done.get(d, False)), cp[pid]) for pid in deps],
+    )
+    conn.executemany(
+        "INSERT INTO sched_edges(id, dep, cyclic) VALUES(?, ?, ?)",
+        [(pid, d, int((pid, d) in cyclic)) for pid, ds in deps.items() for d in ds],
+    )
+
+
+def _sched_apply(conn: sqlite3.Connection, ids: list[str]) -> None:
+    work: set[str] = set()
+    edges_removed = False
+    for x in ids:
+        row = conn.execute("SELECT status, depends_on FROM plans WHERE id=?", (x,)).fetchone()
+        node = conn.execute("SELECT done, cp FROM sched_nodes WHERE id=?", (x,)).fetchone()
+        new_done = row is not None and row[0] == "done"
+        old_done = bool(node and node[0])
+        new_deps = set(json.loads(row[1])) if row is not None else set()
+        old_deps = {r[0] for r in conn.execute("SELECT dep FROM sched_edges WHERE id=?", (x,))}
+
+        if new_deps != old_deps:
+            conn.executemany("DELETE FROM sched_edges WHERE id=? AND dep=?", [(x, d) for d in old_deps - new_deps])
+            has_dependents = conn.execute("SELECT 1 FROM sched_edges WHERE dep=? LIMIT 1", (x,)).fetchone()
+            for d in sorted(new_deps - old_deps):
+                # Only an item something already waits on can close a cycle.
+                closes = d == x or (has_dependents is not None and _sched_reaches(conn, d, x))
+                conn.execute("INSERT INTO sched_edges(id, dep, cyclic) VALUES(?, ?, ?)", (x, d, int(closes)))
+            work |= old_deps ^ new_deps
+            edges_removed = edges_removed or bool(old_deps - new_deps)
+        if new_done != old_done:
+            # The only O(out-edges) step: dependents gain or lose one unmet dep.
+            conn.execute(
+                "UPDATE sched_nodes SET unmet = unmet + ? WHERE id IN (SELECT id FROM sched_edges WHERE dep=?)",
+                (-1 if new_done else 1, x),
             )
+            work |= new_deps
+
+        if row is None:
+            conn.execute("DELETE FROM sched_nodes WHERE id=?", (x,))
+            continue
+        done_deps = 0
+        if new_deps:
+            marks = ",".join("?" * len(new_deps))
+            done_deps = conn.execute(
+                f"SELECT COUNT(*) FROM sched_nodes WHERE done=1 AND id IN ({marks})", tuple(new_deps)
+            ).fetchone()[0]
+        conn.execute(
+            "INSERT OR REPLACE INTO sched_nodes(id, done, unmet, cp) VALUES(?, ?, ?, ?)",
+            (x, int(new_done), len(new_deps) - done_deps, node[1] if node else 0),
         )
+        work.add(x)
+
+    if edges_removed:
+        # A removed edge may have broken a cycle; re-check the few flagged edges.
+        for pid, dep in conn.execute("SELECT id, dep FROM sched_edges WHERE cyclic=1").fetchall():
+            if pid != dep and not _sched_reaches(conn, dep, pid):
+                conn.execute("UPDATE sched_edges SET cyclic=0 WHERE id=? AND dep=?", (pid, dep))
+                work.add(dep)
+    _sched_propagate_cp(conn, work)
+
+
+def _sched_sync(conn: sqlite3.Connection) -> None:
+    """Catch the scheduler tables up with the plan index."""
+
+    _sched_schema(conn)
+    epoch = plan_registry.index_epoch(conn)
+    if _sched_meta(conn, "format") == SCHED_FORMAT and _sched_meta(conn, "epoch") == epoch:
+        last = int(_sched_meta(conn, "rev") or 0)
+        if plan_registry.changes_since(conn, last)[2] == last:
+            return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if _sched_meta(conn, "format") != SCHED_FORMAT or _sched_meta(conn, "epoch") != epoch:
+            rev = plan_registry.changes_since(conn, 1 << 62)[2]
+            _sched_rebuild(conn)
+        else:
+            changed, removed, rev = plan_registry.changes_since(conn, int(_sched_meta(conn, "rev") or 0))
+            _sched_apply(conn, changed + removed)
+        _sched_set_meta(conn, format=SCHED_FORMAT, epoch=epoch, rev=str(rev))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def open_scheduler(root: Path) -> sqlite3.Connection:
+    conn = plan_registry.open_index(root)
+    _sched_sync(conn)
+    return conn
+
+
+def _find_cycles(edges: dict[str, list[str]]) -> list[list[str]]:
+    """Strongly connected components with more than one node (or a self-loop)."""
+
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    out: list[list[str]] = []
+    counter = 0
+    for start in sorted(edges):
+        if start in index:
+            continue
+        work = [(start, iter(edges.get(start, ())))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            v, it = work[-1]
+            advanced = False
+            for w in it:
+                if w not in edges:
+                    continue
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(edges.get(w, ()))))
+                    advanced = True
+                    break
+                if w in on_stack:
+                    low[v] = min(low[v], index[w])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                low[work[-1][0]] = min(low[work[-1][0]], low[v])
+            if low[v] == index[v]:
+                comp = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    comp.append(w)
+                    if w == v:
+                        break
+                if len(comp) > 1 or v in edges.get(v, ()):
+                    out.append(sorted(comp))
     return out
 
 
@@ -177,102 +425,15 @@ def _read_budgets(root: Path) -> dict:
     return out
 
 
-def _count_in_progress_by_domain(plans: list[Plan]) -> dict[str, int]:
-    counts: dict[str, int] = {}
-    for p in plans:
-        if p.status != "in_progress":
-            continue
-        counts[p.domain] = counts.get(p.domain, 0) + 1
-    return counts
-
-
 def _update_plan_registry(root: Path, plan_id: str, *, status: str | None, owner: str | None) -> bool:
-    """Best-effort update of tools/plan-registry/plans.yaml.
+    """Journal a status/owner update for a plan.
 
-    Guarantees:
-    - Updates the first `status:` / `owner:` in the target item.
-    - Removes duplicate `status:` / `owner:` lines in the target item.
-    - Inserts the field if missing.
+    Returns False if the plan is unknown or already has these values. The
+    change lands in the registry journal (O(1) append); `compact` folds it
+    into tools/plan-registry/plans.yaml.
     """
 
-    path = root / "tools" / "plan-registry" / "plans.yaml"
-    lines = _read_text(path).splitlines(True)
-
-    # Find the item region.
-    start = None
-    for i, line in enumerate(lines):
-        s = line.strip()
-        if not (s.startswith("-") and "id:" in s):
-            continue
-        try:
-            after = s[1:].strip()
-            k, v = after.split(":", 1)
-            if k.strip() != "id":
-                continue
-            cur_id = _strip_quotes(v.strip())
-        except Exception:
-            continue
-        if cur_id == plan_id:
-            start = i
-            break
-
-    if start is None:
-        return False
-
-    end = len(lines)
-    for j in range(start + 1, len(lines)):
-        s = lines[j].strip()
-        if s.startswith("-") and "id:" in s:
-            end = j
-            break
-
-    item_lines = lines[start:end]
-    indent = " " * (len(item_lines[0]) - len(item_lines[0].lstrip(" ")) + 2)
-
-    def rewrite_key(key: str, value: str | None) -> tuple[list[str], bool]:
-        if value is None:
-            return item_lines, False
-
-        out: list[str] = []
-        seen = False
-        changed = False
-        key_prefix = f"{key}:"
-        for ln in item_lines:
-            stripped = ln.strip()
-            if stripped.startswith(key_prefix):
-                if not seen:
-                    out.append(f"{indent}{key}: \"{value}\"\n")
-                    if stripped != f"{key}: \"{value}\"":
-                        changed = True
-                    seen = True
-                else:
-                    # Drop duplicates.
-                    changed = True
-                continue
-            out.append(ln)
-
-        if not seen:
-            # Insert right after title if present; else after id.
-            insert_at = 1
-            for idx, ln in enumerate(out):
-                if ln.strip().startswith("title:"):
-                    insert_at = idx + 1
-                    break
-            out[insert_at:insert_at] = [f"{indent}{key}: \"{value}\"\n"]
-            changed = True
-        return out, changed
-
-    new_lines, c1 = rewrite_key("status", status)
-    item_lines = new_lines
-    new_lines, c2 = rewrite_key("owner", owner)
-    item_lines = new_lines
-
-    if not (c1 or c2):
-        return False
-
-    lines[start:end] = item_lines
-    _write_text(path, "".join(lines))
-    return True
+    return plan_registry.set_fields(root, plan_id, status=status, owner=owner)
 
 
 def _touch_state_tracker(root: Path) -> None:
@@ -290,8 +451,7 @@ def _touch_state_tracker(root: Path) -> None:
     _write_text(path, "".join(lines))
 
 
-def _emit_signal(
-    root: Path,
+def _signal_doc(
     *,
     kind: str,
     topic: str,
@@ -304,13 +464,10 @@ def _emit_signal(
     next_actions: list[str] | None = None,
     expects_response: bool = False,
     response_by: str = "",
-) -> Path:
-    out_dir = root / ".bridges" / "signals"
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    sig = {
+) -> dict:
+    return {
         "header": {
-            "id": _signal_id(),
+            "id": "",
             "timestamp": _utc_now_rfc3339(),
             "from": from_,
             "to": to,
@@ -331,10 +488,15 @@ def _emit_signal(
         },
     }
 
-    fname = f"{sig['header']['id']}_{kind}_{topic.replace(' ', '_')}.json"
-    path = out_dir / fname
-    path.write_text(json.dumps(sig, indent=2, sort_keys=True) + "\n", encoding="utf-8")
-    return path
+
+def _write_signals(root: Path, sigs: list[dict]) -> list[dict]:
+    """Append a batch of signals to the signal log in one durable write."""
+
+    return signal_bus.append(root, sigs)
+
+
+def _emit_signal(root: Path, **kw) -> dict:
+    return _write_signals(root, [_signal_doc(**kw)])[0]
 
 
 def load_state(root: Path) -> dict:
@@ -361,32 +523,55 @@ def load_state(root: Path) -> dict:
 
 
 def _priority_rank(p: str) -> int:
-    return {"high": 0, "medium": 1, "low": 2}.get(p, 1)
+    return plan_registry.PRIORITY_RANK.get(p, 1)
 
 
 def _domain_rank(d: str) -> int:
     # A sane default ordering for systems work.
-    return {"guardian": 0, "watcher": 1, "builder": 2, "scribe": 3, "gems": 4}.get(d, 9)
+    return plan_registry.DOMAIN_RANK.get(d, 9)
 
 
-def suggest_next(plans: list[Plan]) -> list[Plan]:
-    candidates = [p for p in plans if p.status in ("pending", "blocked")]
-    candidates.sort(key=lambda p: (_priority_rank(p.priority), _domain_rank(p.domain), p.id))
-    return candidates
-
+def suggest_next(
+    root: Path,
+    *,
+    kind: str | None = None,
+    owner: str | None = None,
+    domain: str | None = None,
+    text: str | None = None,
+    limit: int | None = None,
+    conn: sqlite3.Connection | None = None,
+) -> list[Plan]:
+    """Pending/blocked plans whose dependencies are all done.
+
+    Ranked by critical-path length (longest first), then priority, domain, id.
+    `conn`, if given, must come from open_scheduler().
+    """
 
-def suggest_active(plans: list[Plan]) -> list[Plan]:
-    candidates = [p for p in plans if p.status == "in_progress"]
-    candidates.sort(key=lambda p: (_priority_rank(p.priority), _domain_rank(p.domain), p.id))
-    return candidates
+    own = conn is None
+    if conn is None:
+        conn = open_scheduler(root)
+    try:
+        items = plan_registry.query_items(
+            conn,
+            statuses=("pending", "blocked"),
+            kind=kind,
+            owner=owner,
+            domain=domain,
+            text=text,
+            limit=limit,
+            join="JOIN sched_nodes s ON s.id = p.id",
+            where=("s.unmet = 0",),
+            order_by="s.cp DESC, p.prio_rank, p.domain_rank, p.id",
+        )
+    finally:
+        if own:
+            conn.close()
+    return [_plan_from_item(it) for it in items]
 
 
-def cmd_status(args: argparse.Namespace) -> int:
-    root = _resolve_root()
-    data = load_state(root)
-    if args.json:
-        print(json.dumps(data, indent=2, sort_keys=True))
-        return 0
+def _status_text(data: dict, as_json: bool) -> str:
+    if as_json:
+        return json.dumps(data, indent=2, sort_keys=True)
 
     state = data.get("state") or {}
     health = data.get("health") or {}
@@ -397,46 +582,65 @@ def cmd_status(args: argparse.Namespace) -> int:
         "blobs": (health.get("autofile") or {}).get("blobs"),
         "units": (health.get("autofile") or {}).get("units"),
     }
-    print(json.dumps(out, indent=2))
-    return 0
+    return json.dumps(out, indent=2)
 
 
-def cmd_next(args: argparse.Namespace) -> int:
-    root = _resolve_root()
-    plans = load_plans(root)
-    nxt = suggest_next(plans)
-    if args.kind:
-        nxt = [p for p in nxt if p.kind == args.kind]
-
-    if args.json:
-        print(json.dumps([p.__dict__ for p in nxt], indent=2, sort_keys=True))
-        return 0
+def _plans_text(plans: list[Plan], as_json: bool, limit: int) -> str:
+    if as_json:
+        return json.dumps([p.__dict__ for p in plans], indent=2, sort_keys=True)
 
     # Human friendly (still plain).
     lines = []
-    for p in nxt[: args.limit]:
+    for p in plans[:limit]:
         tag = "REV" if p.mode == "revolution" else "PH"
         lines.append(f"{p.id} ({p.kind}/{tag}) [{p.domain}/{p.priority}] {p.title} ({p.status})")
-    print("\n".join(lines))
+    return "\n".join(lines)
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    print(_status_text(load_state(_resolve_root()), args.json))
     return 0
 
 
-def cmd_active(args: argparse.Namespace) -> int:
+def cmd_next(args: argparse.Namespace) -> int:
     root = _resolve_root()
-    plans = load_plans(root)
-    act = suggest_active(plans)
-    if args.kind:
-        act = [p for p in act if p.kind == args.kind]
+    if args.all:
+        nxt = query_plans(
+            root,
+            ("pending", "blocked"),
+            kind=args.kind,
+            owner=args.owner,
+            domain=args.domain,
+            text=args.text,
+            limit=None if args.json else args.limit,
+        )
+    else:
+        nxt = suggest_next(
+            root,
+            kind=args.kind,
+            owner=args.owner,
+            domain=args.domain,
+            text=args.text,
+            limit=None if args.json else args.limit,
+        )
 
-    if args.json:
-        print(json.dumps([p.__dict__ for p in act], indent=2, sort_keys=True))
-        return 0
+    print(_plans_text(nxt, args.json, args.limit))
+    return 0
 
-    lines = []
-    for p in act[: args.limit]:
-        tag = "REV" if p.mode == "revolution" else "PH"
-        lines.append(f"{p.id} ({p.kind}/{tag}) [{p.domain}/{p.priority}] {p.title} ({p.status})")
-    print("\n".join(lines))
+
+def cmd_active(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    act = query_plans(
+        root,
+        ("in_progress",),
+        kind=args.kind,
+        owner=args.owner,
+        domain=args.domain,
+        text=args.text,
+        limit=None if args.json else args.limit,
+    )
+
+    print(_plans_text(act, args.json, args.limit))
     return 0
 
 
@@ -465,99 +669,287 @@ def cmd_set(args: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_assign(args: argparse.Namespace) -> int:
-    """Assign a work item with just-enough context.
+@dataclass(frozen=True)
+class Assignment:
+    plan_id: str
+    owner: str
+    from_: str
+    to: str
+    override: bool
+    reason: str
 
-    Steps:
-    - generate a context capsule and link it
-    - set owner + status=in_progress
-    - emit a missive to the assignee with capsule path as evidence
-    """
 
-    root = _resolve_root()
-    plan_id = args.plan_id
-    owner = args.owner
-    if not owner:
-        raise SystemExit("--owner is required")
+def _check_assignments(root: Path, entries: list[Assignment]) -> list[Plan]:
+    """Validate a whole batch against the registry and budgets, before any write.
+
+    Budgets are read once and in_progress counts are carried forward across
+    the batch, so N assignments are checked exactly as N sequential ones.
+    """
 
-    # Enforce in_progress budget per domain (atomic autonomy guardrail).
-    plans = load_plans(root)
-    target = next((p for p in plans if p.id == plan_id), None)
-    if target is None:
-        raise SystemExit(f"unknown plan: {plan_id}")
     budgets = _read_budgets(root)
     max_in_progress = int(budgets.get("max_in_progress_per_domain", 2))
-    counts = _count_in_progress_by_domain(plans)
-    current = counts.get(target.domain, 0)
-    if current >= max_in_progress and not args.override:
-        raise SystemExit(
-            f"in_progress budget exceeded for domain={target.domain} ({current}/{max_in_progress}); use --override with --reason or open a council_call"
-        )
-
-    if current >= max_in_progress and args.override and not args.reason:
-        raise SystemExit("--override requires --reason")
+    conn = plan_registry.open_index(root)
+    try:
+        counts = plan_registry.count_by_domain(conn, "in_progress")
+        targets: list[Plan] = []
+        errors: list[str] = []
+        seen: set[str] = set()
+        for e in entries:
+            row = conn.execute("SELECT * FROM plans WHERE id=?", (e.plan_id,)).fetchone()
+            if row is None:
+                errors.append(f"unknown plan: {e.plan_id}")
+                continue
+            if e.plan_id in seen:
+                errors.append(f"duplicate plan in batch: {e.plan_id}")
+                continue
+            seen.add(e.plan_id)
+            target = _plan_from_item(plan_registry.index_row_to_item(row))
+            targets.append(target)
+            current = counts.get(target.domain, 0)
+            if current >= max_in_progress and not e.override:
+                errors.append(
+                    f"in_progress budget exceeded for domain={target.domain} ({current}/{max_in_progress}); use --override with --reason or open a council_call"
+                )
+                continue
+            if current >= max_in_progress and e.override and not e.reason:
+                errors.append("--override requires --reason")
+                continue
+            if target.status == "in_progress" and target.owner == e.owner:
+                errors.append(f"plan not found or unchanged: {e.plan_id}")
+                continue
+            if target.status != "in_progress":
+                counts[target.domain] = current + 1
+    finally:
+        conn.close()
+    if errors:
+        raise SystemExit("\n".join(errors))
+    return targets
 
-    updated = _update_plan_registry(root, plan_id, status="in_progress", owner=owner)
-    if not updated:
-        raise SystemExit(f"plan not found or unchanged: {plan_id}")
-    _touch_state_tracker(root)
 
-    # Generate capsule via the context tool (after assignment so metadata is accurate).
-    context_cmd = [str(root / "scripts" / "context"), "make", plan_id]
-    cp = subprocess.run(context_cmd, check=True, capture_output=True, text=True)
-    capsule_path = cp.stdout.strip().splitlines()[-1]
+def _plan_domains(root: Path, plan_ids: list[str]) -> set[str]:
+    conn = plan_registry.open_index(root)
     try:
-        capsule_rel = str(Path(capsule_path).resolve().relative_to(root))
-    except Exception:
-        capsule_rel = capsule_path
+        marks = ",".join("?" * len(plan_ids))
+        return {r[0] for r in conn.execute(f"SELECT DISTINCT domain FROM plans WHERE id IN ({marks})", plan_ids)}
+    finally:
+        conn.close()
 
-    from_ = args.from_ or "scribe"
-    to = args.to or owner
-    _emit_signal(
+
+def _claim_assignments(root: Path, entries: list[Assignment], *, lock_timeout: float) -> list[Plan]:
+    """Atomically check budgets and journal the assignments.
+
+    Runs under the per-domain locks of every domain in the batch; the
+    registry is re-read inside the lock, so the check sees every assignment
+    committed before it. If a plan changed domain between the lookup and the
+    lock, the locks are re-taken for the new set.
+    """
+
+    domains = _plan_domains(root, [e.plan_id for e in entries])
+    for _ in range(5):
+        try:
+            with plan_registry.domain_locks(root, domains, timeout=lock_timeout):
+                targets = _check_assignments(root, entries)
+                needed = {t.domain for t in targets}
+                if needed <= domains:
+                    # One journal write for every status/owner change.
+                    plan_registry.set_many(
+                        root, [(e.plan_id, {"status": "in_progress", "owner": e.owner}) for e in entries]
+                    )
+                    return targets
+        except plan_registry.LockTimeout as e:
+            raise SystemExit(f"{e}; another assigner is busy, retry shortly")
+        domains |= needed
+    raise SystemExit("plan domains kept changing during assignment; retry")
+
+
+def _assign_many(root: Path, entries: list[Assignment], *, jobs: int, lock_timeout: float = 10.0) -> list[dict]:
+    targets = _claim_assignments(root, entries, lock_timeout=lock_timeout)
+    _touch_state_tracker(root)
+
+    # Build capsules in-process (after assignment so metadata is accurate).
+    built = context.make_capsules(
         root,
-        kind="missive",
-        topic="assignment",
-        claim=f"Assigned {plan_id} to {owner} (context capsule generated)" + (
-            f"; override_reason={args.reason}" if args.override and args.reason else ""
-        ),
-        from_=from_,
-        to=to,
-        evidence=[capsule_rel],
-        asks=["Acknowledge and proceed", "Emit a dead_end or stub if blocked"],
-        next_actions=[f"Read {capsule_rel}", f"Work the item: {plan_id}"],
-        expects_response=True,
+        context.load_items(root, [e.plan_id for e in entries]),
+        jobs=jobs,
+        max_files=5,
+        max_lines=120,
+        recent_signal_limit=5,
     )
+    capsules = [str(path.relative_to(root)) for _, path, _ in built]
+
+    sigs = []
+    for e, target, capsule_rel in zip(entries, targets, capsules):
+        sigs.append(
+            _signal_doc(
+                kind="missive",
+                topic="assignment",
+                claim=f"Assigned {e.plan_id} to {e.owner} (context capsule generated)" + (
+                    f"; override_reason={e.reason}" if e.override and e.reason else ""
+                ),
+                from_=e.from_,
+                to=e.to,
+                evidence=[capsule_rel],
+                asks=["Acknowledge and proceed", "Emit a dead_end or stub if blocked"],
+                next_actions=[f"Read {capsule_rel}", f"Work the item: {e.plan_id}"],
+                expects_response=True,
+            )
+        )
+        if e.override and e.reason:
+            sigs.append(
+                _signal_doc(
+                    kind="council_call",
+                    topic="budget_override",
+                    claim=f"Budget override used for domain={target.domain} on {e.plan_id}: {e.reason}",
+                    from_=e.from_,
+                    to="council",
+                    urgency="high",
+                    evidence=[capsule_rel],
+                    expects_response=False,
+                )
+            )
+    _write_signals(root, sigs)
 
-    if args.override and args.reason:
-        _emit_signal(
-            root,
-            kind="council_call",
-            topic="budget_override",
-            claim=f"Budget override used for domain={target.domain} on {plan_id}: {args.reason}",
-            from_=from_,
-            to="council",
-            urgency="high",
-            evidence=[capsule_rel],
-            expects_response=False,
+    return [
+        {"ok": True, "plan_id": e.plan_id, "owner": e.owner, "status": "in_progress", "capsule": capsule_rel}
+        for e, capsule_rel in zip(entries, capsules)
+    ]
+
+
+def _read_batch(path: str, args: argparse.Namespace) -> list[Assignment]:
+    """NDJSON, one object per line: plan_id, owner, and optionally to/from/override/reason.
+
+    Missing fields fall back to the command-line flags.
+    """
+
+    text = sys.stdin.read() if path == "-" else Path(path).read_text(encoding="utf-8")
+    out: list[Assignment] = []
+    for n, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            raise SystemExit(f"{path}:{n}: invalid JSON: {e}")
+        owner = rec.get("owner") or args.owner
+        if not rec.get("plan_id") or not owner:
+            raise SystemExit(f"{path}:{n}: plan_id and owner are required")
+        out.append(
+            Assignment(
+                plan_id=str(rec["plan_id"]),
+                owner=str(owner),
+                from_=str(rec.get("from") or args.from_ or "scribe"),
+                to=str(rec.get("to") or args.to or owner),
+                override=bool(rec.get("override", args.override)),
+                reason=str(rec.get("reason") or args.reason or ""),
+            )
         )
+    return out
+
+
+def cmd_assign(args: argparse.Namespace) -> int:
+    """Assign a work item with just-enough context.
+
+    Steps:
+    - set owner + status=in_progress
+    - generate a context capsule and link it
+    - emit a missive to the assignee with capsule path as evidence
+
+    With --batch, every line of an NDJSON file is one assignment; the batch
+    is validated as a whole, then applied with one registry write, capsules
+    built concurrently and all signals written together.
+    """
+
+    root = _resolve_root()
+    if args.batch:
+        if args.plan_id:
+            raise SystemExit("give either a plan_id or --batch, not both")
+        entries = _read_batch(args.batch, args)
+        if not entries:
+            raise SystemExit(f"no assignments in {args.batch}")
+        results = _assign_many(root, entries, jobs=args.jobs, lock_timeout=args.lock_timeout)
+        print(json.dumps({"ok": True, "assigned": results}, indent=2))
+        return 0
 
-    print(json.dumps({"ok": True, "plan_id": plan_id, "owner": owner, "status": "in_progress", "capsule": capsule_rel}, indent=2))
+    if not args.plan_id:
+        raise SystemExit("plan_id is required (or use --batch)")
+    if not args.owner:
+        raise SystemExit("--owner is required")
+    entry = Assignment(
+        plan_id=args.plan_id,
+        owner=args.owner,
+        from_=args.from_ or "scribe",
+        to=args.to or args.owner,
+        override=bool(args.override),
+        reason=args.reason or "",
+    )
+    print(json.dumps(_assign_many(root, [entry], jobs=1, lock_timeout=args.lock_timeout)[0], indent=2))
     return 0
 
 
+def budget_usage(root: Path, conn: sqlite3.Connection | None = None) -> dict:
+    own = conn is None
+    if conn is None:
+        conn = plan_registry.open_index(root)
+    try:
+        counts = plan_registry.count_by_domain(conn, "in_progress")
+    finally:
+        if own:
+            conn.close()
+    return {
+        "budgets": _read_budgets(root),
+        "in_progress_by_domain": counts,
+    }
+
+
 def cmd_budgets(args: argparse.Namespace) -> int:
     root = _resolve_root()
-    plans = load_plans(root)
-    budgets = _read_budgets(root)
-    counts = _count_in_progress_by_domain(plans)
-    out = {
-        "budgets": budgets,
-        "in_progress_by_domain": counts,
+    print(json.dumps(budget_usage(root), indent=2, sort_keys=True))
+    return 0
+
+
+def graph_summary(conn: sqlite3.Connection) -> dict:
+    """Dependency graph overview; `conn` must come from open_scheduler()."""
+
+    edges: dict[str, list[str]] = {r[0]: [] for r in conn.execute("SELECT id FROM sched_nodes")}
+    missing: dict[str, list[str]] = {}
+    for pid, dep in conn.execute("SELECT id, dep FROM sched_edges ORDER BY id, dep"):
+        edges[pid].append(dep)
+        if dep not in edges:
+            missing.setdefault(pid, []).append(dep)
+    ready = conn.execute(
+        "SELECT COUNT(*) FROM sched_nodes s JOIN plans p ON p.id = s.id "
+        "WHERE s.unmet = 0 AND p.status IN ('pending', 'blocked')"
+    ).fetchone()[0]
+    waiting = conn.execute("SELECT COUNT(*) FROM sched_nodes WHERE unmet > 0 AND done = 0").fetchone()[0]
+    longest = conn.execute("SELECT id, cp FROM sched_nodes ORDER BY cp DESC, id LIMIT 1").fetchone()
+    return {
+        "nodes": len(edges),
+        "edges": sum(len(v) for v in edges.values()),
+        "ready": ready,
+        "waiting_on_deps": waiting,
+        "critical_path": {"from": longest[0], "length": longest[1]} if longest else None,
+        "cycles": _find_cycles(edges),
+        "missing_deps": missing,
     }
+
+
+def cmd_graph(args: argparse.Namespace) -> int:
+    conn = open_scheduler(_resolve_root())
+    try:
+        out = graph_summary(conn)
+    finally:
+        conn.close()
     print(json.dumps(out, indent=2, sort_keys=True))
     return 0
 
 
+def cmd_compact(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    res = plan_registry.compact(root)
+    print(json.dumps({"ok": True, **res}, indent=2, sort_keys=True))
+    return 0
+
+
 def cmd_start(args: argparse.Namespace) -> int:
     args.status = "in_progress"
     return cmd_set(args)
@@ -573,7 +965,331 @@ def cmd_block(args: argparse.Namespace) -> int:
     return cmd_set(args)
 
 
-def main(argv: list[str]) -> int:
+# --- Resident service -----------------------------------------------------
+#
+# `orchestrate serve` keeps one process alive behind a Unix socket. It holds
+# the parsed plans, scheduler ranks, budgets and state in a _Snapshot that the
+# watcher thread replaces whenever a watched file changes; requests are
+# answered from the current snapshot without touching disk. Requests and
+# responses are single JSON lines:
+#   {"op": "run", "root": ..., "argv": [...]} -> {"code", "stdout", "stderr"}
+#   {"op": "subscribe"}                       -> a stream of change events
+# Only read-only commands are served; writers keep running locally and the
+# server notices their effect through the files they touch.
+
+SERVED_COMMANDS = {"status", "next", "active", "budgets", "graph"}
+
+
+def _socket_path(root: Path) -> Path:
+    return root / ".substrate" / "state" / "orchestrator.sock"
+
+
+def _watched_files(root: Path) -> list[Path]:
+    return [
+        plan_registry.registry_path(root),
+        plan_registry.journal_path(root),
+        root / ".substrate" / "constants" / "budgets.yaml",
+        root / "tools" / "state-tracker" / "state.yaml",
+        root / ".substrate" / "state" / "health.json",
+    ]
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    plans: list[Plan]  # every plan, in (priority rank, domain rank, id) order
+    sched: dict[str, tuple[int, int]]  # id -> (unmet, cp)
+    budgets: dict
+    state: dict
+    graph: dict
+
+
+def _match(p: Plan, args: argparse.Namespace) -> bool:
+    # Same filters as plan_registry.query_items(); LIKE is case-insensitive.
+    if (args.kind and p.kind != args.kind) or (args.owner and p.owner != args.owner):
+        return False
+    if args.domain and p.domain != args.domain:
+        return False
+    if args.text:
+        t = args.text.lower()
+        return t in p.id.lower() or t in p.title.lower() or t in p.notes.lower()
+    return True
+
+
+class _Service:
+    def __init__(self, root: Path, parser: argparse.ArgumentParser, poll: float) -> None:
+        self.root = root
+        self.parser = parser
+        self.poll = poll
+        self.snap: _Snapshot | None = None  # replaced whole by the watcher, never mutated
+        self.ready = threading.Event()
+        self.subs: list[socket.socket] = []
+        self.subs_lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def load(self, conn: sqlite3.Connection, *, plans: bool = True, budgets: bool = True, state: bool = True) -> None:
+        """Rebuild the parts of the snapshot whose files changed; `conn` comes from open_scheduler()."""
+
+        old = self.snap
+        if plans or old is None:
+            _sched_sync(conn)
+            plan_list = [_plan_from_item(it) for it in plan_registry.query_items(conn)]
+            sched = {r[0]: (r[1], r[2]) for r in conn.execute("SELECT id, unmet, cp FROM sched_nodes")}
+            graph = graph_summary(conn)
+        else:
+            plan_list, sched, graph = old.plans, old.sched, old.graph
+        self.snap = _Snapshot(
+            plans=plan_list,
+            sched=sched,
+            budgets=_read_budgets(self.root) if budgets or old is None else old.budgets,
+            state=load_state(self.root) if state or old is None else old.state,
+            graph=graph,
+        )
+        self.ready.set()
+
+    def answer(self, args: argparse.Namespace, snap: _Snapshot) -> str:
+        if args.cmd == "status":
+            return _status_text(snap.state, args.json)
+        if args.cmd == "budgets":
+            counts: dict[str, int] = {}
+            for p in snap.plans:
+                if p.status == "in_progress":
+                    counts[p.domain] = counts.get(p.domain, 0) + 1
+            return json.dumps({"budgets": snap.budgets, "in_progress_by_domain": counts}, indent=2, sort_keys=True)
+        if args.cmd == "graph":
+            return json.dumps(snap.graph, indent=2, sort_keys=True)
+        if args.cmd == "active":
+            out = [p for p in snap.plans if p.status == "in_progress" and _match(p, args)]
+        elif args.all:
+            out = [p for p in snap.plans if p.status in ("pending", "blocked") and _match(p, args)]
+        else:
+            out = [
+                p
+                for p in snap.plans
+                if p.status in ("pending", "blocked") and snap.sched.get(p.id, (1, 0))[0] == 0 and _match(p, args)
+            ]
+            # Stable sort keeps the (priority, domain, id) order within equal cp.
+            out.sort(key=lambda p: -snap.sched[p.id][1])
+        return _plans_text(out, args.json, args.limit)
+
+    def run(self, argv: list[str]) -> dict:
+        try:
+            args = self.parser.parse_args(argv)
+        except SystemExit:
+            return {"code": 2, "stdout": "", "stderr": f"invalid arguments: {argv}\n"}
+        if args.cmd not in SERVED_COMMANDS:
+            return {"code": 1, "stdout": "", "stderr": f"not served: {args.cmd}\n"}
+        try:
+            text = self.answer(args, self.snap)
+        except Exception:
+            return {"code": 1, "stdout": "", "stderr": traceback.format_exc()}
+        return {"code": 0, "stdout": text + "\n", "stderr": ""}
+
+    def publish(self, event: dict) -> None:
+        line = (json.dumps(event, sort_keys=True) + "\n").encode("utf-8")
+        with self.subs_lock:
+            alive = []
+            for conn in self.subs:
+                try:
+                    conn.sendall(line)
+                    alive.append(conn)
+                except OSError:
+                    conn.close()
+            self.subs = alive
+
+    def watch(self) -> None:
+        files = _watched_files(self.root)
+        stamps = {p: _file_stamp(p) for p in files}
+        conn = open_scheduler(self.root)
+        self.load(conn)
+        rev = plan_registry.changes_since(conn, 1 << 62)[2]
+        epoch = plan_registry.index_epoch(conn)
+        try:
+            while not self.stop.wait(self.poll):
+                changed = [p for p in files if _file_stamp(p) != stamps[p]]
+                if not changed:
+                    continue
+                for p in changed:
+                    stamps[p] = _file_stamp(p)
+                event: dict = {
+                    "event": "change",
+                    "ts": _utc_now_rfc3339(),
+                    "files": [str(p.relative_to(self.root)) for p in changed],
+                }
+                plan_files = {plan_registry.registry_path(self.root), plan_registry.journal_path(self.root)}
+                plans_changed = bool(plan_files & set(changed))
+                if plans_changed:
+                    plan_registry.sync_index(self.root, conn)
+                    if plan_registry.index_epoch(conn) != epoch:
+                        epoch = plan_registry.index_epoch(conn)
+                        rev = 0
+                    ids, removed, rev = plan_registry.changes_since(conn, rev)
+                    rows = []
+                    for pid in ids[:500]:
+                        r = conn.execute("SELECT id, status, owner, domain FROM plans WHERE id=?", (pid,)).fetchone()
+                        if r is not None:
+                            rows.append({"id": r[0], "status": r[1], "owner": r[2], "domain": r[3]})
+                    event["plans"] = rows
+                    event["removed"] = removed
+                    event["truncated"] = len(ids) > 500
+                self.load(
+                    conn,
+                    plans=plans_changed,
+                    budgets=files[2] in changed,
+                    state=bool({files[3], files[4]} & set(changed)),
+                )
+                self.publish(event)
+        finally:
+            conn.close()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        svc: _Service = self.server.service  # type: ignore[attr-defined]
+        for raw in self.rfile:
+            try:
+                req = json.loads(raw)
+            except ValueError:
+                return
+            op = req.get("op")
+            if op == "run":
+                if str(req.get("root")) != str(svc.root):
+                    resp = {"code": 2, "stdout": "", "stderr": f"server root is {svc.root}\n"}
+                else:
+                    resp = svc.run([str(a) for a in req.get("argv", [])])
+                self.wfile.write((json.dumps(resp) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            elif op == "ping":
+                self.wfile.write((json.dumps({"ok": True, "pid": os.getpid()}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            elif op == "subscribe":
+                self.wfile.write((json.dumps({"event": "subscribed", "ts": _utc_now_rfc3339()}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                with svc.subs_lock:
+                    svc.subs.append(self.connection)
+                # Park until the client goes away; events are pushed by the watcher.
+                while not svc.stop.is_set():
+                    try:
+                        if not self.connection.recv(1):
+                            break
+                    except OSError:
+                        break
+                return
+            else:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _connect(root: Path, timeout: float = 2.0) -> socket.socket | None:
+    path = _socket_path(root)
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _run_via_server(root: Path, argv: list[str]) -> int | None:
+    """Run a read-only command on a resident server; None if none is usable."""
+
+    if os.environ.get("ASF_ORCHESTRATE_LOCAL"):
+        return None
+    sock = _connect(root)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile("rwb") as f:
+            f.write((json.dumps({"op": "run", "root": str(root), "argv": argv}) + "\n").encode("utf-8"))
+            f.flush()
+            line = f.readline()
+        resp = json.loads(line)
+    except (OSError, ValueError):
+        return None
+    if resp.get("code") == 2 and str(resp.get("stderr", "")).startswith("server root is"):
+        return None
+    sys.stdout.write(resp.get("stdout", ""))
+    sys.stderr.write(resp.get("stderr", ""))
+    return int(resp.get("code", 1))
+
+
+def _stop_on_sigterm(signum, frame) -> None:
+    # Unwind serve_forever() so the socket file is removed.
+    raise KeyboardInterrupt
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    path = _socket_path(root)
+    probe = _connect(root)
+    if probe is not None:
+        probe.close()
+        raise SystemExit(f"already serving on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        path.unlink()  # stale socket from a crashed server
+    except FileNotFoundError:
+        pass
+
+    svc = _Service(root, _build_parser(), args.poll)
+    server = _Server(str(path), _Handler)
+    server.service = svc  # type: ignore[attr-defined]
+    watcher = threading.Thread(target=svc.watch, name="orchestrate-watch", daemon=True)
+    watcher.start()
+    while not svc.ready.wait(0.1):
+        if not watcher.is_alive():
+            server.server_close()
+            path.unlink()
+            raise SystemExit("orchestrate serve: failed to load the plan registry")
+    signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    print(json.dumps({"ok": True, "socket": str(path), "pid": os.getpid()}), flush=True)
+    try:
+        server.serve_forever(poll_interval=0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        svc.stop.set()
+        server.server_close()
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+def cmd_subscribe(args: argparse.Namespace) -> int:
+    root = _resolve_root()
+    sock = _connect(root)
+    if sock is None:
+        raise SystemExit("no orchestrate server running (start one with: ./scripts/orchestrate serve)")
+    sock.settimeout(None)
+    try:
+        with sock, sock.makefile("rwb") as f:
+            f.write(b'{"op": "subscribe"}\n')
+            f.flush()
+            for line in f:
+                sys.stdout.write(line.decode("utf-8"))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="orchestrator")
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -585,12 +1301,19 @@ def main(argv: list[str]) -> int:
     p_next.add_argument("--json", action="store_true")
     p_next.add_argument("--limit", type=int, default=25)
     p_next.add_argument("--kind", choices=["plan", "issue", "bug", "dead_end", "stub"])
+    p_next.add_argument("--owner", help="only items with this owner")
+    p_next.add_argument("--domain", help="only items in this domain")
+    p_next.add_argument("--text", help="substring match on id, title or notes")
+    p_next.add_argument("--all", action="store_true", help="include items still waiting on dependencies")
     p_next.set_defaults(fn=cmd_next)
 
     p_active = sub.add_parser("active", help="list in_progress work")
     p_active.add_argument("--json", action="store_true")
     p_active.add_argument("--limit", type=int, default=50)
     p_active.add_argument("--kind", choices=["plan", "issue", "bug", "dead_end", "stub"])
+    p_active.add_argument("--owner", help="only items with this owner")
+    p_active.add_argument("--domain", help="only items in this domain")
+    p_active.add_argument("--text", help="substring match on id, title or notes")
     p_active.set_defaults(fn=cmd_active)
 
     p_set = sub.add_parser("set", help="set a plan status/owner")
@@ -623,8 +1346,11 @@ def main(argv: list[str]) -> int:
     p_block.set_defaults(fn=cmd_block)
 
     p_assign = sub.add_parser("assign", help="assign a plan with a context capsule")
-    p_assign.add_argument("plan_id")
-    p_assign.add_argument("--owner", required=True)
+    p_assign.add_argument("plan_id", nargs="?")
+    p_assign.add_argument("--owner")
+    p_assign.add_argument("--batch", metavar="FILE", help="NDJSON assignments, one per line ('-' for stdin)")
+    p_assign.add_argument("--jobs", type=int, default=min(8, os.cpu_count() or 1), help="capsule build workers")
+    p_assign.add_argument("--lock-timeout", type=float, default=10.0, help="seconds to wait for domain budget locks")
     p_assign.add_argument("--from", dest="from_")
     p_assign.add_argument("--to")
     p_assign.add_argument("--override", action="store_true")
@@ -634,7 +1360,29 @@ def main(argv: list[str]) -> int:
     p_budgets = sub.add_parser("budgets", help="show concurrency budgets and usage")
     p_budgets.set_defaults(fn=cmd_budgets)
 
+    p_graph = sub.add_parser("graph", help="dependency graph summary (ready set, cycles, missing deps)")
+    p_graph.set_defaults(fn=cmd_graph)
+
+    p_compact = sub.add_parser("compact", help="fold the registry journal into plans.yaml")
+    p_compact.set_defaults(fn=cmd_compact)
+
+    p_serve = sub.add_parser("serve", help="run a resident server for read-only commands")
+    p_serve.add_argument("--poll", type=float, default=0.5, help="seconds between file change checks")
+    p_serve.set_defaults(fn=cmd_serve)
+
+    p_subscribe = sub.add_parser("subscribe", help="stream change events from a running server")
+    p_subscribe.set_defaults(fn=cmd_subscribe)
+
+    return parser
+
+
+def main(argv: list[str]) -> int:
+    parser = _build_parser()
     args = parser.parse_args(argv)
+    if args.cmd in SERVED_COMMANDS:
+        code = _run_via_server(_resolve_root(), argv)
+        if code is not None:
+            return code
     return int(args.fn(args))
 
 
@@ -0,0 +1,942 @@
+#!/usr/bin/env python3
+"""Shared loader for tools/plan-registry/plans.yaml.
+
+Tools import this module (by adding this directory to sys.path) instead of
+re-parsing the registry themselves. Parsed items are cached in a compact
+snapshot sidecar under `.cache/`, validated against the YAML file's size,
+mtime and content hash, so repeated reads cost a `stat` and an unmarshal.
+
+Mutations are not written to plans.yaml directly: they are appended to
+`plans.journal` (one JSON op per line) and readers apply the journal over
+the snapshot. `compact()` folds the journal back into plans.yaml.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import fcntl
+import hashlib
+import json
+import marshal
+import os
+import random
+import re
+import sqlite3
+import stat
+import time
+from pathlib import Path
+
+SNAPSHOT_FORMAT = 3
+
+# Sort ranks stored alongside each indexed item (lower sorts first).
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+DOMAIN_RANK = {"guardian": 0, "watcher": 1, "builder": 2, "scribe": 3, "gems": 4}
+
+
+def _strip_quotes(s: str) -> str:
+    s = s.strip()
+    if len(s) >= 2 and ((s[0] == s[-1] == '"') or (s[0] == s[-1] == "'")):
+        return s[1:-1]
+    return s
+
+
+def parse_yaml_list_of_maps(text: str, list_key: str) -> list[dict]:
+    """Parse a tiny YAML subset: `{list_key}:` followed by `- key: value` items.
+
+    Supported:
+    - top-level `list_key:`
+    - list items as maps
+    - nested `links:` / `depends_on:` lists of strings
+
+    This is not a general YAML parser.
+    """
+
+    lines = text.splitlines()
+    in_list = False
+    items: list[dict] = []
+    cur: dict | None = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        raw = line.rstrip("\n")
+        stripped = raw.strip()
+        i += 1
+
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if not in_list:
+            if stripped == f"{list_key}:":
+                in_list = True
+            continue
+
+        # Item start
+        if stripped.startswith("-") and ":" in stripped:
+            # Close previous
+            if cur is not None:
+                items.append(cur)
+            cur = {}
+
+            # Parse "- key: value"
+            after = stripped[1:].strip()
+            k, v = after.split(":", 1)
+            cur[k.strip()] = _strip_quotes(v.strip())
+            continue
+
+        if cur is None:
+            continue
+
+        # links list
+        if stripped == "links:" or stripped == "depends_on:":
+            key = stripped[:-1]
+            cur.setdefault(key, [])
+            # consume following "- item" lines with greater indent
+            while i < len(lines):
+                nxt = lines[i]
+                nxt_raw = nxt.rstrip("\n")
+                nxt_stripped = nxt_raw.strip()
+                if not nxt_stripped or nxt_stripped.startswith("#"):
+                    i += 1
+                    continue
+                if not nxt_stripped.startswith("-"):
+                    break
+                cur[key].append(_strip_quotes(nxt_stripped[1:].strip()))
+                i += 1
+            continue
+
+        # key: value
+        if ":" in stripped:
+            k, v = stripped.split(":", 1)
+            k, v = k.strip(), v.strip()
+            if k in ("links", "depends_on") and v.startswith("[") and v.endswith("]"):
+                # Inline list (usually `[]`).
+                inner = v[1:-1].strip()
+                cur[k] = [_strip_quotes(x) for x in inner.split(",")] if inner else []
+            else:
+                cur[k] = _strip_quotes(v)
+
+    if cur is not None:
+        items.append(cur)
+    return items
+
+
+def registry_path(root: Path) -> Path:
+    return root / "tools" / "plan-registry" / "plans.yaml"
+
+
+def cache_dir(root: Path) -> Path:
+    return root / "tools" / "plan-registry" / ".cache"
+
+
+def _snapshot_path(root: Path) -> Path:
+    return cache_dir(root) / "plans.snapshot"
+
+
+def _read_snapshot(path: Path, accept) -> tuple[dict, list[dict]] | None:
+    """Return (header, items) if the snapshot header passes `accept`.
+
+    The header is a separate marshal record so a stale snapshot costs only
+    a few bytes of reading, not an unmarshal of every item.
+    """
+
+    try:
+        with path.open("rb") as f:
+            header = marshal.load(f)
+            if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT or not accept(header):
+                return None
+            items = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return header, items
+
+
+def _write_snapshot(path: Path, header: dict, items: list[dict]) -> None:
+    # Best effort: a read-only checkout still works, just without the cache.
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            marshal.dump(header, f)
+            marshal.dump(items, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# In-process memo so long-lived callers skip even the unmarshal.
+_MEMO: dict[str, tuple[int, int, str, list[dict]]] = {}
+
+
+def _load_base(root: Path) -> tuple[list[dict], str]:
+    """Parsed plans.yaml (without the journal) and its sha256."""
+
+    path = registry_path(root)
+    st = path.stat()
+    key = str(path)
+    memo = _MEMO.get(key)
+    if memo is not None and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+        return memo[3], memo[2]
+
+    snap_path = _snapshot_path(root)
+    snap = _read_snapshot(snap_path, lambda h: h.get("size") == st.st_size and h.get("mtime_ns") == st.st_mtime_ns)
+    if snap is not None:
+        items = snap[1]
+        digest = snap[0]["sha256"]
+    else:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        snap = _read_snapshot(snap_path, lambda h: h.get("sha256") == digest)
+        if snap is not None:
+            items = snap[1]
+        else:
+            items = parse_yaml_list_of_maps(data.decode("utf-8"), "plans")
+        _write_snapshot(
+            snap_path,
+            {"format": SNAPSHOT_FORMAT, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest},
+            items,
+        )
+
+    _MEMO[key] = (st.st_size, st.st_mtime_ns, digest, items)
+    return items, digest
+
+
+# --- Journal --------------------------------------------------------------
+
+# Auto-compact once the journal grows past this many bytes.
+COMPACT_AFTER_BYTES = int(os.environ.get("ASF_PLAN_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+
+
+def journal_path(root: Path) -> Path:
+    return root / "tools" / "plan-registry" / "plans.journal"
+
+
+def _lock_path(root: Path) -> Path:
+    return cache_dir(root) / "plans.lock"
+
+
+def _open_lock(root: Path) -> int:
+    path = _lock_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+
+
+def _journal_size(root: Path) -> int:
+    try:
+        return journal_path(root).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def read_journal(root: Path, offset: int = 0) -> tuple[list[dict], int, str]:
+    """Ops appended after `offset`, the offset past the last full line, and
+    the journal's identity (hash of its first line).
+
+    Offsets are only meaningful within one journal; after a compaction the
+    next journal starts with a different first op, so callers holding an
+    offset must check the identity before trusting it.
+    """
+
+    try:
+        with journal_path(root).open("rb") as f:
+            first = f.readline()
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0, ""
+    head = hashlib.sha1(first).hexdigest() if first.endswith(b"\n") else ""
+    end = data.rfind(b"\n") + 1
+    ops: list[dict] = []
+    for line in data[:end].splitlines():
+        try:
+            op = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(op, dict) and op.get("op") in _OPS:
+            ops.append(op)
+    return ops, offset + end, head
+
+
+def _op_set(it: dict | None, op: dict) -> dict | None:
+    if it is None:
+        return None
+    out = dict(it)
+    out.update({k: str(v) for k, v in (op.get("fields") or {}).items()})
+    return out
+
+
+def _op_add_link(it: dict | None, op: dict) -> dict | None:
+    if it is None:
+        return None
+    links = it.get("links")
+    links = list(links) if isinstance(links, list) else []
+    if op["link"] in links:
+        return it
+    out = dict(it)
+    out["links"] = links + [op["link"]]
+    return out
+
+
+def _op_append(it: dict | None, op: dict) -> dict | None:
+    # Appending an id that already exists is a no-op.
+    return it if it is not None else dict(op["item"])
+
+
+_OPS = {"set": _op_set, "add_link": _op_add_link, "append": _op_append}
+
+
+def apply_op(it: dict | None, op: dict) -> dict | None:
+    """Apply one journal op to an item (None if absent); returns the new item.
+
+    Ops are idempotent, so replaying a journal that was already folded into
+    plans.yaml (a reader racing a compaction) yields the same items.
+    """
+
+    return _OPS[op["op"]](it, op)
+
+
+def _op_id(op: dict) -> str:
+    return str(op["item"].get("id", "")) if op["op"] == "append" else str(op.get("id", ""))
+
+
+def _apply_ops(items: list[dict], pos: dict[str, int], ops: list[dict]) -> None:
+    for op in ops:
+        item_id = _op_id(op)
+        i = pos.get(item_id)
+        new = apply_op(items[i] if i is not None else None, op)
+        if new is None:
+            continue
+        if i is None:
+            pos[item_id] = len(items)
+            items.append(new)
+        else:
+            items[i] = new
+
+
+# Journal-applied view: path -> (base size, base mtime_ns, journal head, journal offset, items, id -> position).
+_VIEW: dict[str, tuple[int, int, str, int, list[dict], dict[str, int]]] = {}
+
+
+def load_items(root: Path) -> list[dict]:
+    """Return the registry items (list of dicts) with the journal applied.
+
+    Validation order: (size, mtime_ns) match -> use snapshot; otherwise hash
+    the file and, if the content is unchanged, refresh the snapshot's stat
+    without parsing; only a real content change re-parses the YAML.
+    Journal ops are then applied on top; a process that already holds a view
+    only replays the ops appended since. Callers must treat the returned
+    dicts as read-only.
+    """
+
+    st = registry_path(root).stat()
+    key = str(registry_path(root))
+    jsize = _journal_size(root)
+    view = _VIEW.get(key)
+    if view is not None and view[0] == st.st_size and view[1] == st.st_mtime_ns:
+        if jsize == view[3]:
+            return view[4]
+        ops, offset, head = read_journal(root, view[3])
+        if head == view[2] or view[3] == 0:
+            items, pos = list(view[4]), dict(view[5])
+            _apply_ops(items, pos, ops)
+            _VIEW[key] = (st.st_size, st.st_mtime_ns, head, offset, items, pos)
+            return items
+
+    base, _ = _load_base(root)
+    items = list(base)
+    pos: dict[str, int] = {}
+    for i, it in enumerate(items):
+        pos.setdefault(str(it.get("id", "")), i)
+    ops, offset, head = read_journal(root)
+    _apply_ops(items, pos, ops)
+    _VIEW[key] = (st.st_size, st.st_mtime_ns, head, offset, items, pos)
+    return items
+
+
+def find_item(root: Path, item_id: str) -> dict | None:
+    """Look up one item (journal applied) through the SQLite index."""
+
+    conn = open_index(root)
+    try:
+        row = conn.execute("SELECT * FROM plans WHERE id=?", (item_id,)).fetchone()
+    finally:
+        conn.close()
+    return index_row_to_item(row) if row is not None else None
+
+
+def _write_ops(root: Path, ops: list[dict]) -> None:
+    # Caller holds the registry lock.
+    ts = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    data = b"".join(
+        (json.dumps({"ts": ts, **op}, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8") for op in ops
+    )
+    fd = os.open(str(journal_path(root)), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        # One write per batch keeps a batch contiguous in the journal.
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _append_ops(root: Path, ops: list[dict]) -> None:
+    if not ops:
+        return
+    lock = _open_lock(root)
+    try:
+        # Shared: many writers may append at once; compaction takes it exclusively.
+        fcntl.flock(lock, fcntl.LOCK_SH)
+        _write_ops(root, ops)
+    finally:
+        os.close(lock)
+    if _journal_size(root) >= COMPACT_AFTER_BYTES:
+        compact(root, wait=False)
+
+
+def _append_op(root: Path, op: dict) -> None:
+    _append_ops(root, [op])
+
+
+class LockTimeout(RuntimeError):
+    pass
+
+
+@contextlib.contextmanager
+def domain_locks(root: Path, domains, *, timeout: float = 10.0):
+    """Hold exclusive advisory locks for `domains` (one lock file per domain).
+
+    Budget checks run inside this critical section and the journal write
+    lands before it is released, so concurrent assigners for the same domain
+    cannot both pass a check, while other domains proceed in parallel.
+    Locks are tried in sorted order without blocking; on contention
+    everything is released and retried with jittered exponential backoff
+    until `timeout`, then LockTimeout is raised.
+    """
+
+    lock_dir = cache_dir(root) / "locks"
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    names = sorted({re.sub(r"[^A-Za-z0-9_.-]+", "_", str(d)) or "_" for d in domains})
+    deadline = time.monotonic() + timeout
+    delay = 0.005
+    while True:
+        held: list[int] = []
+        try:
+            for name in names:
+                fd = os.open(str(lock_dir / f"domain-{name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    raise
+                held.append(fd)
+        except BlockingIOError:
+            for fd in held:
+                os.close(fd)
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"timed out waiting for domain lock(s): {', '.join(names)}")
+            time.sleep(delay * (0.5 + random.random()))
+            delay = min(delay * 2, 0.25)
+            continue
+        try:
+            yield
+        finally:
+            for fd in held:
+                os.close(fd)
+        return
+
+
+def set_fields(root: Path, item_id: str, **fields: str | None) -> bool:
+    """Journal a field update. Returns False if the item is missing or unchanged."""
+
+    cur = find_item(root, item_id)
+    if cur is None:
+        return False
+    fields = {k: v for k, v in fields.items() if v is not None and str(cur.get(k, "")) != v}
+    if not fields:
+        return False
+    _append_op(root, {"op": "set", "id": item_id, "fields": fields})
+    return True
+
+
+def add_link(root: Path, item_id: str, link: str) -> bool:
+    """Journal a link addition. Returns False if the item is missing or already linked."""
+
+    cur = find_item(root, item_id)
+    if cur is None or link in cur.get("links", []):
+        return False
+    _append_op(root, {"op": "add_link", "id": item_id, "link": link})
+    return True
+
+
+def set_many(root: Path, updates: list[tuple[str, dict[str, str]]]) -> list[str]:
+    """Journal several field updates in one write.
+
+    Returns the ids that changed; missing or unchanged items are skipped.
+    """
+
+    conn = open_index(root)
+    try:
+        ops = []
+        for item_id, fields in updates:
+            row = conn.execute("SELECT * FROM plans WHERE id=?", (item_id,)).fetchone()
+            if row is None:
+                continue
+            cur = index_row_to_item(row)
+            fields = {k: v for k, v in fields.items() if v is not None and str(cur.get(k, "")) != v}
+            if fields:
+                ops.append({"op": "set", "id": item_id, "fields": fields})
+    finally:
+        conn.close()
+    _append_ops(root, ops)
+    return [op["id"] for op in ops]
+
+
+def add_links(root: Path, links: list[tuple[str, str]]) -> None:
+    """Journal several (item_id, link) additions in one write."""
+
+    _append_ops(root, [{"op": "add_link", "id": item_id, "link": link} for item_id, link in links])
+
+
+def append_item(root: Path, item: dict) -> bool:
+    """Journal a new item. Returns False if the id already exists."""
+
+    lock = _open_lock(root)
+    try:
+        # Exclusive, so two writers cannot both pass the check for one id.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if find_item(root, str(item.get("id", ""))) is not None:
+            return False
+        _write_ops(root, [{"op": "append", "item": item}])
+    finally:
+        os.close(lock)
+    if _journal_size(root) >= COMPACT_AFTER_BYTES:
+        compact(root, wait=False)
+    return True
+
+
+# --- Compaction -----------------------------------------------------------
+
+
+def _line_item_id(line: str) -> str | None:
+    s = line.strip()
+    if not (s.startswith("-") and "id:" in s):
+        return None
+    k, _, v = s[1:].strip().partition(":")
+    if k.strip() != "id":
+        return None
+    return _strip_quotes(v.strip())
+
+
+def _text_set(chunk: list[str], key: str, value: str) -> list[str]:
+    # Rewrite the first `key:` line, drop duplicates, insert after title if missing.
+    indent = " " * (len(chunk[0]) - len(chunk[0].lstrip(" ")) + 2)
+    out: list[str] = []
+    seen = False
+    for ln in chunk:
+        if ln.strip().startswith(f"{key}:"):
+            if not seen:
+                out.append(f"{indent}{key}: \"{value}\"\n")
+                seen = True
+            continue
+        out.append(ln)
+    if not seen:
+        insert_at = 1
+        for idx, ln in enumerate(out):
+            if ln.strip().startswith("title:"):
+                insert_at = idx + 1
+                break
+        out[insert_at:insert_at] = [f"{indent}{key}: \"{value}\"\n"]
+    return out
+
+
+def _text_add_link(chunk: list[str], link: str) -> list[str]:
+    base_indent = " " * (len(chunk[0]) - len(chunk[0].lstrip(" ")) + 2)
+    link_indent = base_indent + "  "
+    item = list(chunk)
+    for ln in item:
+        if ln.strip() in (f"- \"{link}\"", f"- '{link}'", f"- {link}"):
+            return item
+    for idx, ln in enumerate(item):
+        if ln.strip() == "links: []":
+            item[idx] = f"{base_indent}links:\n"
+            item[idx + 1:idx + 1] = [f"{link_indent}- \"{link}\"\n"]
+            return item
+        if ln.strip() == "links:":
+            insert_at = idx + 1
+            while insert_at < len(item) and item[insert_at].strip().startswith("-"):
+                insert_at += 1
+            item[insert_at:insert_at] = [f"{link_indent}- \"{link}\"\n"]
+            return item
+    insert_at = 1
+    for idx, ln in enumerate(item):
+        if ln.strip().startswith("title:"):
+            insert_at = idx + 1
+            break
+    item[insert_at:insert_at] = [f"{base_indent}links:\n", f"{link_indent}- \"{link}\"\n"]
+    return item
+
+
+def _text_item(item: dict) -> list[str]:
+    block = [f"  - id: \"{item.get('id', '')}\"\n"]
+    for key in ("title", "kind", "mode", "status", "owner", "domain", "priority"):
+        if key in item:
+            block.append(f"    {key}: \"{item[key]}\"\n")
+    for key in ("links", "depends_on"):
+        vals = item.get(key) or []
+        if vals:
+            block.append(f"    {key}:\n")
+            block.extend(f"      - \"{v}\"\n" for v in vals)
+        else:
+            block.append(f"    {key}: []\n")
+    block.append(f"    notes: \"{item.get('notes', '')}\"\n")
+    return block
+
+
+def _fold_text(text: str, ops: list[dict]) -> str:
+    lines = text.splitlines(True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    head: list[str] = []
+    chunks: list[list[str]] = []
+    pos: dict[str, int] = {}
+    for ln in lines:
+        item_id = _line_item_id(ln)
+        if item_id is not None:
+            pos.setdefault(item_id, len(chunks))
+            chunks.append([ln])
+        elif chunks:
+            chunks[-1].append(ln)
+        else:
+            head.append(ln)
+
+    for op in ops:
+        item_id = _op_id(op)
+        i = pos.get(item_id)
+        if op["op"] == "append":
+            if i is None:
+                tail = chunks[-1] if chunks else head
+                if tail and tail[-1].strip():
+                    tail.append("\n")
+                pos[item_id] = len(chunks)
+                chunks.append(_text_item(op["item"]))
+        elif i is not None and op["op"] == "set":
+            for k, v in (op.get("fields") or {}).items():
+                chunks[i] = _text_set(chunks[i], k, str(v))
+        elif i is not None and op["op"] == "add_link":
+            chunks[i] = _text_add_link(chunks[i], op["link"])
+    return "".join(head) + "".join("".join(c) for c in chunks)
+
+
+def compact(root: Path, *, wait: bool = True) -> dict:
+    """Fold the journal into plans.yaml and remove it.
+
+    Runs under an exclusive lock so no append can land between reading the
+    journal and removing it. With wait=False a busy lock skips compaction.
+    """
+
+    lock = _open_lock(root)
+    try:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return {"compacted": False, "ops": 0}
+        ops, _, _ = read_journal(root)
+        if ops:
+            path = registry_path(root)
+            text = _fold_text(path.read_text(encoding="utf-8"), ops)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                # Keep the committed file's mode (the umask may be stricter).
+                os.fchmod(f.fileno(), stat.S_IMODE(path.stat().st_mode))
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        try:
+            journal_path(root).unlink()
+        except FileNotFoundError:
+            pass
+        return {"compacted": True, "ops": len(ops)}
+    finally:
+        os.close(lock)
+
+
+# --- SQLite index ---------------------------------------------------------
+
+INDEX_COLUMNS = ("id", "title", "kind", "mode", "status", "owner", "domain", "priority", "links", "depends_on", "notes")
+
+
+def index_path(root: Path) -> Path:
+    return cache_dir(root) / "plans.sqlite"
+
+
+def _index_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+          key TEXT PRIMARY KEY,
+          value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS plans (
+          id TEXT PRIMARY KEY,
+          ord INTEGER NOT NULL,
+          title TEXT NOT NULL,
+          kind TEXT NOT NULL,
+          mode TEXT NOT NULL,
+          status TEXT NOT NULL,
+          owner TEXT NOT NULL,
+          domain TEXT NOT NULL,
+          priority TEXT NOT NULL,
+          prio_rank INTEGER NOT NULL,
+          domain_rank INTEGER NOT NULL,
+          links TEXT NOT NULL,
+          depends_on TEXT NOT NULL,
+          notes TEXT NOT NULL,
+          item_hash TEXT NOT NULL,
+          rev INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS removed (
+          id TEXT PRIMARY KEY,
+          rev INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_plans_status_rank ON plans(status, prio_rank, domain_rank, id);
+        CREATE INDEX IF NOT EXISTS idx_plans_domain_status ON plans(domain, status);
+        CREATE INDEX IF NOT EXISTS idx_plans_owner_status ON plans(owner, status);
+        CREATE INDEX IF NOT EXISTS idx_plans_priority ON plans(priority);
+        CREATE INDEX IF NOT EXISTS idx_plans_rev ON plans(rev);
+        CREATE INDEX IF NOT EXISTS idx_removed_rev ON removed(rev);
+        """
+    )
+
+
+def _index_row(ord_: int, it: dict) -> tuple:
+    priority = str(it.get("priority", "medium"))
+    domain = str(it.get("domain", "unassigned"))
+    row = (
+        str(it.get("id", "")),
+        ord_,
+        str(it.get("title", "")),
+        str(it.get("kind", "plan")),
+        str(it.get("mode", "phase")),
+        str(it.get("status", "pending")),
+        str(it.get("owner", "unassigned")),
+        domain,
+        priority,
+        PRIORITY_RANK.get(priority, 1),
+        DOMAIN_RANK.get(domain, 9),
+        json.dumps(list(it.get("links", []) or [])),
+        json.dumps(list(it.get("depends_on", []) or [])),
+        str(it.get("notes", "")),
+    )
+    return row + (hashlib.sha1(repr(row).encode("utf-8")).hexdigest(),)
+
+
+def _meta_get(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _meta_set(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (key, value))
+
+
+INDEX_FORMAT = 3
+
+
+def _write_rows(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    # Every write bumps the index revision so consumers can follow changes.
+    if not rows:
+        return
+    rev = int(_meta_get(conn, "rev") or 0) + 1
+    _meta_set(conn, "rev", str(rev))
+    conn.executemany(f"INSERT OR REPLACE INTO plans VALUES({','.join('?' * 16)})", [r + (rev,) for r in rows])
+    conn.executemany("DELETE FROM removed WHERE id=?", [(r[0],) for r in rows])
+
+
+def _delete_rows(conn: sqlite3.Connection, ids: list[str]) -> None:
+    if not ids:
+        return
+    rev = int(_meta_get(conn, "rev") or 0) + 1
+    _meta_set(conn, "rev", str(rev))
+    conn.executemany("DELETE FROM plans WHERE id=?", [(i,) for i in ids])
+    conn.executemany("INSERT OR REPLACE INTO removed(id, rev) VALUES(?, ?)", [(i, rev) for i in ids])
+
+
+def changes_since(conn: sqlite3.Connection, rev: int) -> tuple[list[str], list[str], int]:
+    """Ids written and ids removed after index revision `rev`, plus the current revision."""
+
+    cur = int(_meta_get(conn, "rev") or 0)
+    changed = [r[0] for r in conn.execute("SELECT id FROM plans WHERE rev > ?", (rev,))]
+    removed = [r[0] for r in conn.execute("SELECT id FROM removed WHERE rev > ?", (rev,))]
+    return changed, removed, cur
+
+
+def index_epoch(conn: sqlite3.Connection) -> str:
+    """Changes whenever the index is rebuilt from scratch (revisions restart)."""
+
+    return _meta_get(conn, "epoch") or ""
+
+
+def _index_apply_ops(conn: sqlite3.Connection, ops: list[dict]) -> int:
+    changed = 0
+    for op in ops:
+        row = conn.execute("SELECT * FROM plans WHERE id=?", (_op_id(op),)).fetchone()
+        cur = index_row_to_item(row) if row is not None else None
+        new = apply_op(cur, op)
+        if new is None or new is cur:
+            continue
+        if row is not None:
+            ord_ = row["ord"]
+        else:
+            ord_ = conn.execute("SELECT COALESCE(MAX(ord), -1) + 1 FROM plans").fetchone()[0]
+        _write_rows(conn, [_index_row(ord_, new)])
+        changed += 1
+    return changed
+
+
+def sync_index(root: Path, conn: sqlite3.Connection) -> dict:
+    """Bring the index in line with plans.yaml plus the journal.
+
+    A matching (size, mtime_ns) and journal offset is a no-op. New journal
+    ops are applied row by row. A changed plans.yaml (e.g. after compaction)
+    is diffed against stored per-row hashes and only changed rows are written.
+    """
+
+    path = registry_path(root)
+    st = path.stat()
+    stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    jsize = _journal_size(root)
+    if _meta_get(conn, "stat") == stamp and _meta_get(conn, "journal_offset") == str(jsize):
+        return {"changed": 0, "removed": 0}
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        changed = removed = 0
+        if _meta_get(conn, "format") != str(INDEX_FORMAT):
+            conn.execute("DELETE FROM plans")
+            conn.execute("DELETE FROM removed")
+            conn.execute("DELETE FROM meta")
+            _meta_set(conn, "format", str(INDEX_FORMAT))
+            _meta_set(conn, "epoch", os.urandom(8).hex())
+
+        base_ok = _meta_get(conn, "stat") == stamp
+        if not base_ok and _meta_get(conn, "sha256") is not None:
+            # A touched-but-identical file only needs its stat refreshed.
+            base_ok = _meta_get(conn, "sha256") == hashlib.sha256(path.read_bytes()).hexdigest()
+            if base_ok:
+                _meta_set(conn, "stat", stamp)
+        offset = int(_meta_get(conn, "journal_offset") or 0)
+        if base_ok:
+            ops, end, head = read_journal(root, offset)
+            base_ok = offset == 0 or head == _meta_get(conn, "journal_head")
+        if base_ok:
+            changed = _index_apply_ops(conn, ops)
+            offset = end
+        else:
+            base, digest = _load_base(root)
+            items = list(base)
+            pos: dict[str, int] = {}
+            for i, it in enumerate(items):
+                pos.setdefault(str(it.get("id", "")), i)
+            ops, offset, head = read_journal(root)
+            _apply_ops(items, pos, ops)
+
+            have = dict(conn.execute("SELECT id, item_hash FROM plans"))
+            seen: set[str] = set()
+            upserts = []
+            for ord_, it in enumerate(items):
+                row = _index_row(ord_, it)
+                if row[0] in seen:
+                    # Mirror first-match semantics of the YAML readers.
+                    continue
+                seen.add(row[0])
+                if have.get(row[0]) != row[-1]:
+                    upserts.append(row)
+            gone = [pid for pid in have if pid not in seen]
+            _write_rows(conn, upserts)
+            _delete_rows(conn, gone)
+            changed, removed = len(upserts), len(gone)
+            _meta_set(conn, "sha256", digest)
+            _meta_set(conn, "stat", stamp)
+        _meta_set(conn, "journal_offset", str(offset))
+        _meta_set(conn, "journal_head", head)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return {"changed": changed, "removed": removed}
+
+
+def open_index(root: Path) -> sqlite3.Connection:
+    """Open (creating if needed) and sync the SQLite plan index."""
+
+    path = index_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    try:
+        fmt = conn.execute("SELECT value FROM meta WHERE key='format'").fetchone()
+    except sqlite3.OperationalError:
+        fmt = None
+    if fmt is not None and fmt[0] != str(INDEX_FORMAT):
+        # Older layout: drop and let sync_index rebuild from the registry.
+        conn.executescript("DROP TABLE IF EXISTS plans; DROP TABLE IF EXISTS removed; DELETE FROM meta;")
+    _index_schema(conn)
+    sync_index(root, conn)
+    return conn
+
+
+def index_row_to_item(row: sqlite3.Row) -> dict:
+    out = {k: row[k] for k in INDEX_COLUMNS}
+    out["links"] = json.loads(out["links"])
+    out["depends_on"] = json.loads(out["depends_on"])
+    return out
+
+
+def query_items(
+    conn: sqlite3.Connection,
+    *,
+    statuses: tuple[str, ...] = (),
+    kind: str | None = None,
+    owner: str | None = None,
+    domain: str | None = None,
+    text: str | None = None,
+    limit: int | None = None,
+    join: str = "",
+    where: tuple[str, ...] = (),
+    order_by: str = "p.prio_rank, p.domain_rank, p.id",
+) -> list[dict]:
+    """Filtered items, by default ordered by (priority rank, domain rank, id).
+
+    The plans table is aliased `p`; callers with their own tables in the
+    index database can pass `join`, extra `where` clauses and `order_by`.
+    """
+
+    clauses: list[str] = list(where)
+    params: list = []
+    if statuses:
+        clauses.append(f"p.status IN ({','.join('?' * len(statuses))})")
+        params.extend(statuses)
+    for col, val in (("kind", kind), ("owner", owner), ("domain", domain)):
+        if val:
+            clauses.append(f"p.{col}=?")
+            params.append(val)
+    if text:
+        clauses.append("(p.id LIKE ? ESCAPE '\\' OR p.title LIKE ? ESCAPE '\\' OR p.notes LIKE ? ESCAPE '\\')")
+        pat = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params.extend([pat, pat, pat])
+    sql = f"SELECT p.* FROM plans p {join}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {order_by}"
+    if limit is not None and limit >= 0:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [index_row_to_item(r) for r in conn.execute(sql, params)]
+
+
+def count_by_domain(conn: sqlite3.Connection, status: str = "in_progress") -> dict[str, int]:
+    rows = conn.execute("SELECT domain, COUNT(*) FROM plans WHERE status=? GROUP BY domain ORDER BY domain", (status,))
+    return {d: n for d, n in rows}
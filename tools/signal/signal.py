@@ -5,8 +5,16 @@ import argparse
 import datetime as dt
 import json
 import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import signal_bus
+
 
 def _utc_now_rfc3339() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -19,11 +27,6 @@ def _resolve_root() -> Path:
     return Path(__file__).resolve().parents[2]
 
 
-def _signal_id() -> str:
-    # Timestamp-based id, stable enough for file naming.
-    return dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
-
-
 def write_signal(
     root: Path,
     kind: str,
@@ -38,10 +41,10 @@ def write_signal(
     evidence: list[str],
     asks: list[str],
     next_actions: list[str],
-) -> Path:
+) -> dict:
     sig = {
         "header": {
-            "id": _signal_id(),
+            "id": "",
             "timestamp": _utc_now_rfc3339(),
             "from": from_,
             "to": to,
@@ -62,15 +65,362 @@ def write_signal(
         },
     }
 
-    out_dir = root / ".bridges" / "signals"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    fname = f"{sig['header']['id']}_{kind}_{topic.replace(' ', '_')}.json"
-    path = out_dir / fname
-    path.write_text(json.dumps(sig, indent=2, sort_keys=True) + "\n", encoding="utf-8")
-    return path
+    return signal_bus.append(root, [sig])[0]
+
+
+def cmd_export(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal export")
+    parser.add_argument("--since", type=int, default=0, help="Only signals after this sequence number")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args(argv)
+
+    root = _resolve_root()
+    n = signal_bus.backfill_exports(root, since_seq=args.since, overwrite=bool(args.overwrite))
+    files = signal_bus.rescan_files(root)
+    print(json.dumps({"ok": True, "written": n, "last_seq": signal_bus.last_seq(root), "legacy_files": files}, indent=2))
+    return 0
+
+
+def cmd_query(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal query")
+    parser.add_argument("--kind", choices=["proclamation", "missive", "council_call"])
+    parser.add_argument("--from", dest="from_")
+    parser.add_argument("--to")
+    parser.add_argument("--topic")
+    parser.add_argument("--urgency", choices=["low", "normal", "high", "critical"])
+    parser.add_argument("--since", help="RFC3339 timestamp lower bound")
+    parser.add_argument("--limit", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    root = _resolve_root()
+    rows = signal_bus.query(
+        root,
+        kind=args.kind,
+        from_=args.from_,
+        to=args.to,
+        topic=args.topic,
+        urgency=args.urgency,
+        since_ts=args.since,
+        limit=args.limit,
+    )
+    print(json.dumps(rows, indent=2))
+    return 0
+
+
+def cmd_inbox(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal inbox")
+    parser.add_argument("agent")
+    parser.add_argument("--limit", type=int, help="Deliver at most N new signals (cursor stops there)")
+    parser.add_argument("--peek", action="store_true", help="Do not advance the cursor")
+    args = parser.parse_args(argv)
+
+    out = signal_bus.inbox(_resolve_root(), args.agent, limit=args.limit, peek=bool(args.peek))
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_ack(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal ack")
+    parser.add_argument("id")
+    parser.add_argument("--agent", help="Acknowledging agent (required for signals sent to all)")
+    args = parser.parse_args(argv)
+
+    try:
+        out = signal_bus.ack(_resolve_root(), args.id, agent=args.agent)
+    except KeyError:
+        raise SystemExit(f"unknown signal: {args.id}")
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_overdue(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal overdue")
+    parser.add_argument("--agent")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(signal_bus.overdue(_resolve_root(), agent=args.agent), indent=2))
+    return 0
+
+
+# Broker protocol: newline-delimited JSON over .substrate/state/signal.sock.
+#   {"op": "subscribe", "filter": {...}, "since": SEQ|null} -> a stream of
+#       {"event": "signal", "seq": N, "signal": {...}} lines
+#   {"op": "poke"}  sent by signal_bus.append after each durable write
+#   {"op": "ping"}  -> {"ok": true, "pid": ...}
+# The broker only reads the log; writers append directly and poke it.
+# Each subscriber has its own bounded queue and writer thread, so a slow
+# client never holds up the others; one that falls _SUB_QUEUE events behind
+# is disconnected (resubscribe with "since" to catch up from the log).
+
+_SUB_QUEUE = 1024
+
+
+@dataclass
+class _Subscriber:
+    conn: socket.socket
+    filter: dict
+    cursor: int
+    queue: queue.Queue = field(default_factory=lambda: queue.Queue(maxsize=_SUB_QUEUE))
+    dead: threading.Event = field(default_factory=threading.Event)
+
+    def push(self, line: bytes) -> bool:
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.close()
+        return not self.dead.is_set()
+
+    def close(self) -> None:
+        self.dead.set()
+        try:
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def run(self) -> None:
+        while not self.dead.is_set():
+            line = self.queue.get()
+            if line is None or self.dead.is_set():
+                break
+            try:
+                self.conn.sendall(line)
+            except OSError:
+                self.close()
+
+
+def _event_line(seq: int, sig: dict) -> bytes:
+    return (json.dumps({"event": "signal", "seq": seq, "signal": sig}, sort_keys=True) + "\n").encode("utf-8")
+
+
+class _Broker:
+    def __init__(self, root: Path, poll: float) -> None:
+        self.root = root
+        self.poll = poll
+        self.hwm = signal_bus.last_seq(root)
+        self.lock = threading.Lock()
+        self.subs: list[_Subscriber] = []
+        self.wake = threading.Event()
+        self.stop = threading.Event()
+
+    def attach(self, sub: _Subscriber, since: int | None) -> None:
+        """Replay from the log past `since`, then hand the subscriber to the tailer."""
+
+        if since is not None:
+            sub.cursor = since
+            # Bulk of the replay straight to the socket, outside the lock.
+            self._replay(sub, self.hwm, sub.conn.sendall)
+        with self.lock:
+            if since is None:
+                sub.cursor = self.hwm
+            else:
+                # Close the gap through the queue; no socket I/O under the lock.
+                self._replay(sub, self.hwm, sub.push)
+            self.subs.append(sub)
+        threading.Thread(target=sub.run, name="signal-sub", daemon=True).start()
+
+    def _replay(self, sub: _Subscriber, upto: int, send) -> None:
+        if sub.cursor >= upto:
+            return
+        for seq, sig in signal_bus.iter_signals(self.root, since_seq=sub.cursor):
+            if seq > upto:
+                break
+            if signal_bus.matches(sig, sub.filter):
+                send(_event_line(seq, sig))
+            sub.cursor = seq
+
+    def tail(self) -> None:
+        while not self.stop.is_set():
+            self.wake.wait(self.poll)
+            self.wake.clear()
+            with self.lock:
+                for seq, sig in signal_bus.iter_signals(self.root, since_seq=self.hwm):
+                    line = None
+                    alive = []
+                    for sub in self.subs:
+                        if seq > sub.cursor and signal_bus.matches(sig, sub.filter):
+                            line = line or _event_line(seq, sig)
+                            sub.push(line)
+                        sub.cursor = seq
+                        if not sub.dead.is_set():
+                            alive.append(sub)
+                    self.subs = alive
+                    self.hwm = seq
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        broker: _Broker = self.server.broker  # type: ignore[attr-defined]
+        for raw in self.rfile:
+            try:
+                req = json.loads(raw)
+            except ValueError:
+                return
+            op = req.get("op")
+            if op == "poke":
+                broker.wake.set()
+            elif op == "ping":
+                self.wfile.write((json.dumps({"ok": True, "pid": os.getpid(), "seq": broker.hwm}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            elif op == "subscribe":
+                flt = req.get("filter") or {}
+                since = req.get("since")
+                self.connection.settimeout(5.0)
+                self.wfile.write((json.dumps({"event": "subscribed", "seq": broker.hwm}) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                sub = _Subscriber(self.connection, flt if isinstance(flt, dict) else {}, 0)
+                try:
+                    broker.attach(sub, None if since is None else int(since))
+                except OSError:
+                    return
+                # Park until the client goes away; the subscriber's writer thread
+                # sends the events (the timeout bounds a send to a stuck client).
+                try:
+                    while not broker.stop.is_set() and not sub.dead.is_set():
+                        try:
+                            if not self.connection.recv(1):
+                                break
+                        except socket.timeout:
+                            continue
+                        except OSError:
+                            break
+                finally:
+                    sub.close()
+                return
+            else:
+                return
+
+
+class _BrokerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _connect_broker(root: Path, timeout: float = 2.0) -> socket.socket | None:
+    path = signal_bus.broker_socket_path(root)
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def cmd_serve(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal serve")
+    parser.add_argument("--poll", type=float, default=0.5, help="Fallback log poll interval in seconds")
+    args = parser.parse_args(argv)
+
+    root = _resolve_root()
+    path = signal_bus.broker_socket_path(root)
+    probe = _connect_broker(root)
+    if probe is not None:
+        probe.close()
+        raise SystemExit(f"already serving on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        path.unlink()  # stale socket from a crashed broker
+    except FileNotFoundError:
+        pass
+
+    broker = _Broker(root, args.poll)
+    server = _BrokerServer(str(path), _BrokerHandler)
+    server.broker = broker  # type: ignore[attr-defined]
+    tailer = threading.Thread(target=broker.tail, name="signal-tail", daemon=True)
+    tailer.start()
+    print(json.dumps({"ok": True, "socket": str(path), "pid": os.getpid(), "seq": broker.hwm}), flush=True)
+    try:
+        server.serve_forever(poll_interval=0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.stop.set()
+        broker.wake.set()
+        server.server_close()
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+    return 0
+
+
+def cmd_subscribe(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal subscribe")
+    parser.add_argument("--kind", action="append", choices=["proclamation", "missive", "council_call"])
+    parser.add_argument("--from", dest="from_", action="append")
+    parser.add_argument("--to", action="append", help="Recipient (signals to all are included)")
+    parser.add_argument("--topic", action="append")
+    parser.add_argument("--urgency", action="append", choices=["low", "normal", "high", "critical"])
+    parser.add_argument("--since", type=int, help="Replay logged signals after this sequence number first")
+    args = parser.parse_args(argv)
+
+    root = _resolve_root()
+    sock = _connect_broker(root)
+    if sock is None:
+        raise SystemExit("no signal broker running (start one with: ./scripts/signal serve)")
+    flt = {"kind": args.kind, "from": args.from_, "to": args.to, "topic": args.topic, "urgency": args.urgency}
+    req = {"op": "subscribe", "filter": {k: v for k, v in flt.items() if v}, "since": args.since}
+    sock.settimeout(None)
+    try:
+        with sock, sock.makefile("rwb") as f:
+            f.write((json.dumps(req) + "\n").encode("utf-8"))
+            f.flush()
+            for line in f:
+                sys.stdout.write(line.decode("utf-8"))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_archive(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal archive")
+    parser.add_argument("--older-than", type=int, required=True, metavar="DAYS")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    out = signal_bus.archive(_resolve_root(), older_than_days=args.older_than, dry_run=bool(args.dry_run))
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_show(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(prog="signal show")
+    parser.add_argument("id")
+    args = parser.parse_args(argv)
+
+    sig = signal_bus.get(_resolve_root(), args.id)
+    if sig is None:
+        raise SystemExit(f"unknown signal: {args.id}")
+    print(json.dumps(sig, indent=2, sort_keys=True))
+    return 0
+
+
+_SUBCOMMANDS = {
+    "export": cmd_export,
+    "query": cmd_query,
+    "inbox": cmd_inbox,
+    "ack": cmd_ack,
+    "overdue": cmd_overdue,
+    "serve": cmd_serve,
+    "subscribe": cmd_subscribe,
+    "archive": cmd_archive,
+    "show": cmd_show,
+}
 
 
 def main(argv: list[str]) -> int:
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser(prog="signal")
     parser.add_argument("kind", choices=["proclamation", "missive", "council_call"])
     parser.add_argument("--topic", required=True)
@@ -86,7 +436,7 @@ def main(argv: list[str]) -> int:
     args = parser.parse_args(argv)
 
     root = _resolve_root()
-    p = write_signal(
+    sig = write_signal(
         root,
         args.kind,
         topic=args.topic,
@@ -100,9 +450,12 @@ def main(argv: list[str]) -> int:
         asks=list(args.ask),
         next_actions=list(args.next),
     )
-    print(str(p))
+    if signal_bus.export_enabled():
+        print(str(signal_bus.export_path(root, sig)))
+    else:
+        print(sig["header"]["id"])
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main(os.sys.argv[1:]))
+    raise SystemExit(main(sys.argv[1:]))
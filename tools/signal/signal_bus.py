@@ -0,0 +1,1081 @@
+#!/usr/bin/env python3
+"""Append-only signal log.
+
+Signals are stored as NDJSON lines in segment files under
+`.bridges/signals/log/seg-NNNNNN.ndjson`, with a fixed-width offset index
+(`signals.idx`) mapping sequence number -> (segment, offset, length).
+
+Ids are `YYYYMMDD-HHMMSS-<seq>-<node>`: the sequence is global and assigned
+under an exclusive lock, so ids are monotonic and never collide, however many
+signals land in the same second. The index is a cache: it is rebuilt from the
+segments if missing, and repaired if a writer died between the two writes.
+
+The per-file JSON (`.bridges/signals/<id>_<kind>_<topic>.json`) is produced by
+a compatibility exporter. It is off by default so appends only touch the log;
+set ASF_SIGNAL_EXPORT=1 to write the file on every append, or run
+`signal export` to backfill files on demand.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import bisect
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import socket
+import sqlite3
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# seq, segment number, byte offset, byte length (newline included).
+_IDX = struct.Struct("<QIQI")
+
+_SEGMENT_RE = re.compile(r"^seg-(\d{6})\.ndjson$")
+
+# Bus ids carry their sequence number; used when rebuilding the offset index.
+_LINE_SEQ_RE = re.compile(rb'"id":"\d{8}-\d{6}-(\d{8})-')
+
+
+def _segment_max_bytes() -> int:
+    return int(os.environ.get("ASF_SIGNAL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+
+
+def export_enabled() -> bool:
+    return os.environ.get("ASF_SIGNAL_EXPORT", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def signals_dir(root: Path) -> Path:
+    return root / ".bridges" / "signals"
+
+
+def log_dir(root: Path) -> Path:
+    return signals_dir(root) / "log"
+
+
+def _segment_path(d: Path, n: int) -> Path:
+    return d / f"seg-{n:06d}.ndjson"
+
+
+def _segments(d: Path) -> list[int]:
+    out = []
+    if d.exists():
+        for p in d.iterdir():
+            m = _SEGMENT_RE.match(p.name)
+            if m:
+                out.append(int(m.group(1)))
+    return sorted(out)
+
+
+def node_id() -> str:
+    env = os.environ.get("ASF_NODE", "").strip()
+    if env:
+        return re.sub(r"[^A-Za-z0-9]", "", env)[:12] or "node"
+    return hashlib.sha1(socket.gethostname().encode("utf-8")).hexdigest()[:6]
+
+
+def seq_of(sig_id: str) -> int | None:
+    """Sequence number embedded in a bus id; None for legacy ids."""
+
+    parts = sig_id.split("-")
+    if len(parts) >= 4 and len(parts[0]) == 8 and len(parts[1]) == 6 and parts[2].isdigit():
+        return int(parts[2])
+    return None
+
+
+@contextmanager
+def _locked(d: Path, mode: int) -> Iterator[None]:
+    d.mkdir(parents=True, exist_ok=True)
+    fd = os.open(d / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, mode)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _read_idx_tail(idx: Path, *, locked: bool = False) -> tuple[int, int, int]:
+    """(records, segment, end offset) as recorded by the index."""
+
+    try:
+        size = idx.stat().st_size
+    except FileNotFoundError:
+        return 0, 1, 0
+    n = size // _IDX.size
+    if locked and size != n * _IDX.size:
+        # Torn record from an interrupted write; drop it, the scan recovers it.
+        os.truncate(idx, n * _IDX.size)
+    if n == 0:
+        return 0, 1, 0
+    with idx.open("rb") as f:
+        f.seek((n - 1) * _IDX.size)
+        _, seg, off, length = _IDX.unpack(f.read(_IDX.size))
+    return n, seg, off + length
+
+
+def _repair(d: Path) -> tuple[int, int, int]:
+    """Bring the index level with the segments; returns (last seq, segment, end offset).
+
+    Caller holds the exclusive lock. Lines past the indexed end are indexed if
+    complete; a trailing partial line is cut off. Sequence numbers missing
+    before a line (archived segments) get segment-0 placeholder records.
+    """
+
+    idx = d / "signals.idx"
+    n, seg, end = _read_idx_tail(idx, locked=True)
+    recs = []
+    for s in [x for x in _segments(d) if x >= seg]:
+        path = _segment_path(d, s)
+        start = end if s == seg else 0
+        if path.stat().st_size <= start:
+            continue
+        with path.open("rb") as f:
+            f.seek(start)
+            data = f.read()
+        pos = 0
+        while pos < len(data):
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                os.truncate(path, start + pos)
+                break
+            m = _LINE_SEQ_RE.search(data, pos, nl)
+            seq = int(m.group(1)) if m else n + 1
+            while n + 1 < seq:
+                n += 1
+                recs.append(_IDX.pack(n, 0, 0, 0))
+            n += 1
+            recs.append(_IDX.pack(n, s, start + pos, nl + 1 - pos))
+            pos = nl + 1
+        seg, end = s, start + pos
+    if recs:
+        with idx.open("ab") as f:
+            f.write(b"".join(recs))
+    return n, seg, end
+
+
+def export_path(root: Path, sig: dict) -> Path:
+    hdr = sig["header"]
+    topic = str(sig["body"].get("topic", "")).replace(" ", "_").replace("/", "_")
+    return signals_dir(root) / f"{hdr['id']}_{hdr['kind']}_{topic}.json"
+
+
+def export(root: Path, sigs: list[dict], *, overwrite: bool = False) -> list[Path]:
+    """Write the human-readable per-signal JSON files."""
+
+    signals_dir(root).mkdir(parents=True, exist_ok=True)
+    paths = []
+    for sig in sigs:
+        path = export_path(root, sig)
+        if overwrite or not path.exists():
+            path.write_text(json.dumps(sig, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def append(root: Path, sigs: list[dict]) -> list[dict]:
+    """Durably append a batch of signals; assigns header ids in place.
+
+    One lock, one write per touched segment, one fsync per batch.
+    """
+
+    if not sigs:
+        return []
+    d = log_dir(root)
+    node = node_id()
+    limit = _segment_max_bytes()
+    with _locked(d, fcntl.LOCK_EX):
+        seq, seg, end = _repair(d)
+        stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
+        chunks: dict[int, list[bytes]] = {}
+        recs = []
+        for sig in sigs:
+            seq += 1
+            sig["header"]["id"] = f"{stamp}-{seq:08d}-{node}"
+            line = (json.dumps(sig, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+            if end > 0 and end + len(line) > limit:
+                seg, end = seg + 1, 0
+            chunks.setdefault(seg, []).append(line)
+            recs.append(_IDX.pack(seq, seg, end, len(line)))
+            end += len(line)
+        for s, lines in chunks.items():
+            fd = os.open(_segment_path(d, s), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, b"".join(lines))
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        # The index is derivable from the segments, so it is not fsynced.
+        with (d / "signals.idx").open("ab") as f:
+            f.write(b"".join(recs))
+    if export_enabled():
+        export(root, sigs)
+    _poke_broker(root)
+    return sigs
+
+
+def broker_socket_path(root: Path) -> Path:
+    return root / ".substrate" / "state" / "signal.sock"
+
+
+def _poke_broker(root: Path) -> None:
+    """Tell a running `signal serve` broker that the log grew (best effort)."""
+
+    path = broker_socket_path(root)
+    if not path.exists():
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(0.2)
+    try:
+        sock.connect(str(path))
+        sock.sendall(b'{"op": "poke"}\n')
+    except OSError:
+        pass
+    finally:
+        sock.close()
+
+
+_FILTER_FIELDS = {
+    "kind": ("header", "kind"),
+    "from": ("header", "from"),
+    "to": ("header", "to"),
+    "urgency": ("header", "urgency"),
+    "topic": ("body", "topic"),
+}
+
+
+def matches(sig: dict, flt: dict) -> bool:
+    """Subscriber filter: each given field (value or list of values) must match.
+
+    `to` also accepts signals addressed to `all`.
+    """
+
+    for key, (part, field) in _FILTER_FIELDS.items():
+        want = flt.get(key)
+        if want in (None, "", []):
+            continue
+        allowed = {str(w) for w in (want if isinstance(want, list) else [want])}
+        if key == "to":
+            allowed.add("all")
+        if str((sig.get(part) or {}).get(field) or "") not in allowed:
+            return False
+    return True
+
+
+def _ensure_index(d: Path) -> None:
+    """Repair the index if it lags the newest segment (cheap stat check)."""
+
+    n, seg, end = _read_idx_tail(d / "signals.idx")
+    segs = _segments(d)
+    if not segs:
+        return
+    last = segs[-1]
+    if last > seg or _segment_path(d, last).stat().st_size > end:
+        with _locked(d, fcntl.LOCK_EX):
+            _repair(d)
+
+
+def last_seq(root: Path) -> int:
+    d = log_dir(root)
+    _ensure_index(d)
+    return _read_idx_tail(d / "signals.idx")[0]
+
+
+def _read_records(d: Path, first: int, count: int) -> list[tuple[int, int, int, int]]:
+    with (d / "signals.idx").open("rb") as f:
+        f.seek((first - 1) * _IDX.size)
+        data = f.read(count * _IDX.size)
+    return [_IDX.unpack_from(data, i) for i in range(0, len(data) - _IDX.size + 1, _IDX.size)]
+
+
+def iter_signals(
+    root: Path, *, since_seq: int = 0, batch: int = 4096, archived: bool = True
+) -> Iterator[tuple[int, dict]]:
+    """Yield (seq, signal) for every logged signal with seq > since_seq, in order.
+
+    Signals moved to the archive are read from it unless `archived` is False.
+    Readers take no lock: a segment that `archive` removed after its index
+    records were read is resolved through the archive (written first).
+    """
+
+    d = log_dir(root)
+    _ensure_index(d)
+    total = _read_idx_tail(d / "signals.idx")[0]
+    cur = since_seq + 1
+    open_seg, f = 0, None
+    try:
+        while cur <= total:
+            for seq, seg, off, length in _read_records(d, cur, min(batch, total - cur + 1)):
+                cur = seq + 1
+                if seg == 0:
+                    sig = _archived_by_seq(root, seq) if archived else None
+                    if sig is not None:
+                        yield seq, sig
+                    continue
+                if seg != open_seg:
+                    if f is not None:
+                        f.close()
+                    open_seg, f = 0, None
+                    try:
+                        f = _segment_path(d, seg).open("rb")
+                        open_seg = seg
+                    except FileNotFoundError:
+                        sig = _archived_by_seq(root, seq) if archived else None
+                        if sig is not None:
+                            yield seq, sig
+                        continue
+                f.seek(off)
+                yield seq, json.loads(f.read(length))
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _get_seq(root: Path, seq: int) -> dict | None:
+    d = log_dir(root)
+    _ensure_index(d)
+    if seq < 1 or seq > _read_idx_tail(d / "signals.idx")[0]:
+        return None
+    _, seg, off, length = _read_records(d, seq, 1)[0]
+    if seg == 0:
+        return _archived_by_seq(root, seq)
+    try:
+        with _segment_path(d, seg).open("rb") as f:
+            f.seek(off)
+            return json.loads(f.read(length))
+    except FileNotFoundError:
+        # Archived between reading the record and opening the segment.
+        return _archived_by_seq(root, seq)
+
+
+def get(root: Path, sig_id: str) -> dict | None:
+    """Look up a signal by id, wherever it lives (log, archive or legacy file).
+
+    Bus ids resolve in O(1) through the offset index. Legacy signals are
+    identified by their file name without `.json` (their header ids are
+    second-resolution and collide) and go through the query index.
+    """
+
+    seq = seq_of(sig_id)
+    if seq is not None:
+        sig = _get_seq(root, seq)
+        return sig if sig is not None and sig.get("header", {}).get("id") == sig_id else None
+    for row in query(root, sig_id=sig_id, limit=1):
+        return load(root, row)
+    return None
+
+
+def backfill_exports(root: Path, *, since_seq: int = 0, overwrite: bool = False) -> int:
+    """Write per-file JSON for logged signals that lack one; returns files written."""
+
+    written = 0
+    pending: list[dict] = []
+    for _, sig in iter_signals(root, since_seq=since_seq, archived=False):
+        if overwrite or not export_path(root, sig).exists():
+            pending.append(sig)
+        if len(pending) >= 1024:
+            written += len(export(root, pending, overwrite=overwrite))
+            pending = []
+    if pending:
+        written += len(export(root, pending, overwrite=overwrite))
+    return written
+
+
+# --- archive -----------------------------------------------------------------
+
+ARCHIVE_FORMAT = 1
+
+_DAY_RE = re.compile(r"^(\d{4})(\d{2})(\d{2})-")
+
+
+def archive_dir(root: Path) -> Path:
+    return signals_dir(root) / "archive"
+
+
+def _archive_index_path(root: Path) -> Path:
+    return archive_dir(root) / "index.json"
+
+
+def _day_path(root: Path, day: str) -> Path:
+    return archive_dir(root) / day[:4] / f"{day}.ndjson.gz"
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _day_of(sig_id: str, ts: str) -> str:
+    m = _DAY_RE.match(sig_id)
+    return f"{m.group(1)}-{m.group(2)}-{m.group(3)}" if m else ts[:10]
+
+
+# root -> (stamp, index, range starts, ranges); the index is tiny, one entry per day.
+_ARCHIVE_CACHE: dict[str, tuple] = {}
+
+
+def _archive_state(root: Path) -> tuple[dict, list[int], list[tuple[int, int, str]]]:
+    path = _archive_index_path(root)
+    stamp = _file_stamp(path)
+    hit = _ARCHIVE_CACHE.get(str(root))
+    if hit is not None and hit[0] == stamp:
+        return hit[1], hit[2], hit[3]
+    index = json.loads(path.read_text(encoding="utf-8")) if stamp else {"format": ARCHIVE_FORMAT, "days": {}}
+    ranges = sorted((lo, hi, day) for day, m in index["days"].items() for lo, hi in m.get("seqs", []))
+    starts = [r[0] for r in ranges]
+    _ARCHIVE_CACHE[str(root)] = (stamp, index, starts, ranges)
+    return index, starts, ranges
+
+
+def _load_archive_index(root: Path) -> dict:
+    return _archive_state(root)[0]
+
+
+# (path, stamp, by seq, by legacy file name) for the most recently read day.
+_DAY_CACHE: list = [None, None, {}, {}]
+
+
+def _day_entries(root: Path, day: str) -> tuple[Path, dict[int, dict], dict[str, dict]]:
+    path = _day_path(root, day)
+    stamp = _file_stamp(path)
+    if _DAY_CACHE[0] == path and _DAY_CACHE[1] == stamp:
+        return path, _DAY_CACHE[2], _DAY_CACHE[3]
+    by_seq: dict[int, dict] = {}
+    by_file: dict[str, dict] = {}
+    if stamp is not None:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                e = json.loads(line)
+                if e.get("seq") is not None:
+                    by_seq[int(e["seq"])] = e["signal"]
+                elif e.get("file"):
+                    by_file[e["file"]] = e
+    _DAY_CACHE[:] = [path, stamp, by_seq, by_file]
+    return path, by_seq, by_file
+
+
+def _archived_by_seq(root: Path, seq: int) -> dict | None:
+    _, starts, ranges = _archive_state(root)
+    i = bisect.bisect_right(starts, seq) - 1
+    if i < 0 or ranges[i][1] < seq:
+        return None
+    return _day_entries(root, ranges[i][2])[1].get(seq)
+
+
+def _archived_by_file(root: Path, day: str, name: str) -> dict | None:
+    e = _day_entries(root, day)[2].get(name)
+    return e.get("signal") if e else None
+
+
+def _append_day(root: Path, day: str, entries: list[dict]) -> None:
+    """Append entries to a day file as a new gzip member (readers see one stream)."""
+
+    path = _day_path(root, day)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = b"".join((json.dumps(e, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8") for e in entries)
+    with path.open("ab") as raw:
+        with gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as gz:
+            gz.write(data)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def _merge_ranges(ranges: list[list[int]], seqs: list[int]) -> list[list[int]]:
+    out: list[list[int]] = []
+    for lo, hi in sorted([list(r) for r in ranges] + [[q, q] for q in seqs]):
+        if out and lo <= out[-1][1] + 1:
+            out[-1][1] = max(out[-1][1], hi)
+        else:
+            out.append([lo, hi])
+    return out
+
+
+def archive(root: Path, *, older_than_days: int, dry_run: bool = False) -> dict:
+    """Pack signals older than N days into per-day gzip NDJSON under archive/.
+
+    Moves sealed log segments whose newest signal is older than the cutoff,
+    and legacy per-file signals, into `archive/YYYY/YYYY-MM-DD.ndjson.gz`;
+    deletes exported per-file copies older than the cutoff. Reads through
+    iter_signals/get/query/load are unaffected.
+    """
+
+    cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=older_than_days)
+    cutoff_day = cutoff.strftime("%Y-%m-%d")
+    cutoff_ts = cutoff.replace(microsecond=0).isoformat().replace("+00:00", "Z")
+    conn = open_index(root)
+    try:
+        legacy_rows = conn.execute(
+            "SELECT file, ts FROM signals WHERE src = 'file' AND ts < ? ORDER BY ts", (cutoff_ts,)
+        ).fetchall()
+        per_day: dict[str, list[dict]] = {}
+        day_seqs: dict[str, list[int]] = {}
+        day_legacy: dict[str, int] = {}
+        packed: list[int] = []
+        d = log_dir(root)
+        with _locked(d, fcntl.LOCK_EX):
+            _repair(d)
+            # The newest segment is never packed: appends land there.
+            for s in _segments(d)[:-1]:
+                sigs = [json.loads(line) for line in _segment_path(d, s).read_bytes().splitlines() if line.strip()]
+                days = [_day_of(x["header"]["id"], str(x["header"].get("timestamp") or "")) for x in sigs]
+                if sigs and max(days) >= cutoff_day:
+                    break
+                for sig, day in zip(sigs, days):
+                    seq = seq_of(sig["header"]["id"])
+                    per_day.setdefault(day, []).append({"seq": seq, "signal": sig})
+                    day_seqs.setdefault(day, []).append(seq)
+                packed.append(s)
+
+            moved: list[str] = []
+            for file, ts in legacy_rows:
+                try:
+                    text = (root / file).read_text(encoding="utf-8")
+                except OSError:
+                    continue
+                try:
+                    sig = json.loads(text)
+                except ValueError:
+                    sig = None
+                entry = {"file": Path(file).name, "ts": ts, "signal": sig}
+                if sig is None:
+                    entry["raw"] = text
+                per_day.setdefault(ts[:10], []).append(entry)
+                day_legacy[ts[:10]] = day_legacy.get(ts[:10], 0) + 1
+                moved.append(file)
+
+            if not dry_run and per_day:
+                for day, entries in sorted(per_day.items()):
+                    _append_day(root, day, entries)
+                index = json.loads(json.dumps(_load_archive_index(root)))
+                for day, entries in per_day.items():
+                    m = index["days"].setdefault(day, {"path": str(_day_path(root, day).relative_to(archive_dir(root)))})
+                    m["count"] = int(m.get("count", 0)) + len(entries)
+                    m["legacy"] = int(m.get("legacy", 0)) + day_legacy.get(day, 0)
+                    m["seqs"] = _merge_ranges(m.get("seqs", []), day_seqs.get(day, []))
+                index["format"] = ARCHIVE_FORMAT
+                tmp = _archive_index_path(root).with_suffix(".tmp")
+                tmp.write_text(json.dumps(index, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+                os.replace(tmp, _archive_index_path(root))
+                with (d / "signals.idx").open("r+b") as f:
+                    for seqs in day_seqs.values():
+                        for seq in seqs:
+                            f.seek((seq - 1) * _IDX.size)
+                            f.write(_IDX.pack(seq, 0, 0, 0))
+                for s in packed:
+                    _segment_path(d, s).unlink()
+
+        if not dry_run and moved:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("UPDATE signals SET src = 'archive' WHERE file = ?", [(f,) for f in moved])
+            conn.execute("COMMIT")
+            for f in moved:
+                (root / f).unlink(missing_ok=True)
+    finally:
+        conn.close()
+
+    exports = []
+    for name in os.listdir(signals_dir(root)):
+        if _FILE_ID_RE.match(name) and _day_of(name, "") < cutoff_day:
+            exports.append(name)
+    if not dry_run:
+        for name in exports:
+            (signals_dir(root) / name).unlink(missing_ok=True)
+    return {
+        "ok": True,
+        "dry_run": dry_run,
+        "cutoff": cutoff_ts,
+        "segments": [_segment_path(d, s).name for s in packed],
+        "logged": sum(len(v) for v in day_seqs.values()),
+        "legacy": len(moved),
+        "exports_removed": len(exports),
+        "days": sorted(per_day),
+    }
+
+
+# --- query index -------------------------------------------------------------
+
+INDEX_FORMAT = 3
+
+_FILE_ID_RE = re.compile(r"^\d{8}-\d{6}-\d{8}-")
+
+_COLUMNS = "n, id, seq, file, ts, kind, sender, recipient, topic, urgency, expects_response, response_by, src"
+
+
+def _index_path(root: Path) -> Path:
+    return log_dir(root) / "signals.sqlite"
+
+
+def _row_values(sig: dict) -> tuple:
+    hdr = sig.get("header") or {}
+    body = sig.get("body") or {}
+    foot = sig.get("footer") or {}
+    return (
+        str(hdr.get("id") or ""),
+        str(hdr.get("timestamp") or ""),
+        str(hdr.get("kind") or ""),
+        str(hdr.get("from") or ""),
+        str(hdr.get("to") or ""),
+        str(body.get("topic") or ""),
+        str(hdr.get("urgency") or ""),
+        1 if foot.get("expects_response") else 0,
+        str(foot.get("response_by") or ""),
+    )
+
+
+def _index_log(conn: sqlite3.Connection, root: Path, since: int) -> int:
+    rows = []
+    last = since
+    for seq, sig in iter_signals(root, since_seq=since):
+        v = _row_values(sig)
+        rows.append((v[0], seq, str(export_path(root, sig).relative_to(root)), "log", *v[1:]))
+        last = seq
+    conn.executemany(
+        "INSERT OR IGNORE INTO signals(id, seq, file, src, ts, kind, sender, recipient, topic, urgency,"
+        " expects_response, response_by) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+        rows,
+    )
+    return last
+
+
+def _index_files(conn: sqlite3.Connection, root: Path) -> None:
+    """Index per-file signals that did not come from the log (pre-log history, hand-written)."""
+
+    d = signals_dir(root)
+    names = {n for n in os.listdir(d) if n.endswith(".json") and not _FILE_ID_RE.match(n)}
+    known = {r[0] for r in conn.execute("SELECT file FROM signals WHERE src = 'file'")}
+    rel = str(d.relative_to(root))
+    gone = known - {f"{rel}/{n}" for n in names}
+    conn.executemany("DELETE FROM signals WHERE file = ?", [(f,) for f in gone])
+    rows = []
+    for n in sorted(names):
+        f = f"{rel}/{n}"
+        if f in known:
+            continue
+        p = d / n
+        try:
+            sig = json.loads(p.read_text(encoding="utf-8"))
+        except Exception:
+            sig = {}
+        v = list(_row_values(sig if isinstance(sig, dict) else {}))
+        # Legacy header ids are only second-resolution and collide; the file name is unique.
+        v[0] = Path(n).stem
+        if not v[1]:
+            v[1] = dt.datetime.fromtimestamp(p.stat().st_mtime, dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        rows.append((v[0], None, f, "file", *v[1:]))
+    rows.sort(key=lambda r: (r[4], r[2]))
+    conn.executemany(
+        "INSERT OR IGNORE INTO signals(id, seq, file, src, ts, kind, sender, recipient, topic, urgency,"
+        " expects_response, response_by) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+        rows,
+    )
+
+
+def _index_archive(conn: sqlite3.Connection, root: Path) -> None:
+    """Index legacy per-file signals that were packed into the archive."""
+
+    rel = str(signals_dir(root).relative_to(root))
+    for day, meta in sorted(_load_archive_index(root)["days"].items()):
+        if not meta.get("legacy"):
+            continue
+        rows = []
+        for e in _day_entries(root, day)[2].values():
+            sig = e["signal"] if isinstance(e.get("signal"), dict) else {}
+            v = list(_row_values(sig))
+            v[0] = Path(e["file"]).stem
+            v[1] = v[1] or e.get("ts", "")
+            rows.append((v[0], None, f"{rel}/{e['file']}", "archive", *v[1:]))
+        conn.executemany("UPDATE signals SET src = 'archive' WHERE file = ?", [(r[2],) for r in rows])
+        conn.executemany(
+            "INSERT OR IGNORE INTO signals(id, seq, file, src, ts, kind, sender, recipient, topic, urgency,"
+            " expects_response, response_by) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            rows,
+        )
+
+
+def open_index(root: Path) -> sqlite3.Connection:
+    """Open the signal query index (SQLite), caught up with the log and legacy files.
+
+    Steady-state cost is a stat of the log index and the archive index. Legacy
+    per-file signals are scanned once per index generation; files written by
+    hand later are picked up by rescan_files() (`signal export`).
+    """
+
+    path = _index_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+    fmt = conn.execute("SELECT v FROM meta WHERE k = 'format'").fetchone()
+    if fmt is None or int(fmt[0]) != INDEX_FORMAT:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE IF EXISTS signals")
+        conn.execute("DELETE FROM meta")
+        conn.execute(
+            "CREATE TABLE signals ("
+            " n INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT, seq INTEGER, file TEXT UNIQUE, src TEXT,"
+            " ts TEXT, kind TEXT, sender TEXT, recipient TEXT, topic TEXT, urgency TEXT,"
+            " expects_response INTEGER, response_by TEXT)"
+        )
+        for cols in ("ts", "kind, ts", "sender, ts", "recipient, ts", "topic, ts", "urgency, ts", "id", "recipient, n"):
+            name = "signals_" + cols.replace(", ", "_")
+            conn.execute(f"CREATE INDEX {name} ON signals({cols})")
+        conn.execute("INSERT INTO meta VALUES ('format', ?)", (str(INDEX_FORMAT),))
+        # Row numbers (n) are only comparable within one generation; inbox cursors re-anchor on change.
+        conn.execute("INSERT INTO meta VALUES ('gen', ?)", (os.urandom(8).hex(),))
+        conn.execute("COMMIT")
+    sync_index(conn, root)
+    return conn
+
+
+def sync_index(conn: sqlite3.Connection, root: Path) -> None:
+    # The signals directory mtime is no use as a trigger: every export lands
+    # there, and a listing per write would make readers O(total signals).
+    if not signals_dir(root).is_dir():
+        return
+    log_seq = last_seq(root)
+    arch_stamp = str(_file_stamp(_archive_index_path(root)))
+    meta = dict(conn.execute("SELECT k, v FROM meta"))
+    if (
+        int(meta.get("log_seq", "0")) == log_seq
+        and meta.get("files_scanned") == "1"
+        and meta.get("archive") == arch_stamp
+    ):
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        meta = dict(conn.execute("SELECT k, v FROM meta"))
+        done = int(meta.get("log_seq", "0"))
+        if done > log_seq:
+            # The log was reset underneath us (fresh clone, deleted segments).
+            conn.execute("DELETE FROM signals WHERE src = 'log'")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('gen', ?)", (os.urandom(8).hex(),))
+            done = 0
+        if done < log_seq:
+            done = _index_log(conn, root, done)
+        # Archived legacy files first, so the file scan does not drop their rows.
+        if meta.get("archive") != arch_stamp:
+            _index_archive(conn, root)
+        if meta.get("files_scanned") != "1":
+            _index_files(conn, root)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('archive', ?)", (arch_stamp,))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('log_seq', ?)", (str(done),))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('files_scanned', '1')")
+        conn.execute("DELETE FROM meta WHERE k = 'dir_mtime'")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def rescan_files(root: Path) -> int:
+    """Re-list the signals directory for hand-written (non-log) files; returns their count."""
+
+    conn = open_index(root)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            _index_files(conn, root)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return conn.execute("SELECT COUNT(*) FROM signals WHERE src = 'file'").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _row_dict(r: tuple) -> dict:
+    return {
+        "n": r[0],
+        "id": r[1],
+        "seq": r[2],
+        "file": r[3],
+        "ts": r[4],
+        "kind": r[5],
+        "from": r[6],
+        "to": r[7],
+        "topic": r[8],
+        "urgency": r[9],
+        "expects_response": bool(r[10]),
+        "response_by": r[11],
+        "src": r[12],
+    }
+
+
+def query(
+    root: Path,
+    *,
+    kind: str | None = None,
+    from_: str | None = None,
+    to: str | None = None,
+    topic: str | None = None,
+    urgency: str | None = None,
+    since_ts: str | None = None,
+    sig_id: str | None = None,
+    limit: int | None = None,
+    conn: sqlite3.Connection | None = None,
+) -> list[dict]:
+    """Signals matching every given field, newest first (by timestamp, then arrival)."""
+
+    own = conn is None
+    if own:
+        conn = open_index(root)
+    try:
+        where, params = [], []
+        filters = (("kind", kind), ("sender", from_), ("recipient", to), ("topic", topic), ("urgency", urgency), ("id", sig_id))
+        for col, val in filters:
+            if val is not None:
+                where.append(f"{col} = ?")
+                params.append(val)
+        if since_ts is not None:
+            where.append("ts >= ?")
+            params.append(since_ts)
+        sql = f"SELECT {_COLUMNS} FROM signals"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC, n DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [_row_dict(r) for r in conn.execute(sql, params)]
+    finally:
+        if own:
+            conn.close()
+
+
+def count(root: Path, *, conn: sqlite3.Connection | None = None) -> int:
+    own = conn is None
+    if own:
+        conn = open_index(root)
+    try:
+        return int(conn.execute("SELECT COUNT(*) FROM signals").fetchone()[0])
+    finally:
+        if own:
+            conn.close()
+
+
+def ref(root: Path, row: dict) -> str:
+    """Repo-relative file for a signal row, or its id when only the log or archive holds it."""
+
+    return row["file"] if row["src"] != "archive" and (root / row["file"]).exists() else row["id"]
+
+
+def load(root: Path, row: dict) -> dict | None:
+    """Full signal document for a query row, from the log, a loose file or the archive."""
+
+    if row["seq"] is not None:
+        return _get_seq(root, int(row["seq"]))
+    if row["src"] == "archive":
+        return _archived_by_file(root, row["ts"][:10], Path(row["file"]).name)
+    try:
+        return json.loads((root / row["file"]).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+# --- inboxes -----------------------------------------------------------------
+
+
+def _inbox_path(root: Path) -> Path:
+    return root / ".substrate" / "state" / "signal-inbox.sqlite"
+
+
+def open_inbox(root: Path) -> sqlite3.Connection:
+    """Per-agent cursors, outstanding responses and acks (local state, not a cache)."""
+
+    path = _inbox_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=30.0, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS cursors ("
+        " agent TEXT PRIMARY KEY, n INTEGER, file TEXT, ts TEXT, gen TEXT, updated TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pending ("
+        " agent TEXT, file TEXT, id TEXT, ts TEXT, kind TEXT, sender TEXT, topic TEXT, urgency TEXT,"
+        " response_by TEXT, PRIMARY KEY (agent, file))"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS pending_id ON pending(id)")
+    conn.execute("CREATE TABLE IF NOT EXISTS acks (agent TEXT, id TEXT, ts TEXT, PRIMARY KEY (agent, id))")
+    return conn
+
+
+def _now_rfc3339() -> str:
+    return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def _parse_ts(s: str) -> dt.datetime | None:
+    try:
+        t = dt.datetime.fromisoformat(s.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return t if t.tzinfo else t.replace(tzinfo=dt.timezone.utc)
+
+
+def _anchor(idx: sqlite3.Connection, cur: tuple | None, gen: str) -> int:
+    """Cursor position in the current index generation."""
+
+    if cur is None:
+        return 0
+    n, file, ts, cur_gen = cur
+    if cur_gen == gen:
+        return int(n)
+    hit = idx.execute("SELECT n FROM signals WHERE file = ?", (file,)).fetchone()
+    if hit is None:
+        hit = idx.execute("SELECT MAX(n) FROM signals WHERE ts <= ?", (ts,)).fetchone()
+    return int(hit[0] or 0) if hit else 0
+
+
+def _pending_dict(r: tuple, now: dt.datetime) -> dict:
+    due = _parse_ts(r[7]) if r[7] else None
+    return {
+        "file": r[0],
+        "id": r[1],
+        "ts": r[2],
+        "kind": r[3],
+        "from": r[4],
+        "topic": r[5],
+        "urgency": r[6],
+        "response_by": r[7],
+        "overdue": bool(due and due < now),
+    }
+
+
+_PENDING_COLUMNS = "file, id, ts, kind, sender, topic, urgency, response_by"
+
+
+def inbox(root: Path, agent: str, *, limit: int | None = None, peek: bool = False) -> dict:
+    """New signals for `agent` (addressed to it or to `all`) since its cursor.
+
+    Advances the cursor unless `peek`. Signals that expect a response stay in
+    the agent's pending set until acked; pending items past `response_by` are
+    reported as overdue. Cost is proportional to new and outstanding signals.
+    """
+
+    idx = open_index(root)
+    box = open_inbox(root)
+    now = dt.datetime.now(dt.timezone.utc)
+    try:
+        gen = idx.execute("SELECT v FROM meta WHERE k = 'gen'").fetchone()[0]
+        box.execute("BEGIN IMMEDIATE")
+        try:
+            cur = box.execute("SELECT n, file, ts, gen FROM cursors WHERE agent = ?", (agent,)).fetchone()
+            start = _anchor(idx, cur, gen)
+            sql = (
+                f"SELECT {_COLUMNS} FROM signals"
+                " WHERE recipient IN (?, 'all') AND n > ? AND sender != ? ORDER BY n"
+            )
+            params: list = [agent, start, agent]
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(int(limit))
+            rows = [_row_dict(r) for r in idx.execute(sql, params)]
+
+            fresh = []
+            for r in rows:
+                if not r["expects_response"]:
+                    continue
+                if box.execute("SELECT 1 FROM acks WHERE agent = ? AND id = ?", (agent, r["id"])).fetchone():
+                    continue
+                fresh.append(
+                    (agent, r["file"], r["id"], r["ts"], r["kind"], r["from"], r["topic"], r["urgency"], r["response_by"])
+                )
+            pending = [
+                _pending_dict(p, now)
+                for p in box.execute(f"SELECT {_PENDING_COLUMNS} FROM pending WHERE agent = ? ORDER BY ts", (agent,))
+            ]
+            if peek:
+                pending += [_pending_dict(f[1:], now) for f in fresh]
+            else:
+                box.executemany("INSERT OR IGNORE INTO pending VALUES (?,?,?,?,?,?,?,?,?)", fresh)
+                pending += [_pending_dict(f[1:], now) for f in fresh]
+                if rows:
+                    last = rows[-1]
+                    box.execute(
+                        "INSERT OR REPLACE INTO cursors VALUES (?,?,?,?,?,?)",
+                        (agent, last["n"], last["file"], last["ts"], gen, _now_rfc3339()),
+                    )
+                elif cur is not None and cur[3] != gen:
+                    box.execute("UPDATE cursors SET n = ?, gen = ? WHERE agent = ?", (start, gen, agent))
+            box.execute("COMMIT")
+        except BaseException:
+            box.execute("ROLLBACK")
+            raise
+    finally:
+        idx.close()
+        box.close()
+    return {
+        "agent": agent,
+        "cursor": rows[-1]["n"] if rows and not peek else start,
+        "new": rows,
+        "pending": pending,
+        "overdue": [p for p in pending if p["overdue"]],
+    }
+
+
+def ack(root: Path, sig_id: str, *, agent: str | None = None) -> dict:
+    """Acknowledge a signal for `agent` (default: its recipient, or every agent holding it pending)."""
+
+    idx = open_index(root)
+    box = open_inbox(root)
+    try:
+        hits = idx.execute("SELECT recipient, file FROM signals WHERE id = ?", (sig_id,)).fetchall()
+        if not hits:
+            raise KeyError(sig_id)
+        box.execute("BEGIN IMMEDIATE")
+        try:
+            if agent:
+                agents = [agent]
+            else:
+                agents = sorted({r[0] for r in hits if r[0] and r[0] != "all"})
+                held = box.execute(
+                    f"SELECT DISTINCT agent FROM pending WHERE file IN ({','.join('?' * len(hits))})",
+                    [f for _, f in hits],
+                )
+                agents += [a for (a,) in held if a not in agents]
+            if not agents:
+                raise ValueError(f"signal {sig_id} is addressed to all; name the acknowledging agent")
+            ts = _now_rfc3339()
+            box.executemany("INSERT OR REPLACE INTO acks VALUES (?,?,?)", [(a, sig_id, ts) for a in agents])
+            # By file: unique, and also clears rows recorded under an older id scheme.
+            box.executemany(
+                "DELETE FROM pending WHERE agent = ? AND file = ?", [(a, f) for a in agents for _, f in hits]
+            )
+            box.execute("COMMIT")
+        except BaseException:
+            box.execute("ROLLBACK")
+            raise
+    finally:
+        idx.close()
+        box.close()
+    return {"ok": True, "id": sig_id, "agents": agents, "ts": ts}
+
+
+def overdue(root: Path, *, agent: str | None = None) -> list[dict]:
+    """Pending signals past their response_by, across agents (or for one)."""
+
+    now = dt.datetime.now(dt.timezone.utc)
+    box = open_inbox(root)
+    try:
+        sql = f"SELECT agent, {_PENDING_COLUMNS} FROM pending WHERE response_by != ''"
+        params: list = []
+        if agent:
+            sql += " AND agent = ?"
+            params.append(agent)
+        out = []
+        for r in box.execute(sql + " ORDER BY response_by", params):
+            p = _pending_dict(r[1:], now)
+            if p["overdue"]:
+                out.append({"agent": r[0], **p})
+        return out
+    finally:
+        box.close()
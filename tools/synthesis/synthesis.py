@@ -10,6 +10,13 @@ import sys
 from pathlib import Path
 from typing import Any, cast
 
+# Appended, not prepended: tools/signal/signal.py must not shadow the stdlib module.
+sys.path.append(str(Path(__file__).resolve().parents[1] / "signal"))
+import signal_bus  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "field"))
+import field as field_mod  # noqa: E402
+
 
 def _utc_now() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0)
@@ -46,22 +53,19 @@ def _count_recent_files(dir_path: Path, *, since: dt.datetime) -> int:
 
 
 def _signals_summary(root: Path, limit: int) -> tuple[dict, list[str]]:
-    sig_dir = root / ".bridges" / "signals"
-    if not sig_dir.exists():
+    if not (root / ".bridges" / "signals").exists():
         return {"total": 0, "by_kind": {}}, []
-    paths = sorted(sig_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    conn = signal_bus.open_index(root)
+    try:
+        rows = signal_bus.query(root, limit=limit, conn=conn)
+        total = signal_bus.count(root, conn=conn)
+    finally:
+        conn.close()
     by_kind: dict[str, int] = {}
-    last: list[str] = []
-    for p in paths[:limit]:
-        try:
-            obj = json.loads(p.read_text(encoding="utf-8"))
-            kind = str((obj.get("header") or {}).get("kind") or "")
-            if kind:
-                by_kind[kind] = by_kind.get(kind, 0) + 1
-        except Exception:
-            pass
-        last.append(str(p.relative_to(root)))
-    return {"total": len(paths), "by_kind": by_kind}, last
+    for row in rows:
+        if row["kind"]:
+            by_kind[row["kind"]] = by_kind.get(row["kind"], 0) + 1
+    return {"total": total, "by_kind": by_kind}, [signal_bus.ref(root, row) for row in rows]
 
 
 def compute(root: Path) -> dict:
@@ -69,7 +73,7 @@ def compute(root: Path) -> dict:
     since_24h = now - dt.timedelta(hours=24)
 
     budgets_obj = _run_json(root, ["scripts/orchestrate", "budgets"])
-    field_obj = _run_json(root, ["scripts/field", "status"])
+    field_obj = field_mod.current_field(root)
     health_obj = _run_json(root, ["scripts/health.sh"])
 
     budgets = cast(dict, budgets_obj) if isinstance(budgets_obj, dict) else {}
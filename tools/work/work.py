@@ -7,6 +7,9 @@ import os
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "plan-registry"))
+import plan_registry  # noqa: E402
+
 
 def _utc_now_rfc3339() -> str:
     return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
@@ -23,15 +26,6 @@ def _read(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
-def _write(path: Path, text: str) -> None:
-    path.write_text(text, encoding="utf-8")
-
-
-def _exists_id(plans_text: str, work_id: str) -> bool:
-    needle = f"- id: \"{work_id}\""
-    return needle in plans_text
-
-
 def _append_item(
     root: Path,
     *,
@@ -46,39 +40,22 @@ def _append_item(
     links: list[str],
     depends_on: list[str],
 ) -> None:
-    path = root / "tools" / "plan-registry" / "plans.yaml"
-    text = _read(path)
-    if _exists_id(text, work_id):
+    item = {
+        "id": work_id,
+        "title": title,
+        "kind": kind,
+        "mode": mode,
+        "status": "pending",
+        "owner": owner,
+        "domain": domain,
+        "priority": priority,
+        "links": links,
+        "depends_on": depends_on,
+        "notes": notes,
+    }
+    if not plan_registry.append_item(root, item):
         raise SystemExit(f"id already exists: {work_id}")
 
-    block = []
-    block.append("\n")
-    block.append(f"  - id: \"{work_id}\"\n")
-    block.append(f"    title: \"{title}\"\n")
-    block.append(f"    kind: \"{kind}\"\n")
-    block.append(f"    mode: \"{mode}\"\n")
-    block.append("    status: \"pending\"\n")
-    block.append(f"    owner: \"{owner}\"\n")
-    block.append(f"    domain: \"{domain}\"\n")
-    block.append(f"    priority: \"{priority}\"\n")
-    if links:
-        block.append("    links:\n")
-        for l in links:
-            block.append(f"      - \"{l}\"\n")
-    else:
-        block.append("    links: []\n")
-    if depends_on:
-        block.append("    depends_on:\n")
-        for d in depends_on:
-            block.append(f"      - \"{d}\"\n")
-    else:
-        block.append("    depends_on: []\n")
-    block.append(f"    notes: \"{notes}\"\n")
-
-    if not text.endswith("\n"):
-        text += "\n"
-    _write(path, text + "".join(block))
-
 
 def _create_template(root: Path, kind: str, work_id: str, title: str) -> Path:
     ts = _utc_now_rfc3339()